@@ -0,0 +1,640 @@
+"""
+Benchmarks
+Run from the pygame2_new directory:
+
+    python benchmark.py memory
+    python benchmark.py crowd --count 5000
+    python benchmark.py systems --ticks 3000
+    python benchmark.py kernels
+    python benchmark.py levels
+    python benchmark.py streaming --length 200000
+    python benchmark.py tilemap --length 4000000
+    python benchmark.py snapshot --length 20000
+    python benchmark.py persistence --writes 200
+    python benchmark.py sprites
+    python benchmark.py startup --save-baseline
+    python benchmark.py startup
+"""
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# Startup regression gate: the first frame may take STARTUP_TOLERANCE longer than
+# this machine's stored baseline; without one, STARTUP_THRESHOLD_MS is the limit
+# (the first frame measures ~250-350 ms on a development machine)
+STARTUP_BASELINE = os.path.join(HERE, "__cache__", "startup_baseline.json")
+STARTUP_TOLERANCE = 0.3
+STARTUP_THRESHOLD_MS = 400
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pygame
+
+
+def _slot_names(cls) -> list:
+    """All __slots__ declared along the MRO, base classes first"""
+    names = []
+    for klass in reversed(cls.__mro__):
+        for name in getattr(klass, '__slots__', ()):
+            if name not in names:
+                names.append(name)
+    return names
+
+
+def _dict_variant(cls):
+    """
+    Equivalent of cls before __slots__: a plain class whose instances keep the
+    same attributes (in the same order) in a per-instance __dict__
+    """
+    names = _slot_names(cls)
+
+    def __init__(self, source):
+        for name in names:
+            setattr(self, name, getattr(source, name))
+
+    return type(cls.__name__ + "Dict", (), {'__init__': __init__})
+
+
+def _bytes_per_instance(factory, count: int) -> float:
+    """Average traced allocation of one object built by factory"""
+    keep = []
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    for _ in range(count):
+        keep.append(factory())
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    total = sum(stat.size_diff for stat in after.compare_to(before, 'filename'))
+    return total / count
+
+
+def _memory_samples():
+    """One representative instance of every slotted entity class"""
+    from entity_base import Vector2D, Entity, BaseEnemy
+    from particle import Particle, StarParticle, CoinCollectEffect
+    from mario_blocks import Block, Pipe, Mushroom, FireFlower, Fireball
+    from enemy import Enemy
+    from coin import Coin
+    from platforms import Platform
+    from flag import Flag
+    from powerup import PowerUp
+    from player import Player
+    from ecs import ComponentStore
+
+    store = ComponentStore()
+    return [
+        Vector2D(1.0, 2.0),
+        Entity(0, 0, 40, 40),
+        BaseEnemy(0, 0, 40, 40),
+        Player(100, 400),
+        Enemy(0, 0, store=store),
+        Mushroom(0, 0, store=store),
+        Fireball(0, 0, 1, store=store),
+        FireFlower(0, 0),
+        Block(0, 0, "question", "coin"),
+        Pipe(0, 0, 2),
+        Coin(0, 0),
+        Platform(0, 0, 100, 20),
+        Flag(0, 0),
+        PowerUp(0, 0),
+        Particle(0, 0, (255, 0, 0)),
+        StarParticle(0, 0),
+        CoinCollectEffect(0, 0),
+    ]
+
+
+def bench_memory(count: int):
+    """Bytes per instance shell with __slots__ versus a dict-backed equivalent"""
+    import copy
+
+    print(f"{'class':<20}{'dict (B)':>10}{'slots (B)':>11}{'saved':>8}")
+    total_dict = total_slots = 0.0
+    for sample in _memory_samples():
+        cls = type(sample)
+        dict_cls = _dict_variant(cls)
+        with_dict = _bytes_per_instance(lambda: dict_cls(sample), count)
+        with_slots = _bytes_per_instance(lambda: copy.copy(sample), count)
+        total_dict += with_dict
+        total_slots += with_slots
+        saved = 1 - with_slots / with_dict if with_dict else 0.0
+        print(f"{cls.__name__:<20}{with_dict:>10.0f}{with_slots:>11.0f}{saved:>8.0%}")
+    print(f"{'total':<20}{total_dict:>10.0f}{total_slots:>11.0f}"
+          f"{1 - total_slots / total_dict:>8.0%}")
+
+
+def _stress_level(count: int, seed: int = 1):
+    """
+    Store with the count patrolling Goombas of a generated level
+    (levelgen.py), plus the collider grid of its platforms
+    """
+    import numpy as np
+    from ecs import ComponentStore
+    from crowd import ColliderGrid
+    from enemy import Enemy
+    from levelgen import LevelSpec, generate_level
+
+    data = generate_level(LevelSpec(max(8000, count * 16), seed, enemies=count))
+    colliders = data.platforms.astype(np.float64)
+    colliders[:, 2:] += colliders[:, :2]  # x, y, width, height -> left, top, right, bottom
+
+    store = ComponentStore(capacity=count)
+    enemies = [Enemy(x, y, move_range, store=store)
+               for x, y, move_range in data.enemies.tolist()]
+    return store, ColliderGrid(colliders), enemies
+
+
+def bench_crowd(count: int, ticks: int):
+    """Milliseconds per tick of the batched crowd update"""
+    from crowd import CrowdSimulation
+
+    store, grid, enemies = _stress_level(count)
+    crowd = CrowdSimulation(store, grid)
+    for _ in range(60):  # Let everyone land first
+        crowd.step()
+
+    times = []
+    for tick in range(ticks):
+        start = time.perf_counter()
+        crowd.step()
+        crowd.sync_visible(tick * 5 % 8000)
+        times.append(time.perf_counter() - start)
+    times.sort()
+    print(f"{count} enemies, {len(grid)} colliders, {ticks} ticks")
+    print(f"median {times[len(times) // 2] * 1000:.3f} ms/tick, "
+          f"p95 {times[int(len(times) * 0.95)] * 1000:.3f} ms/tick, "
+          f"{len(crowd.visible)} visible")
+
+
+def bench_systems(ticks: int, length: int):
+    """Average time per game system over a headless run (no input)"""
+    from game import Game
+    from level import Level
+    from levelgen import LevelSpec, generate_level
+
+    data = generate_level(LevelSpec(length, seed=1)) if length else None
+    game = Game()
+    for tick in range(ticks):
+        if game.game_state != "playing":
+            game.reset_game()
+        if data is not None and (tick == 0 or game.level.name != data.name):
+            game.level = Level(1, data)  # Again after every reset_game()
+        game.update()
+    stats = game.systems.stats()
+    total = sum(entry['avg_ms'] for entry in stats.values())
+    print(f"{'system':<12}{'calls':>8}{'avg (ms)':>10}{'share':>8}")
+    for name, entry in stats.items():
+        print(f"{name:<12}{entry['calls']:>8}{entry['avg_ms']:>10.4f}"
+              f"{entry['avg_ms'] / total if total else 0:>8.0%}")
+    print(f"{'total':<12}{'':>8}{total:>10.4f}")
+
+
+def _time_call(function, *args, repeat: int = 2000) -> float:
+    """Microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function(*args)
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def bench_kernels():
+    """Time the active collision kernels against the NumPy ones on a real level"""
+    import numpy as np
+    import kernels
+    from level import Level
+
+    print(f"backend: {'numba' if kernels.HAVE_NUMBA else 'numpy'} "
+          f"(correctness: python -m pytest pygame2_new/tests/test_kernels.py)")
+
+    level = Level(1)
+    boxes, head = level.solids()
+    rect = (level.platforms[0].rect.x + 40, level.platforms[0].rect.y - 45, 40, 50)
+    store, grid, _ = _stress_level(2000)
+    index = store.live()
+    left, top, right, bottom = store.boxes(index).T
+    cell = grid.candidates(left)
+    grid_args = (left, top, right, bottom, cell, grid.table, grid.edges, grid.colliders)
+
+    rows = [
+        ("resolve_x", kernels._resolve_x, kernels._resolve_x_numpy,
+         (np.array(rect, dtype=np.float64), 5.0, boxes)),
+        ("resolve_y", kernels._resolve_y, kernels._resolve_y_numpy,
+         (np.array(rect, dtype=np.float64), 8.0, boxes, head)),
+        ("grid_first_overlap", kernels.grid_first_overlap, kernels._grid_first_overlap_numpy,
+         grid_args),
+    ]
+    print(f"{'kernel':<20}{'active (us)':>12}{'numpy (us)':>12}")
+    for name, active, fallback, args in rows:
+        active(*args)  # Compile outside the timing
+        print(f"{name:<20}{_time_call(active, *args):>12.2f}"
+              f"{_time_call(fallback, *args):>12.2f}")
+
+
+def bench_levels(repeat: int, length: int):
+    """Level file compile vs binary cache load vs full Level construction"""
+    import tempfile
+    from level import Level
+    from level_data import compile_level, level_count, level_path, load_level, save_level
+    from levelgen import LevelSpec, generate_level
+
+    print(f"{'level':<8}{'compile (ms)':>14}{'cache (ms)':>12}{'Level() (ms)':>14}")
+    for number in range(1, level_count() + 1):
+        path = level_path(number)
+        load_level(path)  # Make sure the cache exists
+        compile_ms = _time_call(compile_level, path, repeat=repeat) / 1000
+        cache_ms = _time_call(load_level, path, repeat=repeat) / 1000
+        level_ms = _time_call(Level, number, repeat=repeat) / 1000
+        print(f"{number:<8}{compile_ms:>14.3f}{cache_ms:>12.3f}{level_ms:>14.3f}")
+
+    # Generated level of the given length, through a temporary file and cache
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "generated.json")
+        save_level(generate_level(LevelSpec(length, seed=1)), path)
+        data = load_level(path, directory)
+        repeat = max(1, repeat // 50)
+        compile_ms = _time_call(compile_level, path, repeat=repeat) / 1000
+        cache_ms = _time_call(load_level, path, directory, repeat=repeat) / 1000
+        level_ms = _time_call(Level, 1, data, repeat=repeat) / 1000
+        print(f"{f'{length // 1000}k px':<8}{compile_ms:>14.3f}{cache_ms:>12.3f}{level_ms:>14.3f}")
+
+
+def bench_streaming(length: int, ticks: int):
+    """Fully loaded vs streamed generated level: build time, memory and tick cost"""
+    from determinism import InputFrame
+    from game import Game
+    from level import Level
+    from levelgen import LevelSpec, generate_level
+    from streaming import LEVEL_OBJECTS
+
+    data = generate_level(LevelSpec(length, seed=1))
+    run, jump = InputFrame(right=True), InputFrame(right=True, jump=True)
+    total = sum(len(getattr(data, category)) for category in LEVEL_OBJECTS)
+    print(f"level {data.extent()} px, {total} objects")
+    print(f"{'mode':<10}{'build (ms)':>12}{'memory (KB)':>13}{'median (ms)':>13}"
+          f"{'max (ms)':>10}{'loaded':>8}")
+    for streaming in (False, True):
+        start = time.perf_counter()
+        Level(1, data, streaming=streaming)
+        build_ms = (time.perf_counter() - start) * 1000
+        tracemalloc.start()  # Separate build: tracing slows construction down
+        level = Level(1, data, streaming=streaming)
+        memory_kb = tracemalloc.get_traced_memory()[0] / 1024
+        tracemalloc.stop()
+
+        game = Game(seed=1)
+        game.level = level
+        game.lives = ticks  # Keep going through every death
+        gc.collect()  # Not the previous mode's garbage inside the timing
+        times = []
+        for tick in range(ticks):
+            if tick % 30 == 0:  # Jump ahead so the camera sweeps the whole level
+                game.player.rect.x += 900
+                game.player.rect.y = 0
+            start = time.perf_counter()
+            game.step(jump if tick % 23 == 0 else run)
+            times.append(time.perf_counter() - start)
+            if game.game_state != "playing":
+                break
+        times.sort()
+        loaded = (level.streamer.loaded_count() if level.streamer
+                  else sum(len(getattr(level, category)) for category in LEVEL_OBJECTS))
+        print(f"{'streamed' if streaming else 'full':<10}{build_ms:>12.1f}{memory_kb:>13.0f}"
+              f"{times[len(times) // 2] * 1000:>13.3f}{times[-1] * 1000:>10.3f}{loaded:>8}")
+
+
+def bench_tilemap(length: int, ticks: int):
+    """Generated level with blocks/coins as level file rows vs in a memory-mapped tile map"""
+    import tempfile
+    from determinism import InputFrame
+    from game import Game
+    from level import Level
+    from level_data import load_level, save_level
+    from levelgen import LevelSpec, generate_level
+    from tilemap import bake_tilemap
+
+    data = generate_level(LevelSpec(length, seed=1))
+    run, jump = InputFrame(right=True), InputFrame(right=True, jump=True)
+    print(f"level {length} px, {len(data.blocks)} blocks, {len(data.coins)} coins")
+    print(f"{'storage':<10}{'load (ms)':>11}{'Level() (ms)':>14}{'memory (KB)':>13}"
+          f"{'median (ms)':>13}{'max (ms)':>10}")
+    with tempfile.TemporaryDirectory() as directory:
+        rows_path = os.path.join(directory, "rows.json")
+        tiles_path = os.path.join(directory, "tiles.json")
+        save_level(data, rows_path)
+        save_level(bake_tilemap(data, os.path.join(directory, "tiles.tiles")), tiles_path)
+        for name, path in (("rows", rows_path), ("tilemap", tiles_path)):
+            load_level(path, directory)  # Write the cache
+            gc.collect()
+            tracemalloc.start()
+            start = time.perf_counter()
+            level_data = load_level(path, directory)
+            loaded = time.perf_counter()
+            level = Level(1, level_data, streaming=True)
+            built = time.perf_counter()
+            memory_kb = tracemalloc.get_traced_memory()[0] / 1024
+            tracemalloc.stop()
+
+            game = Game(seed=1)
+            game.level = level
+            game.lives = ticks
+            gc.collect()
+            times = []
+            for tick in range(ticks):
+                if tick % 30 == 0:
+                    game.player.rect.x += 900
+                    game.player.rect.y = 0
+                start_tick = time.perf_counter()
+                game.step(jump if tick % 23 == 0 else run)
+                times.append(time.perf_counter() - start_tick)
+            times.sort()
+            print(f"{name:<10}{(loaded - start) * 1000:>11.1f}{(built - loaded) * 1000:>14.1f}"
+                  f"{memory_kb:>13.0f}{times[len(times) // 2] * 1000:>13.3f}"
+                  f"{times[-1] * 1000:>10.3f}")
+            del game, level, level_data  # Release the memmap before the directory goes
+
+
+def bench_snapshot(repeat: int, length: int):
+    """Snapshot size and capture/restore time vs rebuilding the level"""
+    from determinism import InputFrame
+    from game import Game
+    from level import Level
+    from levelgen import LevelSpec, generate_level
+
+    run, jump = InputFrame(right=True), InputFrame(right=True, jump=True)
+    print(f"{'level':<10}{'Level() (ms)':>14}{'snapshot (ms)':>15}{'restore (ms)':>14}"
+          f"{'game (ms)':>11}{'size (B)':>10}")
+    for name, data in (("1", None), (f"{length // 1000}k px", generate_level(LevelSpec(length, seed=1)))):
+        game = Game(seed=1)
+        if data is not None:
+            game.level = Level(1, data, streaming=False)
+        for tick in range(600):  # Some play first: collected coins, dead enemies, particles
+            game.step(jump if tick % 23 == 0 else run)
+            if game.game_state != "playing":
+                break
+        level = game.level
+        build_ms = _time_call(Level, 1, data, False, repeat=max(1, repeat // 10)) / 1000
+        blob = level.snapshot()
+        snapshot_ms = _time_call(level.snapshot, repeat=repeat) / 1000
+        restore_ms = _time_call(level.restore, blob, repeat=repeat) / 1000
+        game_blob = game.snapshot(particles=True)
+        game_ms = _time_call(game.restore, game_blob, repeat=repeat) / 1000
+        print(f"{name:<10}{build_ms:>14.3f}{snapshot_ms:>15.3f}{restore_ms:>14.3f}"
+              f"{game_ms:>11.3f}{len(blob):>10}")
+
+
+def bench_persistence(writes: int):
+    """Cost of a save on the game thread: synchronous atomic write vs the background writer"""
+    import tempfile
+    from persistence import BackgroundWriter, SaveGame
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "save.bin")
+        sync = BackgroundWriter(batch_delay=0)
+        start = time.perf_counter()
+        for score in range(writes):
+            sync._write_batch({path: SaveGame(1, 3, score).to_bytes()})
+        sync_us = (time.perf_counter() - start) / writes * 1e6
+
+        writer = BackgroundWriter()
+        times = []
+        for score in range(writes):
+            start = time.perf_counter()
+            writer.write(path, SaveGame(1, 3, score).to_bytes())
+            times.append(time.perf_counter() - start)
+            time.sleep(0.001)  # About as fast as a game could save
+        writer.close()
+        times.sort()
+        stats = writer.stats()
+        print(f"synchronous write+fsync+rename: {sync_us:.0f} us per save")
+        print(f"background writer: median {times[len(times) // 2] * 1e6:.1f} us, "
+              f"max {times[-1] * 1e6:.1f} us per save on the game thread")
+        print(f"{stats['submitted']} saves -> {stats['written']} files written in "
+              f"{stats['batches']} batches ({stats['coalesced']} coalesced)")
+
+
+# Fresh process: Game() (reads the sprite cache) and its first frame (bakes or decodes sprites)
+_FIRST_FRAME = """
+import sys, time
+import main
+main.init_pygame()
+from game import Game
+from sprites import sprites
+sprites.path = sys.argv[1]
+start = time.perf_counter()
+game = Game(level=int(sys.argv[2]))
+game.draw()
+elapsed = time.perf_counter() - start
+stats = sprites.stats()
+print(elapsed * 1000, stats['baked'], stats['decoded'])
+game.close()
+"""
+
+
+def bench_sprites(runs: int, frames: int):
+    """First frame with a cold and a warm sprite cache (fresh processes), and the frame cost after"""
+    import statistics
+    import tempfile
+    from game import Game
+    from level_data import level_count
+    from sprites import sprites
+
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    with tempfile.TemporaryDirectory() as directory:
+        cache = os.path.join(directory, "sprites.bin")
+
+        def first_frame(level):
+            result = subprocess.run([sys.executable, "-c", _FIRST_FRAME, cache, str(level)],
+                                    env=env, cwd=HERE, check=True, capture_output=True, text=True)
+            ms, baked, decoded = result.stdout.split()
+            return float(ms), int(baked), int(decoded)
+
+        print(f"{'level':<8}{'cold (ms)':>11}{'warm (ms)':>11}{'baked':>8}{'loaded':>8}")
+        for level in range(1, level_count() + 1):
+            cold, warm = [], []
+            for _ in range(runs):
+                if os.path.exists(cache):
+                    os.remove(cache)
+                ms, baked, _ = first_frame(level)   # Bakes everything, writes the cache on exit
+                cold.append(ms)
+                ms, _, decoded = first_frame(level)  # Reads the cache written just now
+                warm.append(ms)
+            print(f"{level:<8}{statistics.median(cold):>11.1f}{statistics.median(warm):>11.1f}"
+                  f"{baked:>8}{decoded:>8}")
+        size = os.path.getsize(cache)
+    print(f"Game() + first draw(), median of {runs} fresh processes each; "
+          f"cache file {size / 1024:.0f} KiB")
+
+    sprites.path = None
+    game = Game(seed=1)
+    game.draw()
+    start = time.perf_counter()
+    for _ in range(frames):
+        game.draw()
+    print(f"draw() with baked sprites: {(time.perf_counter() - start) / frames * 1000:.2f} ms per frame")
+    game.close()
+
+
+def _importtime(module: str, env: dict) -> list:
+    """(self us, cumulative us, depth, name) of every import made by importing module"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            env=env, cwd=HERE, capture_output=True, text=True, check=True)
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        rows.append((int(own), int(cumulative), depth, name.strip()))
+    return rows
+
+
+def _startup_threshold(threshold_ms) -> tuple:
+    """(limit in ms, where it comes from); an explicit threshold wins over the baseline"""
+    if threshold_ms is not None:
+        return threshold_ms, "--threshold-ms"
+    try:
+        with open(STARTUP_BASELINE) as file:
+            baseline_ms = json.load(file)['first_frame_ms']
+    except (OSError, ValueError, KeyError):
+        return STARTUP_THRESHOLD_MS, "default, no baseline saved"
+    return baseline_ms * (1 + STARTUP_TOLERANCE), \
+        f"baseline {baseline_ms:.0f} ms + {STARTUP_TOLERANCE:.0%}"
+
+
+def bench_startup(runs: int, threshold_ms, save_baseline: bool) -> int:
+    """Import profile (-X importtime) and time to the first frame of main.py (cold and warm sprite cache)"""
+    import statistics
+    import tempfile
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy",
+               PYGAME_HIDE_SUPPORT_PROMPT="1")
+
+    rows = _importtime("game", env)
+    cumulative = {name: total for _, total, _, name in rows}
+    ours = sorted((row for row in rows if os.path.exists(os.path.join(HERE, row[3] + ".py"))),
+                  reverse=True)
+    print(f"import game: {cumulative['game'] / 1000:.1f} ms "
+          f"(pygame {cumulative.get('pygame', 0) / 1000:.1f}, numpy {cumulative.get('numpy', 0) / 1000:.1f})")
+    print("slowest game modules (self ms): " + ", ".join(
+        f"{name} {own / 1000:.1f}" for own, _, _, name in ours[:8]))
+
+    def run_ms(command):
+        start = time.perf_counter()
+        subprocess.run(command, env=env, cwd=HERE, check=True, capture_output=True)
+        return (time.perf_counter() - start) * 1000
+
+    interpreter_ms = statistics.median(run_ms([sys.executable, "-c", "pass"]) for _ in range(runs))
+    cold, warm = [], []
+    with tempfile.TemporaryDirectory() as directory:
+        cache = os.path.join(directory, "sprites.bin")
+        first_frame = [sys.executable, "main.py", "--level", "1", "--frames", "1", "--sprite-cache", cache]
+        # Cold and warm runs alternate, so drift of the machine hits both alike
+        for _ in range(runs):
+            if os.path.exists(cache):
+                os.remove(cache)
+            cold.append(run_ms(first_frame))  # Bakes every sprite and writes the cache
+            warm.append(run_ms(first_frame))  # Loads them from the cache
+    cold_ms = statistics.median(cold)
+    warm_ms = statistics.median(warm)
+    print(f"python startup: {interpreter_ms:.0f} ms, main.py to first frame and exit: "
+          f"cold sprite cache {cold_ms:.0f} ms, warm {warm_ms:.0f} ms (median of {runs}; "
+          f"benchmark.py sprites times the first frame alone)")
+    # The gate watches the usual start (warm sprite cache)
+    if save_baseline:
+        os.makedirs(os.path.dirname(STARTUP_BASELINE), exist_ok=True)
+        with open(STARTUP_BASELINE, "w") as file:
+            json.dump({'first_frame_ms': warm_ms, 'runs': runs}, file)
+        print(f"baseline saved: {warm_ms:.0f} ms")
+        return 0
+    limit_ms, source = _startup_threshold(threshold_ms)
+    if limit_ms and warm_ms > limit_ms:
+        print(f"REGRESSION: first frame {warm_ms:.0f} ms over the {limit_ms:.0f} ms threshold ({source})")
+        return 1
+    print(f"threshold {limit_ms:.0f} ms ({source}): ok")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    memory = sub.add_parser("memory", help="bytes per entity with and without __slots__")
+    memory.add_argument("--count", type=int, default=10000)
+
+    crowd = sub.add_parser("crowd", help="batched enemy update, ms per tick")
+    crowd.add_argument("--count", type=int, default=5000)
+    crowd.add_argument("--ticks", type=int, default=600)
+
+    systems = sub.add_parser("systems", help="per-system time of a headless game run")
+    systems.add_argument("--ticks", type=int, default=3000)
+    systems.add_argument("--length", type=int, default=0,
+                         help="run on a generated level this long (0 = level 1)")
+
+    sub.add_parser("kernels", help="time the collision kernels")
+
+    levels = sub.add_parser("levels", help="level load time (source, cache, objects)")
+    levels.add_argument("--repeat", type=int, default=200)
+    levels.add_argument("--length", type=int, default=200000, help="generated level length in px")
+
+    streaming = sub.add_parser("streaming", help="long level fully loaded vs streamed")
+    streaming.add_argument("--length", type=int, default=200000, help="generated level length in px")
+    streaming.add_argument("--ticks", type=int, default=6000)
+
+    tilemap = sub.add_parser("tilemap", help="blocks/coins as file rows vs memory-mapped tile map")
+    tilemap.add_argument("--length", type=int, default=4000000, help="generated level length in px")
+    tilemap.add_argument("--ticks", type=int, default=3000)
+
+    snapshot = sub.add_parser("snapshot", help="snapshot/restore vs rebuilding the level")
+    snapshot.add_argument("--repeat", type=int, default=200)
+    snapshot.add_argument("--length", type=int, default=20000, help="generated level length in px")
+
+    persistence = sub.add_parser("persistence", help="save cost on the game thread")
+    persistence.add_argument("--writes", type=int, default=200)
+
+    sprites = sub.add_parser("sprites", help="first frame with a cold vs warm sprite cache")
+    sprites.add_argument("--runs", type=int, default=7)
+    sprites.add_argument("--frames", type=int, default=300)
+
+    startup = sub.add_parser("startup", help="import profile and time to first frame")
+    startup.add_argument("--runs", type=int, default=9)
+    startup.add_argument("--threshold-ms", type=float,
+                         help="exit with status 1 when the first frame takes longer (0 = off); "
+                              "default: saved baseline + %d%%, else %d ms"
+                              % (STARTUP_TOLERANCE * 100, STARTUP_THRESHOLD_MS))
+    startup.add_argument("--save-baseline", action="store_true",
+                         help="store this machine's first-frame time as the baseline")
+
+    args = parser.parse_args(argv)
+    if args.command == "startup":
+        return bench_startup(args.runs, args.threshold_ms, args.save_baseline)  # Subprocesses only, no pygame here
+    pygame.init()
+    if args.command == "memory":
+        bench_memory(args.count)
+    elif args.command == "crowd":
+        bench_crowd(args.count, args.ticks)
+    elif args.command == "systems":
+        bench_systems(args.ticks, args.length)
+    elif args.command == "kernels":
+        bench_kernels()
+    elif args.command == "levels":
+        bench_levels(args.repeat, args.length)
+    elif args.command == "streaming":
+        bench_streaming(args.length, args.ticks)
+    elif args.command == "tilemap":
+        bench_tilemap(args.length, args.ticks)
+    elif args.command == "snapshot":
+        bench_snapshot(args.repeat, args.length)
+    elif args.command == "persistence":
+        bench_persistence(args.writes)
+    elif args.command == "sprites":
+        bench_sprites(args.runs, args.frames)
+    pygame.quit()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,8 +1,11 @@
 import pygame
 from config import *
+from fonts import font
 import math
 
 class Coin:
+    __slots__ = ('rect', 'collected', 'animation_offset')
+    
     def __init__(self, x, y):
         self.rect = pygame.Rect(x, y, COIN_SIZE, COIN_SIZE)
         self.collected = False
@@ -46,8 +49,7 @@ class Coin:
         pygame.draw.circle(screen, (255, 215, 0), (center_x, center_y), COIN_SIZE // 2 - 7)
         
         # Symbol "$" nebo hvězda na minci
-        font = pygame.font.Font(None, 20)
-        symbol = font.render("$", True, ORANGE)
+        symbol = font(20).render("$", True, ORANGE)
         symbol_rect = symbol.get_rect(center=(center_x, center_y))
         screen.blit(symbol, symbol_rect)
         
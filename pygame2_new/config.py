@@ -35,6 +35,7 @@ SUPER_MARIO_HEIGHT = 50
 
 # Timer
 LEVEL_TIME = 300  # 300 sekund (5 minut)
+SPEED_BOOST_DURATION = 300  # 5 sekund při 60 FPS
 
 # Nepřítel
 ENEMY_WIDTH = 40
@@ -52,3 +53,20 @@ COIN_POINTS = 10
 # Vlajka (cíl)
 FLAG_WIDTH = 20
 FLAG_HEIGHT = 100
+
+# Simulační oblast (okolí kamery, mimo ni entity spí)
+SIM_REGION_MARGIN = 300
+
+# Streamování dlouhých levelů - načtené jsou jen chunky kolem kamery
+CHUNK_WIDTH = 1000
+STREAM_MARGIN = 1000       # Načteno aspoň tolik px za okraji obrazovky (víc než SIM_REGION_MARGIN)
+STREAM_MIN_WIDTH = 20000   # Delší levely se streamují automaticky
+TILE_SIZE = 40             # Buňka tile mapy (velikost bloku)
+
+# Level of detail - (max. vzdálenost od hráče, update každý N-tý tick)
+# Plná frekvence aspoň přes celou obrazovku + simulační okraj (vše viditelné)
+LOD_FULL_RATE = SCREEN_WIDTH + SIM_REGION_MARGIN
+LOD_TIERS = ((LOD_FULL_RATE, 1), (2 * LOD_FULL_RATE, 2), (float('inf'), 4))
+
+# Šířka sloupce prostorového indexu bloků (px)
+BLOCK_COLUMN = 80
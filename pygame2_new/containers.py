@@ -0,0 +1,161 @@
+"""
+Entity Containers
+List-like storage with O(1) swap-remove, generational handles and removal
+deferred to the end of the tick
+"""
+from ecs import make_handle, handle_index, handle_generation
+from typing import Any, Iterator, List, Optional
+
+
+class EntityList:
+    """
+    Dense list of objects plus a sparse slot table
+
+    - add()/append() returns a generational handle; a handle of a removed
+      object never resolves to the object that later reuses its slot
+    - remove() only marks the object; flush() swap-removes all marked
+      objects at once, so removing while iterating is safe
+    - iteration, len() and `in` see live objects only: an object marked
+      for removal is skipped from then on, although it stays in the dense
+      list until flush(); there is no indexing, positions would shift
+    """
+    __slots__ = ('_dense', '_dense_slot', '_slot_dense', '_generation', '_free',
+                 '_slot_of', '_pending', 'version')
+
+    def __init__(self, items=()):
+        self._dense: List[Any] = []        # Objects, iteration order
+        self._dense_slot: List[int] = []   # Slot of each dense entry
+        self._slot_dense: List[int] = []   # Dense position of each slot (-1 = free)
+        self._generation: List[int] = []
+        self._free: List[int] = []
+        self._slot_of = {}                 # id(obj) -> slot
+        self._pending = {}                 # Slots marked for removal (ordered set)
+        self.version = 0                   # Bumped whenever membership changes
+        for item in items:
+            self.add(item)
+
+    # === MEMBERSHIP ===
+
+    def add(self, obj) -> int:
+        """Insert an object and return its handle"""
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = len(self._generation)
+            self._generation.append(0)
+            self._slot_dense.append(-1)
+        self._slot_dense[slot] = len(self._dense)
+        self._dense.append(obj)
+        self._dense_slot.append(slot)
+        self._slot_of[id(obj)] = slot
+        self.version += 1
+        return make_handle(slot, self._generation[slot])
+
+    append = add
+
+    def extend(self, items):
+        for item in items:
+            self.add(item)
+
+    def remove(self, obj_or_handle):
+        """Mark for removal at the next flush(); unknown objects are ignored"""
+        if isinstance(obj_or_handle, int):
+            slot = self._resolve(obj_or_handle)
+        else:
+            slot = self._slot_of.get(id(obj_or_handle))
+        if slot is not None and slot not in self._pending:
+            self._pending[slot] = None
+            self.version += 1
+
+    def discard_now(self, obj):
+        """Immediate O(1) swap-remove (not safe while iterating)"""
+        slot = self._slot_of.get(id(obj))
+        if slot is not None:
+            self._swap_remove(slot)
+            self._pending.pop(slot, None)
+
+    def flush(self, on_removed=None) -> int:
+        """
+        Apply deferred removals; returns how many objects were removed
+        on_removed - called with each removed object (e.g. pool.recycle)
+        """
+        removed = len(self._pending)
+        for slot in self._pending:
+            obj = self._swap_remove(slot)
+            if on_removed is not None:
+                on_removed(obj)
+        self._pending.clear()
+        return removed
+
+    def clear(self):
+        version = self.version
+        self.__init__()
+        self.version = version + 1
+
+    def _swap_remove(self, slot: int):
+        position = self._slot_dense[slot]
+        last = len(self._dense) - 1
+        obj = self._dense[position]
+        if position != last:
+            moved_slot = self._dense_slot[last]
+            self._dense[position] = self._dense[last]
+            self._dense_slot[position] = moved_slot
+            self._slot_dense[moved_slot] = position
+        self._dense.pop()
+        self._dense_slot.pop()
+        self._slot_dense[slot] = -1
+        self._generation[slot] += 1
+        self._free.append(slot)
+        del self._slot_of[id(obj)]
+        self.version += 1
+        return obj
+
+    # === HANDLES ===
+
+    def _resolve(self, handle: int) -> Optional[int]:
+        slot = handle_index(handle)
+        if (slot < len(self._generation)
+                and self._generation[slot] == handle_generation(handle)
+                and self._slot_dense[slot] >= 0):
+            return slot
+        return None
+
+    def get(self, handle: int):
+        """Object behind a handle, or None if it was removed"""
+        slot = self._resolve(handle)
+        return None if slot is None else self._dense[self._slot_dense[slot]]
+
+    def handle_of(self, obj) -> Optional[int]:
+        slot = self._slot_of.get(id(obj))
+        return None if slot is None else make_handle(slot, self._generation[slot])
+
+    def is_pending(self, obj) -> bool:
+        return self._slot_of.get(id(obj)) in self._pending
+
+    # === LIST PROTOCOL ===
+
+    def __iter__(self) -> Iterator:
+        """Live objects in dense order (no copy; objects added meanwhile are visited)"""
+        pending = self._pending
+        slots = self._dense_slot
+        for position, obj in enumerate(self._dense):
+            if not pending or slots[position] not in pending:
+                yield obj
+
+    def __len__(self) -> int:
+        """Live objects - those marked for removal no longer count"""
+        return len(self._dense) - len(self._pending)
+
+    def __bool__(self) -> bool:
+        return len(self) > 0
+
+    def __contains__(self, obj) -> bool:
+        slot = self._slot_of.get(id(obj))
+        return slot is not None and slot not in self._pending
+
+    def __repr__(self):
+        return f"EntityList({list(self)!r})"
+
+
+# Export classes
+__all__ = ['EntityList']
@@ -0,0 +1,124 @@
+"""
+Crowd Simulation
+Batched update of large enemy populations: a precomputed collider grid for
+platform landing and rect write-back limited to what is on screen
+"""
+import numpy as np
+from config import SCREEN_WIDTH
+from ecs import ComponentStore, KIND_ENEMY
+from kernels import grid_first_overlap
+from typing import List, Optional
+
+
+class ColliderGrid:
+    """
+    Static colliders bucketed into vertical strips of cell_width pixels
+    A collider is listed in every strip it covers and in the strip to its
+    left, so a box no wider than cell_width only needs the strip under its
+    left edge. Ids are kept in ascending order (padded with -1), so "first
+    overlapping collider" keeps the same meaning as a linear scan
+    """
+    __slots__ = ('colliders', 'cell_width', 'origin', 'table', 'edges')
+
+    def __init__(self, colliders: np.ndarray, cell_width: int = 128):
+        self.colliders = np.asarray(colliders, dtype=np.float64).reshape(-1, 4)
+        self.cell_width = cell_width
+        if len(self.colliders) == 0:
+            self.origin = 0.0
+            self.table = np.full((1, 1), -1, dtype=np.int64)
+            self.edges = np.array([np.inf, np.inf, -np.inf, -np.inf]).reshape(4, 1, 1)
+            return
+
+        self.origin = float(np.floor(self.colliders[:, 0].min() / cell_width) * cell_width
+                            - cell_width)
+        first = self._cell(self.colliders[:, 0] - cell_width)
+        last = self._cell(self.colliders[:, 2] - 1)
+        cells = int(last.max()) + 1
+        spans = last - first + 1
+
+        # Expand every collider to all strips it reaches, then bucket by strip
+        ids = np.repeat(np.arange(len(self.colliders)), spans)
+        offsets = np.arange(spans.sum()) - np.repeat(np.cumsum(spans) - spans, spans)
+        cell_ids = np.repeat(first, spans) + offsets
+        order = np.lexsort((ids, cell_ids))
+        ids, cell_ids = ids[order], cell_ids[order]
+
+        counts = np.bincount(cell_ids, minlength=cells)
+        depth = max(1, int(counts.max()))
+        self.table = np.full((cells, depth), -1, dtype=np.int64)
+        column = np.arange(len(ids)) - np.repeat(np.cumsum(counts) - counts, counts)
+        self.table[cell_ids, column] = ids
+
+        # Coordinates laid out like the table; padding can never overlap
+        self.edges = self.colliders[np.maximum(self.table, 0)].transpose(2, 0, 1).copy()
+        self.edges[:, self.table < 0] = np.array([np.inf, np.inf, -np.inf, -np.inf])[:, None]
+
+    def __len__(self):
+        return len(self.colliders)
+
+    def _cell(self, x: np.ndarray) -> np.ndarray:
+        return np.floor((x - self.origin) / self.cell_width).astype(np.int64)
+
+    def candidates(self, left: np.ndarray) -> np.ndarray:
+        """Strip of each box's left edge (row into table and edges)"""
+        return np.clip(self._cell(left), 0, len(self.table) - 1)
+
+    def first_hit(self, left: np.ndarray, top: np.ndarray, right: np.ndarray,
+                  bottom: np.ndarray) -> np.ndarray:
+        """
+        Lowest collider id overlapping each box, -1 where none does
+        Boxes must not be wider than cell_width
+        """
+        return grid_first_overlap(left, top, right, bottom, self.candidates(left),
+                                  self.table, self.edges, self.colliders)
+
+
+class CrowdSimulation:
+    """
+    Advances every enemy of one kind in a store with array operations and
+    materializes rects only for enemies that are on screen
+    """
+    __slots__ = ('store', 'grid', 'kind', 'visible')
+
+    def __init__(self, store: ComponentStore, grid: ColliderGrid, kind: int = KIND_ENEMY):
+        self.store = store
+        self.grid = grid
+        self.kind = kind
+        self.visible: List = []
+
+    def step(self, index: Optional[np.ndarray] = None, dt: Optional[np.ndarray] = None):
+        """Patrol, gravity with terminal velocity, platform landing and floor clamp"""
+        if index is None:
+            index = self.store.live(self.kind)
+        else:
+            index = index[self.store.kind[index] == self.kind]
+        self.store.step(self.grid, index, dt)
+
+    def sync_visible(self, camera_x: float) -> List:
+        """
+        Write positions back to the rects of on-screen enemies only
+        Returns their views (ready for drawing)
+        """
+        store = self.store
+        index = store.live(self.kind, include_sleeping=True)
+        x = store.pos[index, 0]
+        on_screen = index[(x + store.size[index, 0] >= camera_x) &
+                          (x <= camera_x + SCREEN_WIDTH)]
+        views = store._views
+        tick = store.tick
+        visible = []
+        for i, (x, y) in zip(on_screen.tolist(), store.pos[on_screen].tolist()):
+            view = views[i]
+            if view is None:
+                continue
+            rect = view._rect
+            rect.x = int(x)
+            rect.y = int(y)
+            view._rect_tick = tick
+            visible.append(view)
+        self.visible = visible
+        return visible
+
+
+# Export classes
+__all__ = ['ColliderGrid', 'CrowdSimulation']
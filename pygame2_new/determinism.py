@@ -0,0 +1,170 @@
+"""
+Deterministic Simulation
+Seeded random streams per subsystem, per-tick input frames and a running
+hash of the simulation state: with a seed, a run is a pure function of its
+input frames, so runs can be cached, replayed and compared tick by tick
+"""
+import hashlib
+import random
+import struct
+from typing import Dict, List, Optional, Sequence
+import numpy as np
+import pygame
+
+
+def _derive_seed(seed: int, name: str) -> int:
+    # Not hash(): string hashes are salted per process
+    digest = hashlib.blake2b(f"{seed}:{name}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, 'little')
+
+
+class RandomStreams:
+    """
+    Independent random.Random per subsystem derived from one master seed
+    Adding draws in one subsystem does not shift the numbers another gets.
+    seed=None seeds every stream from OS entropy (normal play).
+    """
+    __slots__ = ('seed', '_streams')
+
+    def __init__(self, seed: Optional[int] = None):
+        self.seed = seed
+        self._streams: Dict[str, random.Random] = {}
+
+    def get(self, name: str) -> random.Random:
+        """Stream of one subsystem; the same object survives reseed()"""
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = random.Random(self._seed_for(name))
+        return stream
+
+    def reseed(self, seed: Optional[int]):
+        self.seed = seed
+        for name, stream in self._streams.items():
+            stream.seed(self._seed_for(name))
+
+    def getstate(self) -> Dict[str, tuple]:
+        """States of all streams (a snapshot restores them with setstate())"""
+        return {name: stream.getstate() for name, stream in self._streams.items()}
+
+    def setstate(self, states: Dict[str, tuple]):
+        for name, state in states.items():
+            self.get(name).setstate(state)
+
+    def _seed_for(self, name: str) -> Optional[int]:
+        return None if self.seed is None else _derive_seed(self.seed, name)
+
+
+# Process-wide streams; Game(seed=...) reseeds them
+streams = RandomStreams()
+
+
+def stream(name: str) -> random.Random:
+    return streams.get(name)
+
+
+class InputFrame:
+    """
+    Input of one tick: held directions and key presses
+    Indexable like pygame.key.get_pressed(), so Player reads it directly.
+    """
+    __slots__ = ('left', 'right', 'jump', 'shoot')
+
+    _BITS = ('left', 'right', 'jump', 'shoot')
+
+    def __init__(self, left: bool = False, right: bool = False,
+                 jump: bool = False, shoot: bool = False):
+        self.left = left
+        self.right = right
+        self.jump = jump      # Pressed this tick (KEYDOWN), not held
+        self.shoot = shoot
+
+    @classmethod
+    def from_keyboard(cls, keys, jump: bool = False, shoot: bool = False) -> 'InputFrame':
+        """Frame from pygame.key.get_pressed() and this tick's key presses"""
+        return cls(bool(keys[pygame.K_LEFT] or keys[pygame.K_a]),
+                   bool(keys[pygame.K_RIGHT] or keys[pygame.K_d]), jump, shoot)
+
+    def __getitem__(self, key: int) -> bool:
+        if key == pygame.K_LEFT or key == pygame.K_a:
+            return self.left
+        if key == pygame.K_RIGHT or key == pygame.K_d:
+            return self.right
+        return False
+
+    def pack(self) -> int:
+        """4-bit code for compact recordings"""
+        return sum(1 << bit for bit, name in enumerate(self._BITS) if getattr(self, name))
+
+    @classmethod
+    def unpack(cls, code: int) -> 'InputFrame':
+        return cls(*(bool(code >> bit & 1) for bit in range(len(cls._BITS))))
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, InputFrame) and self.pack() == other.pack()
+
+    def __hash__(self) -> int:
+        return self.pack()
+
+    def __repr__(self):
+        held = [name for name in self._BITS if getattr(self, name)]
+        return f"InputFrame({'+'.join(held) or 'idle'})"
+
+
+IDLE = InputFrame()
+
+_STATES = {"playing": 0, "level_complete": 1, "game_over": 2, "win": 3}
+
+
+class StateHasher:
+    """
+    Running 64-bit digest of the simulation state
+    digest(n) = H(digest(n-1) + state(n)), so equal digests at tick n mean
+    equal histories up to n. Cosmetic state (particles, effects) is left out.
+    """
+    __slots__ = ('digest', 'ticks', 'history')
+
+    def __init__(self, keep_history: bool = False):
+        self.digest = 0
+        self.ticks = 0
+        self.history: Optional[List[int]] = [] if keep_history else None
+
+    def update(self, game) -> int:
+        hasher = hashlib.blake2b(self.digest.to_bytes(8, 'little'), digest_size=8)
+        player = game.player
+        hasher.update(struct.pack(
+            '<4i2d?B6i4q',
+            *player.rect, player.velocity_x, player.velocity_y, player.on_ground,
+            player.power_state, player.speed_boost_timer, player.invincible_timer,
+            player.transform_timer, player.shoot_cooldown, game.combo_timer, game.combo,
+            game.score, game.time_remaining, game.lives, game.current_level))
+        hasher.update(struct.pack('<Bq', _STATES.get(game.game_state, 255), game.timers.now))
+        for store in (game.level.store, player.fireball_store):
+            count = store.count
+            for array in (store.pos, store.vel, store.flags, store.timer):
+                hasher.update(np.ascontiguousarray(array[:count]).data)
+        hasher.update(struct.pack('<4i', len(game.level.coins), len(game.level.mushrooms),
+                                  len(game.level.flowers), len(game.level.powerups)))
+        self.digest = int.from_bytes(hasher.digest(), 'little')
+        self.ticks += 1
+        if self.history is not None:
+            self.history.append(self.digest)
+        return self.digest
+
+    def reset(self):
+        self.digest = 0
+        self.ticks = 0
+        if self.history is not None:
+            self.history.clear()
+
+
+def first_divergence(a: Sequence[int], b: Sequence[int]) -> Optional[int]:
+    """First tick where two digest histories differ (None if one is a prefix of the other)"""
+    for tick, (left, right) in enumerate(zip(a, b)):
+        if left != right:
+            return tick
+    return None
+
+
+# Export classes
+__all__ = ['RandomStreams', 'streams', 'stream', 'InputFrame', 'IDLE', 'StateHasher',
+           'first_divergence']
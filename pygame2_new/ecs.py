@@ -0,0 +1,544 @@
+"""
+Entity Component Store
+Keeps the physics state of dynamic objects in contiguous NumPy arrays
+and advances whole arrays at once with systems
+"""
+import numpy as np
+import pygame
+from config import GRAVITY, SCREEN_HEIGHT, GROUND_HEIGHT
+from kernels import first_overlap
+from typing import List, Optional, Sequence, Tuple
+
+# Entity kinds
+KIND_NONE = 0
+KIND_ENEMY = 1
+KIND_MUSHROOM = 2
+KIND_FIREBALL = 3
+
+# Flag bits
+F_ALIVE = 1       # Slot is simulated
+F_ON_GROUND = 2   # Landed on a platform or the floor this tick
+F_PATROL = 4      # Walks back and forth around start_x
+F_SPAWNING = 8    # Frozen until timer counts down to zero
+F_EXPIRES = 16    # Dies when timer counts down to zero
+F_SLEEPING = 32   # Outside the simulation region, skipped by step()
+
+INDEX_BITS = 24
+INDEX_MASK = (1 << INDEX_BITS) - 1
+
+
+def make_handle(index: int, generation: int) -> int:
+    """Pack slot index and generation into a single stable handle"""
+    return (generation << INDEX_BITS) | index
+
+
+def handle_index(handle: int) -> int:
+    return handle & INDEX_MASK
+
+
+def handle_generation(handle: int) -> int:
+    return handle >> INDEX_BITS
+
+
+def snap(values: np.ndarray) -> np.ndarray:
+    """Round half away from zero - same as assigning a float to pygame.Rect"""
+    return np.copysign(np.floor(np.abs(values) + 0.5), values)
+
+
+def colliders_from_rects(objects: Sequence) -> np.ndarray:
+    """Build an (M, 4) array of left, top, right, bottom from objects with .rect"""
+    colliders = np.empty((len(objects), 4), dtype=np.float64)
+    for i, obj in enumerate(objects):
+        rect = obj.rect
+        colliders[i] = (rect.left, rect.top, rect.right, rect.bottom)
+    return colliders
+
+
+class ComponentStore:
+    """
+    Structure-of-arrays storage for dynamic entities
+
+    Every entity owns one slot. Slots are recycled through a free list and
+    addressed by generational handles, so a handle to a destroyed entity
+    never aliases the entity that reuses its slot.
+    """
+    def __init__(self, capacity: int = 64):
+        self.capacity = 0
+        self.count = 0  # High-water mark of used slots
+        self.tick = 0   # Bumped after every step, views use it to refresh rects
+        self._free: List[int] = []
+        self._views: List[Optional["StoreView"]] = []
+
+        # Transform
+        self.pos = np.zeros((0, 2), dtype=np.float64)
+        self.vel = np.zeros((0, 2), dtype=np.float64)
+        self.size = np.zeros((0, 2), dtype=np.float64)
+
+        # Identity
+        self.flags = np.zeros(0, dtype=np.uint8)
+        self.kind = np.zeros(0, dtype=np.int8)
+        self.generation = np.zeros(0, dtype=np.uint32)
+
+        # Physics parameters
+        self.gravity = np.zeros(0, dtype=np.float64)
+        self.max_fall = np.zeros(0, dtype=np.float64)
+        self.bounce = np.zeros(0, dtype=np.float64)  # vy after landing
+
+        # Per-type state
+        self.start_x = np.zeros(0, dtype=np.float64)
+        self.move_range = np.zeros(0, dtype=np.float64)
+        self.speed = np.zeros(0, dtype=np.float64)
+        self.timer = np.zeros(0, dtype=np.int32)
+
+        self._grow(capacity)
+
+    _ARRAYS = ('pos', 'vel', 'size', 'flags', 'kind', 'generation', 'gravity',
+               'max_fall', 'bounce', 'start_x', 'move_range', 'speed', 'timer')
+    _STATE = tuple(name for name in _ARRAYS if name != 'generation')
+
+    def _grow(self, capacity: int):
+        """Reallocate all component arrays to the new capacity"""
+        for name in self._ARRAYS:
+            old = getattr(self, name)
+            new = np.zeros((capacity,) + old.shape[1:], dtype=old.dtype)
+            new[:self.capacity] = old[:self.capacity]
+            setattr(self, name, new)
+        self._views.extend([None] * (capacity - self.capacity))
+        self.capacity = capacity
+
+    # === LIFETIME ===
+
+    def create(self, kind: int, x: float, y: float, width: float, height: float,
+               velocity_x: float = 0.0, velocity_y: float = 0.0, flags: int = F_ALIVE,
+               gravity: float = GRAVITY, max_fall: float = 20.0, bounce: float = 0.0,
+               move_range: float = 0.0, speed: float = 0.0, timer: int = 0) -> int:
+        """Allocate a slot and return its handle"""
+        if self._free:
+            index = self._free.pop()
+        else:
+            if self.count == self.capacity:
+                self._grow(max(1, self.capacity * 2))
+            index = self.count
+            self.count += 1
+
+        self.pos[index] = (x, y)
+        self.vel[index] = (velocity_x, velocity_y)
+        self.size[index] = (width, height)
+        self.flags[index] = flags | F_ALIVE
+        self.kind[index] = kind
+        self.gravity[index] = gravity
+        self.max_fall[index] = max_fall
+        self.bounce[index] = bounce
+        self.start_x[index] = x
+        self.move_range[index] = move_range
+        self.speed[index] = speed
+        self.timer[index] = timer
+        return make_handle(index, int(self.generation[index]))
+
+    def destroy(self, handle: int):
+        """Free a slot; stale handles are ignored"""
+        if not self.is_valid(handle):
+            return
+        index = handle_index(handle)
+        view = self._views[index]
+        if view is not None:
+            self._views[index] = None
+            view._detach()
+        self.flags[index] = 0
+        self.kind[index] = KIND_NONE
+        self.generation[index] += 1
+        self._free.append(index)
+
+    def is_valid(self, handle: int) -> bool:
+        index = handle_index(handle)
+        return (index < self.count
+                and int(self.generation[index]) == handle_generation(handle)
+                and self.kind[index] != KIND_NONE)
+
+    def index(self, handle: int) -> int:
+        """Resolve a handle to its slot index"""
+        if not self.is_valid(handle):
+            raise KeyError(f"Stale entity handle {handle:#x}")
+        return handle_index(handle)
+
+    def bind(self, handle: int, view: "StoreView"):
+        """Attach the view that is notified when the slot is destroyed"""
+        self._views[self.index(handle)] = view
+
+    def view(self, handle: int) -> Optional["StoreView"]:
+        return self._views[self.index(handle)]
+
+    def live(self, kind: Optional[int] = None, include_sleeping: bool = False) -> np.ndarray:
+        """Indices of simulated slots, optionally of a single kind"""
+        flags = self.flags[:self.count]
+        mask = (flags & F_ALIVE) != 0
+        if not include_sleeping:
+            mask &= (flags & F_SLEEPING) == 0
+        if kind is not None:
+            mask &= self.kind[:self.count] == kind
+        return np.flatnonzero(mask)
+
+    def views(self, index: np.ndarray, kind: Optional[int] = None) -> list:
+        """Views bound to the given slots, optionally filtered by kind"""
+        return self.bound(index, kind)[1]
+
+    def bound(self, index: np.ndarray, kind: Optional[int] = None) -> Tuple[np.ndarray, list]:
+        """Slots that have a view and their views, in the same order"""
+        if kind is not None:
+            index = index[self.kind[index] == kind]
+        views = self._views
+        has_view = np.array([views[i] is not None for i in index.tolist()], dtype=bool)
+        index = index[has_view] if len(index) else index
+        return index, [views[i] for i in index.tolist()]
+
+    def boxes(self, index: np.ndarray) -> np.ndarray:
+        """(N, 4) left, top, right, bottom of the given slots (as their rects)"""
+        boxes = np.empty((len(index), 4), dtype=np.float64)
+        boxes[:, :2] = np.trunc(self.pos[index])
+        boxes[:, 2:] = boxes[:, :2] + self.size[index]
+        return boxes
+
+    def save_state(self, handle: int) -> tuple:
+        """Components of one entity (e.g. before unloading it with its chunk)"""
+        index = self.index(handle)
+        return tuple(getattr(self, name)[index].copy() for name in self._STATE)
+
+    def load_state(self, handle: int, state: tuple):
+        """Restore components saved by save_state() into a live entity"""
+        index = self.index(handle)
+        for name, value in zip(self._STATE, state):
+            getattr(self, name)[index] = value
+        view = self._views[index]
+        if view is not None:
+            view._rect_tick = -1  # Position changed behind the view's back
+
+    def write_snapshot(self, out):
+        """All slots up to the high-water mark (see snapshot.py)"""
+        out.pack("IQ", self.count, self.tick)
+        out.array(self._free, np.int64)
+        for name in self._ARRAYS:
+            array = getattr(self, name)
+            out.array(array[:self.count], array.dtype)
+
+    def read_snapshot(self, src):
+        """
+        Replace every slot with the snapshot's
+        All views are detached; the owner re-attaches the views of the
+        snapshot's entities (StoreView.attach)
+        """
+        for view in self._views:
+            if view is not None:
+                view._detach()
+        self._views = [None] * self.capacity
+        count, tick = src.unpack("IQ")
+        free = src.array(np.int64).tolist()
+        if count > self.capacity:
+            self._grow(count)
+        for name in self._ARRAYS:
+            array = getattr(self, name)
+            array[:count] = src.array(array.dtype)
+            array[count:self.count] = 0  # Slots the snapshot never used
+        self.count = count
+        self.tick = tick
+        self._free = free
+
+    def __len__(self):
+        return self.count - len(self._free)
+
+    # === SIMULATION ===
+
+    def step(self, colliders: Optional[np.ndarray] = None,
+             index: Optional[np.ndarray] = None, dt: Optional[np.ndarray] = None):
+        """
+        Advance entities by one tick
+        index - slots to advance (default: every live slot)
+        dt - ticks to catch up per slot (default: 1 for everyone)
+        """
+        if index is None:
+            index = self.live()
+        if len(index):
+            moving = spawn_system(self, index, 1 if dt is None else dt)
+            if not moving.all():
+                index = index[moving]
+                if dt is not None:
+                    dt = dt[moving]
+            expire_system(self, index, 1 if dt is None else dt)
+            lagging = None if dt is None else dt > 1
+            if lagging is None or not lagging.any():
+                gravity_system(self, index)
+                integrate_system(self, index)
+                swept_dy = None
+            else:
+                # Only the slots behind take the multi-tick path
+                current = index[~lagging]
+                gravity_system(self, current)
+                integrate_system(self, current)
+                swept_dy = np.zeros(len(index))
+                swept_dy[lagging] = catch_up_system(self, index[lagging], dt[lagging])
+            patrol_system(self, index)
+            ground_collision_system(self, index, colliders, swept_dy)
+        self.tick += 1
+
+
+# === SYSTEMS ===
+
+def first_hit(colliders, left: np.ndarray, top: np.ndarray, right: np.ndarray,
+              bottom: np.ndarray) -> np.ndarray:
+    """
+    Index of the first collider overlapping each box, -1 where none does
+    colliders - (M, 4) array, or any object with a first_hit() broadphase
+                (crowd.ColliderGrid)
+    """
+    if hasattr(colliders, 'first_hit'):
+        return colliders.first_hit(left, top, right, bottom)
+    return first_overlap(left, top, right, bottom, colliders)
+
+
+def spawn_system(store: ComponentStore, index: np.ndarray, dt=1) -> np.ndarray:
+    """Count down spawning entities; returns a mask of slots that take part in physics"""
+    spawning = (store.flags[index] & F_SPAWNING) != 0
+    if not spawning.any():
+        return ~spawning
+    frozen = index[spawning]
+    store.timer[frozen] -= dt if np.isscalar(dt) else dt[spawning]
+    done = frozen[store.timer[frozen] <= 0]
+    store.flags[done] &= np.uint8(~F_SPAWNING & 0xFF)
+    return ~spawning
+
+
+def expire_system(store: ComponentStore, index: np.ndarray, dt=1):
+    """Count down lifetimes; expired entities stop being simulated next tick"""
+    expires = (store.flags[index] & F_EXPIRES) != 0
+    expiring = index[expires]
+    if len(expiring):
+        store.timer[expiring] -= dt if np.isscalar(dt) else dt[expires]
+        dead = expiring[store.timer[expiring] <= 0]
+        store.flags[dead] &= np.uint8(~F_ALIVE & 0xFF)
+
+
+def gravity_system(store: ComponentStore, index: np.ndarray):
+    """Apply gravity with a per-entity terminal velocity"""
+    store.vel[index, 1] = np.minimum(store.vel[index, 1] + store.gravity[index],
+                                     store.max_fall[index])
+
+
+def integrate_system(store: ComponentStore, index: np.ndarray):
+    """Move by velocity, snapped to whole pixels like pygame.Rect"""
+    store.pos[index] = snap(store.pos[index] + store.vel[index])
+
+
+def catch_up_system(store: ComponentStore, index: np.ndarray, dt: np.ndarray) -> np.ndarray:
+    """
+    Gravity + integration over dt ticks in one go
+    The ticks are replayed with whole-pixel snapping and patrol reversals on
+    every tick (at most one LOD period, and only for the slots behind), so an
+    entity updated every Nth tick follows the same trajectory as one updated
+    every tick. Returns the vertical displacement.
+    """
+    x = store.pos[index, 0]
+    y = store.pos[index, 1]
+    vx = store.vel[index, 0]
+    vy = store.vel[index, 1]
+    g = store.gravity[index]
+    v_max = store.max_fall[index]
+    patrol = (store.flags[index] & F_PATROL) != 0
+    low = store.start_x[index] - store.move_range[index]
+    high = store.start_x[index] + store.move_range[index]
+    speed = store.speed[index]
+    for tick in range(int(dt.max(initial=0))):
+        moving = dt > tick
+        vy = np.where(moving, np.minimum(vy + g, v_max), vy)
+        x = np.where(moving, snap(x + vx), x)
+        y = np.where(moving, snap(y + vy), y)
+        turning = moving & patrol
+        vx = np.where(turning & (x > high), -speed,
+                      np.where(turning & (x < low), speed, vx))
+    old_y = store.pos[index, 1]
+    store.pos[index, 0] = x
+    store.pos[index, 1] = y
+    store.vel[index, 0] = vx
+    store.vel[index, 1] = vy
+    return y - old_y
+
+
+def patrol_system(store: ComponentStore, index: np.ndarray):
+    """Reverse patrolling entities at start_x +- move_range"""
+    patrol = index[(store.flags[index] & F_PATROL) != 0]
+    if not len(patrol):
+        return
+    x = store.pos[patrol, 0]
+    store.vel[patrol, 0] = np.where(
+        x > store.start_x[patrol] + store.move_range[patrol], -store.speed[patrol],
+        np.where(x < store.start_x[patrol] - store.move_range[patrol],
+                 store.speed[patrol], store.vel[patrol, 0]))
+
+
+def ground_collision_system(store: ComponentStore, index: np.ndarray,
+                            colliders: Optional[np.ndarray],
+                            swept_dy: Optional[np.ndarray] = None):
+    """
+    Land falling entities on the first overlapping collider and clamp to the floor
+    colliders - (M, 4) array of left, top, right, bottom, or a ColliderGrid
+    swept_dy - vertical move of a multi-tick step; the hitbox is stretched
+               over it so catch-up moves cannot tunnel through platforms
+    """
+    store.flags[index] &= np.uint8(~F_ON_GROUND & 0xFF)
+
+    if colliders is not None and len(colliders):
+        is_falling = store.vel[index, 1] > 0
+        falling = index[is_falling]
+        if len(falling):
+            left = store.pos[falling, 0]
+            top = store.pos[falling, 1]
+            right = left + store.size[falling, 0]
+            bottom = top + store.size[falling, 1]
+            if swept_dy is not None:
+                top = top - np.maximum(swept_dy[is_falling], 0)
+            first = first_hit(colliders, left, top, right, bottom)
+            landed = first >= 0
+            if landed.any():
+                boxes = getattr(colliders, 'colliders', colliders)
+                rows = falling[landed]
+                store.pos[rows, 1] = boxes[first[landed], 1] - store.size[rows, 1]
+                store.vel[rows, 1] = store.bounce[rows]
+                store.flags[rows] |= F_ON_GROUND
+
+    ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
+    below = index[store.pos[index, 1] + store.size[index, 1] >= ground_y]
+    if len(below):
+        store.pos[below, 1] = ground_y - store.size[below, 1]
+        store.vel[below, 1] = store.bounce[below]
+        store.flags[below] |= F_ON_GROUND
+
+
+class StoreView:
+    """
+    Thin object facade over one store slot
+    Keeps the rect/velocity_x/velocity_y interface the game code uses
+    """
+    __slots__ = ('store', 'handle', '_rect', '_rect_tick')
+
+    def __init__(self, store: Optional[ComponentStore], kind: int, x: float, y: float,
+                 width: int, height: int, **components):
+        self.handle: Optional[int] = None
+        self._rect = pygame.Rect(int(x), int(y), width, height)
+        self._bind(store, kind, x, y, width, height, **components)
+
+    def _bind(self, store: Optional[ComponentStore], kind: int, x: float, y: float,
+              width: int, height: int, **components):
+        """Allocate a fresh slot (also used when a pooled view is reset)"""
+        self.release()
+        if store is None:
+            store = ComponentStore(capacity=1)
+        self.store = store
+        self.handle = store.create(kind, x, y, width, height, **components)
+        store.bind(self.handle, self)
+        self._rect.update(int(x), int(y), width, height)
+        self._rect_tick = store.tick
+
+    def attach(self, store: ComponentStore, handle: int):
+        """Bind the view to an existing slot (e.g. after a snapshot restore)"""
+        self.store = store
+        self.handle = handle
+        store.bind(handle, self)
+        index = handle_index(handle)
+        x, y = store.pos[index]
+        width, height = store.size[index]
+        self._rect = pygame.Rect(int(x), int(y), int(width), int(height))
+        self._rect_tick = store.tick
+
+    @classmethod
+    def attached(cls, store: ComponentStore, handle: int) -> "StoreView":
+        """View of an existing slot without running __init__; subclass fields are up to the caller"""
+        view = cls.__new__(cls)
+        view.attach(store, handle)
+        return view
+
+    @property
+    def slot(self) -> int:
+        return self.store.index(self.handle)
+
+    @property
+    def rect(self) -> pygame.Rect:
+        """Materialized lazily - only objects that are looked at pay for it"""
+        if self.handle is not None and self._rect_tick != self.store.tick:
+            x, y = self.store.pos[handle_index(self.handle)]
+            self._rect.x = int(x)
+            self._rect.y = int(y)
+            self._rect_tick = self.store.tick
+        return self._rect
+
+    def _set_component(self, name: str, column, value):
+        if self.handle is not None:
+            array = getattr(self.store, name)
+            if column is None:
+                array[handle_index(self.handle)] = value
+            else:
+                array[handle_index(self.handle), column] = value
+
+    def _get_component(self, name: str, column, default):
+        if self.handle is None:
+            return default
+        array = getattr(self.store, name)
+        if column is None:
+            return array[handle_index(self.handle)].item()
+        return array[handle_index(self.handle), column].item()
+
+    @property
+    def velocity_x(self) -> float:
+        return self._get_component('vel', 0, 0.0)
+
+    @velocity_x.setter
+    def velocity_x(self, value: float):
+        self._set_component('vel', 0, value)
+
+    @property
+    def velocity_y(self) -> float:
+        return self._get_component('vel', 1, 0.0)
+
+    @velocity_y.setter
+    def velocity_y(self, value: float):
+        self._set_component('vel', 1, value)
+
+    @property
+    def timer(self) -> int:
+        return self._get_component('timer', None, 0)
+
+    def has_flag(self, flag: int) -> bool:
+        return bool(self._get_component('flags', None, 0) & flag)
+
+    @property
+    def is_active(self) -> bool:
+        """False while the entity sleeps outside the simulation region"""
+        return self.handle is not None and not self.has_flag(F_SLEEPING)
+
+    def move_to(self, x: float, y: float):
+        """Teleport the entity (writes through to the store)"""
+        self._set_component('pos', None, (x, y))
+        self._rect.x = int(x)
+        self._rect.y = int(y)
+
+    def step(self, platforms: Sequence):
+        """Advance only this entity - use ComponentStore.step for batches"""
+        if self.handle is None:
+            return
+        index = np.array([handle_index(self.handle)])
+        self.store.step(colliders_from_rects(platforms), index)
+
+    def release(self):
+        """Return the slot to the store; the view keeps its last rect"""
+        if self.handle is not None:
+            self.store.destroy(self.handle)
+
+    def _detach(self):
+        """Called by the store when the slot is destroyed"""
+        self.rect  # Final sync
+        self.handle = None
+
+
+# Export classes
+__all__ = ['ComponentStore', 'StoreView', 'colliders_from_rects', 'snap',
+           'gravity_system', 'integrate_system', 'catch_up_system', 'patrol_system',
+           'ground_collision_system', 'first_hit', 'spawn_system', 'expire_system',
+           'KIND_ENEMY', 'KIND_MUSHROOM', 'KIND_FIREBALL',
+           'F_ALIVE', 'F_ON_GROUND', 'F_PATROL', 'F_SPAWNING', 'F_EXPIRES', 'F_SLEEPING']
@@ -1,50 +1,28 @@
 import pygame
 from config import *
+from ecs import StoreView, KIND_ENEMY, F_PATROL
 
-class Enemy:
-    def __init__(self, x, y, move_range=100):
-        self.rect = pygame.Rect(x, y, ENEMY_WIDTH, ENEMY_HEIGHT)
-        self.velocity_x = ENEMY_SPEED
-        self.velocity_y = 0
+class Enemy(StoreView):
+    """Goomba - fyzikální stav žije v ComponentStore levelu"""
+    __slots__ = ('start_x', 'move_range', 'alive')
+    
+    def __init__(self, x, y, move_range=100, store=None):
+        super().__init__(store, KIND_ENEMY, x, y, ENEMY_WIDTH, ENEMY_HEIGHT,
+                         velocity_x=ENEMY_SPEED, flags=F_PATROL,
+                         move_range=move_range, speed=ENEMY_SPEED)
         self.start_x = x
         self.move_range = move_range
         self.alive = True
         
     def update(self, platforms):
+        """Samostatný update jednoho nepřítele (Level.update_entities je dávkový)"""
         if not self.alive:
             return
-            
-        # Pohyb tam a zpět
-        self.rect.x += self.velocity_x
-        
-        # Kontrola hranic pohybu
-        if self.rect.x > self.start_x + self.move_range:
-            self.velocity_x = -ENEMY_SPEED
-        elif self.rect.x < self.start_x - self.move_range:
-            self.velocity_x = ENEMY_SPEED
-            
-        # Gravitace
-        self.velocity_y += GRAVITY
-        if self.velocity_y > 20:
-            self.velocity_y = 20
-            
-        self.rect.y += self.velocity_y
-        
-        # Kolize s platformami
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                if self.velocity_y > 0:
-                    self.rect.bottom = platform.rect.top
-                    self.velocity_y = 0
-                    
-        # Kolize se zemí
-        ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
-        if self.rect.bottom >= ground_y:
-            self.rect.bottom = ground_y
-            self.velocity_y = 0
+        self.step(platforms)
             
     def kill(self):
         self.alive = False
+        self.release()
         
     def draw(self, screen, camera_x):
         if not self.alive:
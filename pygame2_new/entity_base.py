@@ -2,14 +2,18 @@
 Entity Base Classes
 Provides foundation for all game entities (Player, Enemies, Items)
 """
+import numpy as np
 import pygame
 from config import GRAVITY, SCREEN_HEIGHT, GROUND_HEIGHT
-from typing import List, Tuple
+from typing import Iterable, List, Tuple
 from dataclasses import dataclass
 
-@dataclass
+@dataclass(slots=True)
 class Vector2D:
-    """2D Vector for position and velocity"""
+    """
+    2D Vector for position and velocity
+    Operators allocate a new vector, the in-place methods mutate and return self
+    """
     x: float = 0.0
     y: float = 0.0
     
@@ -27,6 +31,45 @@ class Vector2D:
         if mag > 0:
             return Vector2D(self.x / mag, self.y / mag)
         return Vector2D(0, 0)
+    
+    # === IN-PLACE API (no allocation) ===
+    
+    def set(self, x: float, y: float):
+        self.x = x
+        self.y = y
+        return self
+    
+    def iadd(self, other):
+        """self += other"""
+        self.x += other.x
+        self.y += other.y
+        return self
+    
+    def scale_(self, scalar: float):
+        """self *= scalar"""
+        self.x *= scalar
+        self.y *= scalar
+        return self
+    
+    def add_scaled(self, other, scalar: float):
+        """Fused self += other * scalar"""
+        self.x += other.x * scalar
+        self.y += other.y * scalar
+        return self
+    
+    def normalize_(self):
+        """Normalize in place (zero vector stays zero)"""
+        mag = self.magnitude()
+        if mag > 0:
+            self.x /= mag
+            self.y /= mag
+        return self
+    
+    __iadd__ = iadd
+
+
+# Shared constant vector - never mutate
+GRAVITY_VECTOR = Vector2D(0.0, GRAVITY)
 
 
 class Entity:
@@ -34,6 +77,9 @@ class Entity:
     Abstract base class for all game entities
     Provides common physics and collision properties
     """
+    __slots__ = ('position', 'velocity', 'acceleration', 'rect', 'hitbox_offset',
+                 'is_alive', 'is_active', 'gravity_scale', 'friction')
+    
     def __init__(self, x: float, y: float, width: int, height: int):
         # Transform
         self.position = Vector2D(x, y)
@@ -54,8 +100,9 @@ class Entity:
         
     def apply_gravity(self, delta_time: float = 1.0):
         """Apply gravity to entity"""
-        self.velocity.y += GRAVITY * self.gravity_scale * delta_time
-        self.velocity.y = min(self.velocity.y, 20)  # Terminal velocity
+        self.velocity.add_scaled(GRAVITY_VECTOR, self.gravity_scale * delta_time)
+        if self.velocity.y > 20:  # Terminal velocity
+            self.velocity.y = 20
     
     def apply_friction(self):
         """Apply friction to horizontal movement"""
@@ -63,8 +110,7 @@ class Entity:
     
     def update_position(self, delta_time: float = 1.0):
         """Update position based on velocity"""
-        self.position.x += self.velocity.x * delta_time
-        self.position.y += self.velocity.y * delta_time
+        self.position.add_scaled(self.velocity, delta_time)
         
         # Sync rect with position
         self.rect.x = int(self.position.x + self.hitbox_offset.x)
@@ -106,7 +152,11 @@ class BaseEnemy(Entity):
     Base class for all enemy types
     Implements common enemy behavior patterns
     """
-    def __init__(self, x: float, y: float, width: int, height: int):
+    __slots__ = ('direction', 'move_speed', 'start_x', 'patrol_range', 'is_stomped',
+                 'death_timer', 'death_animation_duration', 'ai_state', 'turn_at_edges',
+                 'surface', 'timers', '_death')
+    
+    def __init__(self, x: float, y: float, width: int, height: int, timers=None):
         super().__init__(x, y, width, height)
         
         # Movement
@@ -119,21 +169,30 @@ class BaseEnemy(Entity):
         self.is_stomped = False
         self.death_timer = 0
         self.death_animation_duration = 30  # frames
+        self.timers = timers  # Optional TimerWheel - ends the death animation by itself
+        self._death = None
         
         # AI
         self.ai_state = "patrol"  # patrol, chase, idle
         self.turn_at_edges = False  # Goomba=False, Red Koopa=True
+        self.surface = None  # Span of the SurfaceGraph we stand on (cached)
     
-    def update(self, delta_time: float, platforms: List):
-        """Standard enemy update loop"""
+    def update(self, delta_time: float, platforms: List, surfaces=None):
+        """
+        Standard enemy update loop
+        surfaces - optional SurfaceGraph of the level for O(1) edge checks
+        """
         if not self.is_alive:
-            self.death_timer += 1
-            if self.death_timer > self.death_animation_duration:
-                self.is_active = False
+            if self.timers is None:
+                self.death_timer += 1
+                if self.death_timer > self.death_animation_duration:
+                    self.is_active = False
             return
         
         # AI Behavior
         self.update_ai()
+        if self.turn_at_edges and self.check_edge(platforms, surfaces):
+            self.direction *= -1
         
         # Physics
         self.apply_gravity(delta_time)
@@ -160,16 +219,25 @@ class BaseEnemy(Entity):
         self.is_stomped = True
         self.velocity.y = -8  # Bounce effect for visual feedback
         self.velocity.x = 0
+        if self.timers is not None:
+            # Same length as counting death_timer past the duration in update()
+            self._death = self.timers.schedule(self.death_animation_duration + 1,
+                                               self._on_death_finished)
+    
+    def _on_death_finished(self, timer):
+        self.is_active = False
     
     def on_wall_collision(self):
         """Called when enemy hits wall"""
         self.direction *= -1
         self.velocity.x = 0
     
-    def check_edge(self, platforms: List) -> bool:
+    def check_edge(self, platforms: List, surfaces=None) -> bool:
         """
         Detect if enemy is about to walk off edge
         Used by Red Koopa and other edge-aware enemies
+        With a SurfaceGraph this is a lookup against the span we stand on;
+        platforms are only scanned while airborne
         """
         # Check position ahead of enemy
         check_x = self.rect.x + (self.rect.width * self.direction)
@@ -180,6 +248,12 @@ class BaseEnemy(Entity):
         if check_y >= ground_y:
             return False
         
+        # Check span
+        if surfaces is not None:
+            self.surface = surfaces.span_under(self.rect, self.surface)
+            if self.surface is not None:
+                return surfaces.is_edge(self.surface, check_x)
+        
         # Check platforms
         for platform in platforms:
             if platform.rect.collidepoint(check_x, check_y):
@@ -187,6 +261,15 @@ class BaseEnemy(Entity):
         
         return True  # No ground ahead = edge!
     
+    def patrol_bounds(self, surfaces) -> Tuple[float, float]:
+        """Patrol range limited to the span we stand on (start_x +- patrol_range otherwise)"""
+        low, high = self.start_x - self.patrol_range, self.start_x + self.patrol_range
+        self.surface = surfaces.span_under(self.rect, self.surface)
+        if self.surface is None:
+            return low, high
+        left, right = surfaces.patrol_bounds(self.surface, self.rect.width)
+        return max(low, left), min(high, right)
+    
     def check_world_bounds(self):
         """Prevent enemies from going out of bounds"""
         if self.rect.bottom > SCREEN_HEIGHT + 100:
@@ -256,6 +339,69 @@ class CollisionSystem:
         
         return True
     
+    # === BATCH API ===
+    # Boxes are (N, 4) arrays of left, top, right, bottom; results follow
+    # pygame.Rect semantics (integer centers, empty rects never collide)
+    
+    @staticmethod
+    def to_boxes(rects: Iterable[pygame.Rect]) -> np.ndarray:
+        """Pack rects into an (N, 4) box array"""
+        boxes = [(rect.left, rect.top, rect.right, rect.bottom) for rect in rects]
+        return np.array(boxes, dtype=np.float64).reshape(-1, 4)
+    
+    @staticmethod
+    def _centers(boxes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Same rounding as Rect.centerx / Rect.centery"""
+        return (boxes[..., 0] + (boxes[..., 2] - boxes[..., 0]) // 2,
+                boxes[..., 1] + (boxes[..., 3] - boxes[..., 1]) // 2)
+    
+    @staticmethod
+    def check_aabb_pairs(boxes_a: np.ndarray, boxes_b: np.ndarray) -> np.ndarray:
+        """(N, M) hit mask of every box in A against every box in B"""
+        a = boxes_a[:, None, :]
+        b = boxes_b[None, :, :]
+        return ((a[..., 0] < b[..., 2]) & (a[..., 2] > b[..., 0]) &
+                (a[..., 1] < b[..., 3]) & (a[..., 3] > b[..., 1]) &
+                (a[..., 2] > a[..., 0]) & (a[..., 3] > a[..., 1]) &
+                (b[..., 2] > b[..., 0]) & (b[..., 3] > b[..., 1]))
+    
+    @staticmethod
+    def check_aabb_many(rect: pygame.Rect, boxes: np.ndarray) -> np.ndarray:
+        """(N,) hit mask of one rect against every box"""
+        return CollisionSystem.check_aabb_pairs(CollisionSystem.to_boxes([rect]), boxes)[0]
+    
+    @staticmethod
+    def get_overlap_many(rect: pygame.Rect, boxes: np.ndarray) -> np.ndarray:
+        """(N, 2) overlap_x, overlap_y of one rect against every box"""
+        center_x, center_y = CollisionSystem._centers(boxes)
+        overlap = np.empty((len(boxes), 2), dtype=np.float64)
+        overlap[:, 0] = (rect.width + boxes[:, 2] - boxes[:, 0]) / 2 - np.abs(rect.centerx - center_x)
+        overlap[:, 1] = (rect.height + boxes[:, 3] - boxes[:, 1]) / 2 - np.abs(rect.centery - center_y)
+        return overlap
+    
+    @staticmethod
+    def get_collision_normal_many(rect: pygame.Rect, boxes: np.ndarray) -> np.ndarray:
+        """(N, 2) normals pointing from each box to the rect (axis of least penetration)"""
+        center_x, center_y = CollisionSystem._centers(boxes)
+        overlap = CollisionSystem.get_overlap_many(rect, boxes)
+        horizontal = overlap[:, 0] < overlap[:, 1]
+        normals = np.zeros((len(boxes), 2), dtype=np.float64)
+        normals[horizontal, 0] = np.where(rect.centerx - center_x[horizontal] > 0, 1, -1)
+        normals[~horizontal, 1] = np.where(rect.centery - center_y[~horizontal] > 0, 1, -1)
+        return normals
+    
+    @staticmethod
+    def is_stomp_many(player_rect: pygame.Rect, player_velocity_y: float,
+                      boxes: np.ndarray, tolerance: int = 5) -> np.ndarray:
+        """
+        (N,) stomp mask - is_stomp() against every box
+        tolerance - how far below the enemy's center the feet may be
+        """
+        if player_velocity_y <= 0:
+            return np.zeros(len(boxes), dtype=bool)
+        _, center_y = CollisionSystem._centers(boxes)
+        return player_rect.bottom <= center_y + tolerance
+    
     @staticmethod
     def resolve_platform_collision(entity: Entity, platform_rect: pygame.Rect):
         """
@@ -3,6 +3,8 @@ import math
 from config import *
 
 class Flag:
+    __slots__ = ('rect',)
+    
     def __init__(self, x, y):
         self.rect = pygame.Rect(x, y, FLAG_WIDTH, FLAG_HEIGHT)
         
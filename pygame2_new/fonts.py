@@ -0,0 +1,34 @@
+"""
+Fonts
+pygame fonts created on first use and shared afterwards. Loading a font
+parses the font file, so neither startup nor every draw() call should do it.
+"""
+from typing import Dict, Optional, Tuple
+import pygame
+
+_fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+
+
+def font(size: int, name: Optional[str] = None) -> pygame.font.Font:
+    """The font of that size (name=None: pygame's default font)"""
+    key = (name, size)
+    cached = _fonts.get(key)
+    if cached is None:
+        if not pygame.font.get_init():
+            pygame.font.init()
+        cached = _fonts[key] = pygame.font.Font(name, size)
+    return cached
+
+
+def font_property(size: int, name: Optional[str] = None) -> property:
+    """Font attribute loaded on first access (e.g. Game.font_large)"""
+    return property(lambda self: font(size, name))
+
+
+def clear():
+    """Drop the cached fonts (needed after pygame.font.quit())"""
+    _fonts.clear()
+
+
+# Export classes
+__all__ = ['font', 'font_property', 'clear']
@@ -1,63 +1,127 @@
+import math
+import random
+import sys
+import time
 import pygame
+import numpy as np
 from config import *
 from player import Player
-from enemy import Enemy
-from platform import Platform
-from coin import Coin
-from flag import Flag
 from level import Level
-from particle import Particle, StarParticle, CoinCollectEffect
-from mario_blocks import Mushroom, FireFlower
+from level_data import level_count
+from preload import LevelPreloader
+from particle import Particle, StarParticle, CoinCollectEffect, ComboText
+from pool import spawn, recycle, pool_for
+from simulation import SimulationRegion
+from lod import LODScheduler
+from timers import TimerWheel, timer_property
+from systems import build_pipeline
+from determinism import streams, InputFrame, StateHasher, IDLE
+from persistence import Storage, SaveGame
+from snapshot import SnapshotWriter, SnapshotReader, slot_values, set_slot_values
+from fonts import font_property
+from sprites import sprites, sprite, baker, canvas, Sprite, PAD
+
+# Třídy částic a efektů ve snapshotu (index = kód třídy)
+_EFFECT_TYPES = (Particle, StarParticle, CoinCollectEffect, ComboText)
 
 class Game:
-    def __init__(self):
+    # Combo okno běží v TimerWheel (viz Player)
+    combo_timer = timer_property('combo_timer')
+    
+    # Fonty se načtou až při prvním kreslení textu (start hry je nečeká)
+    font_large = font_property(72)
+    font_medium = font_property(48)
+    font_small = font_property(36)
+    font_tiny = font_property(24)
+    
+    def __init__(self, seed=None, save_dir=None, level=None, resume=False):
+        """
+        seed - deterministický režim: přeseeduje náhodné proudy a po každém
+               step() spočítá hash stavu (self.state_hash)
+        save_dir - adresář uložené hry a tabulky skóre (None = nic se neukládá);
+                   zapisuje se na pozadí, viz persistence.py
+        level - startovní level (jinak 1)
+        resume - pokračovat z uložené hry, je-li nějaká (má přednost před level)
+        """
+        self.seed = seed
+        self.hasher = None
+        if seed is not None:
+            streams.reseed(seed)
+            self.hasher = StateHasher()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption(TITLE)
+        sprites.load()  # Předpečené sprity z minulého běhu - jedno čtení souboru
         self.clock = pygame.time.Clock()
         self.running = True
         
         # Herní stav
         self.lives = MAX_LIVES
+        self.deaths = 0  # Ztracené životy této hry (extra životy je nevrací)
         self.score = 0
         self.current_level = 1
-        self.max_level = 3
-        
-        # Timer
+        self.max_level = level_count()
+        self.storage = Storage(save_dir) if save_dir is not None else None
+        self.high_score_rank = None  # Umístění poslední dohrané hry v tabulce
+        
+        # Startovní level se staví jen jednou - rovnou ten, kterým se začíná
+        save = self.storage.save if resume and self.storage is not None else None
+        if save is not None and 1 <= save.level <= self.max_level:
+            self.current_level, self.lives, self.score = save.level, save.lives, save.score
+        elif level is not None:
+            self.current_level = level
+        
+        # Sdílené časovače (hráč, combo, odpočet času levelu)
+        self.timers = TimerWheel()
+        self._combo_timer = None
+        
+        # Timer - každých 60 ticků (1 sekunda při 60 FPS) ubere sekundu
         self.time_remaining = LEVEL_TIME
-        self.time_counter = 0
-        
-        # Font pro text
-        self.font_large = pygame.font.Font(None, 72)
-        self.font_medium = pygame.font.Font(None, 48)
-        self.font_small = pygame.font.Font(None, 36)
-        self.font_tiny = pygame.font.Font(None, 24)
+        self.second_timer = self.timers.schedule(60, self.count_down_second, period=60)
         
-        # Inicializace prvního levelu
+        # Inicializace prvního levelu; další level se staví na pozadí už během
+        # obrazovky "level complete" (viz GoalSystem)
         self.level = Level(self.current_level)
-        self.player = Player(100, SCREEN_HEIGHT - GROUND_HEIGHT - PLAYER_HEIGHT)
+        self.preloader = LevelPreloader(Level)
+        self.level_start = self._level_snapshot()  # Restart levelu bez stavění znovu
+        self.checkpoint = None                     # Snapshot pro retry() (save_checkpoint)
+        self.player = Player(100, SCREEN_HEIGHT - GROUND_HEIGHT - PLAYER_HEIGHT, self.timers)
         
         # Kamera offset
         self.camera_x = 0
         
+        # Simulační oblast - entity daleko od kamery spí
+        self.region = SimulationRegion()
+        self.lod = LODScheduler()
+        self.awake_enemies = []
+        self.awake_index = np.zeros(0, dtype=np.int64)
+        
         # Herní stavy
         self.game_state = "playing"  # playing, level_complete, game_over, win
         self.state_timer = 0
         
+        # Vstup právě běžícího ticku (InputFrame ze step(); None = čte se klávesnice)
+        self.key_state = None
+        
         # Částicové efekty
         self.particles = []
         self.effects = []
         
         # Combo systém
         self.combo = 0
-        self.combo_timer = 0
         
-    def run(self):
-        while self.running:
+        # Herní systémy v pořadí ticku (hráč, časovače, bloky, ... kamera)
+        build_pipeline(self)
+        
+    def run(self, max_frames=None):
+        """Herní smyčka; max_frames - skončit po tolika snímcích (měření startu)"""
+        frames = 0
+        while self.running and (max_frames is None or frames < max_frames):
+            frames += 1
             self.clock.tick(FPS)
-            self.handle_events()
+            frame = self.handle_events()
             
             if self.game_state == "playing":
-                self.update()
+                self.step(frame)
             elif self.game_state == "level_complete":
                 self.handle_level_complete()
             elif self.game_state == "game_over":
@@ -67,241 +131,81 @@ class Game:
                 
             self.draw()
             
+    def fast_forward(self, ticks, frames=None, render_every=0):
+        """
+        Simuluje až ticks ticků bez omezení FPS (soak testy, boti, přetočení
+        k chybě pozdě v levelu); skončí dřív, když hra přestane běžet
+        frames - vstup pro jednotlivé ticky (InputFrame); po vyčerpání IDLE
+        render_every - kreslit každý N-tý tick (0 = nekreslit vůbec)
+        Vrací statistiky běhu včetně ticks_per_second.
+        """
+        frames = iter(frames if frames is not None else ())
+        done = 0
+        start = time.perf_counter()
+        while done < ticks and self.running and self.game_state == "playing":
+            self.step(next(frames, IDLE))
+            done += 1
+            if render_every and done % render_every == 0:
+                # Okno musí dál reagovat (zavření), vstup se ale bere jen z frames
+                for event in pygame.event.get():
+                    if event.type == pygame.QUIT:
+                        self.running = False
+                self.draw()
+        elapsed = time.perf_counter() - start
+        return {'ticks': done,
+                'seconds': elapsed,
+                'ticks_per_second': done / elapsed if elapsed > 0 else float('inf'),
+                'state': self.game_state}
+    
     def handle_events(self):
+        """Zpracuje události okna a vrátí vstup pro tento tick (InputFrame)"""
+        jump = shoot = False
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
-                if event.key == pygame.K_SPACE and self.player.on_ground:
-                    self.player.jump()
+                if event.key == pygame.K_SPACE:
+                    jump = True
                 elif event.key == pygame.K_x or event.key == pygame.K_LSHIFT:
                     # Střelba ohnivých koulí
-                    self.player.shoot_fireball()
+                    shoot = True
                 elif event.key == pygame.K_r and (self.game_state == "game_over" or self.game_state == "win"):
                     self.reset_game()
                 elif event.key == pygame.K_RETURN and self.game_state == "level_complete":
                     self.next_level()
+        return InputFrame.from_keyboard(pygame.key.get_pressed(), jump, shoot)
+    
+    def step(self, frame):
+        """Jeden tick řízený vstupem frame (InputFrame) - živá hra, replay i headless běhy"""
+        if frame.jump and self.player.on_ground:
+            self.player.jump()
+        if frame.shoot:
+            # Střelba ohnivých koulí
+            self.player.shoot_fireball()
+        self.key_state = frame
+        self.update()
+        if self.hasher is not None:
+            self.hasher.update(self)
+    
+    @property
+    def state_hash(self):
+        """Průběžný hash stavu po posledním step() (jen v deterministickém režimu)"""
+        return self.hasher.digest if self.hasher is not None else None
                     
-    def update(self):
-        # Timer
+    def update(self, dt=1):
+        """Jeden tick hry - běží systémy v pořadí (viz systems.py)"""
+        self.systems.update(dt)
+    
+    def count_down_second(self, timer):
+        """Callback časovače - uplynula sekunda hry"""
         if self.game_state == "playing":
-            self.time_counter += 1
-            if self.time_counter >= 60:  # 1 sekunda při 60 FPS
-                self.time_counter = 0
-                self.time_remaining -= 1
-                if self.time_remaining <= 0:
-                    self.player_hit()
-        
-        # Získání stisknutých kláves
-        keys = pygame.key.get_pressed()
-        
-        # Pohyb hráče s bloky a pipesami
-        self.player.update(keys, self.level.platforms, self.level.blocks, self.level.pipes)
-        
-        # Update bloků
-        for block in self.level.blocks:
-            block.update()
-            
-            # Kontrola kolize Maria s blokem (zdola)
-            if self.player.rect.colliderect(block.rect):
-                if self.player.velocity_y < 0:  # Mario skáče nahoru
-                    overlap = self.player.rect.top - block.rect.bottom
-                    if overlap > -10:  # Udření zdola
-                        self.player.rect.top = block.rect.bottom
-                        self.player.velocity_y = 0
-                        
-                        # Hit blok
-                        content = block.hit_block(self.player)
-                        if content == "coin":
-                            self.score += 100
-                        elif content == "mushroom":
-                            mushroom = Mushroom(block.rect.x, block.rect.y)
-                            self.level.mushrooms.append(mushroom)
-                            self.score += 1000
-                        elif content == "flower":
-                            flower = FireFlower(block.rect.x, block.rect.y)
-                            self.level.flowers.append(flower)
-                            self.score += 1000
-                        elif content == "break":
-                            self.score += 50
-                            # Částice rozbitých cihel
-                            for _ in range(8):
-                                self.particles.append(
-                                    Particle(block.rect.centerx, block.rect.centery,
-                                           (178, 34, 34), 0, -5, 30)
-                                )
-        
-        # Update hub
-        for mushroom in self.level.mushrooms[:]:
-            mushroom.update(self.level.platforms)
-            if self.player.rect.colliderect(mushroom.rect) and not mushroom.collected:
-                mushroom.collected = True
-                self.level.mushrooms.remove(mushroom)
-                if self.player.power_up():
-                    # Hvězdičkový efekt
-                    for _ in range(15):
-                        self.particles.append(StarParticle(mushroom.rect.centerx, mushroom.rect.centery))
-        
-        # Update květin
-        for flower in self.level.flowers[:]:
-            flower.update()
-            if self.player.rect.colliderect(flower.rect) and not flower.collected:
-                flower.collected = True
-                self.level.flowers.remove(flower)
-                if self.player.fire_power_up():
-                    # Ohnivý efekt
-                    for _ in range(20):
-                        self.particles.append(
-                            Particle(flower.rect.centerx, flower.rect.centery,
-                                   (255, 100, 0), 0, -3, 40)
-                        )
-        
-        # Update power-upů (staré)
-        for powerup in self.level.powerups[:]:
-            powerup.update()
-            if self.player.rect.colliderect(powerup.rect) and not powerup.collected:
-                powerup.collect()
-                self.level.powerups.remove(powerup)
-                
-                if powerup.powerup_type == "extra_life":
-                    if self.lives < MAX_LIVES:
-                        self.lives += 1
-                    self.score += 100
-                    for _ in range(15):
-                        self.particles.append(StarParticle(powerup.rect.centerx, powerup.rect.centery))
-                        
-                elif powerup.powerup_type == "speed_boost":
-                    self.player.activate_speed_boost()
-                    self.score += 50
-                    for _ in range(20):
-                        self.particles.append(
-                            Particle(powerup.rect.centerx, powerup.rect.centery,
-                                   (0, 150, 255), 0, 0, 40)
-                        )
-        
-        # Aktualizace nepřátel
-        for enemy in self.level.enemies:
-            enemy.update(self.level.platforms)
-            
-            # Kolize s ohnivou koulí
-            for fireball in self.player.fireballs[:]:
-                if fireball.rect.colliderect(enemy.rect) and enemy.alive:
-                    enemy.kill()
-                    self.level.enemies.remove(enemy)
-                    self.player.fireballs.remove(fireball)
-                    self.score += 100
-                    # Exploze
-                    for _ in range(10):
-                        self.particles.append(
-                            Particle(enemy.rect.centerx, enemy.rect.centery,
-                                   (255, 100, 0), 0, -3, 25)
-                        )
-                    break
-            
-            # Kolize s nepřítelem
-            if self.player.rect.colliderect(enemy.rect) and enemy.alive:
-                if self.player.velocity_y > 0 and self.player.rect.bottom - 10 < enemy.rect.centery:
-                    # Skok na nepřítele
-                    enemy.kill()
-                    self.level.enemies.remove(enemy)
-                    self.player.velocity_y = -10
-                    
-                    # Combo systém
-                    self.combo += 1
-                    self.combo_timer = 120
-                    bonus = 100 * self.combo
-                    self.score += bonus
-                    
-                    # Částicový efekt
-                    for _ in range(15):
-                        self.particles.append(
-                            Particle(enemy.rect.centerx, enemy.rect.centery,
-                                   (139, 90, 43), 0, -2, 30)
-                        )
-                    
-                    if self.combo > 1:
-                        self.effects.append(self.create_combo_text(enemy.rect.centerx, enemy.rect.centery))
-                else:
-                    # Hráč byl zasažen
-                    if self.player.take_damage():
-                        self.player_hit()
-        
-        # Combo timer
-        if self.combo_timer > 0:
-            self.combo_timer -= 1
-        else:
-            self.combo = 0
-                    
-        # Kolize s mincemi
-        for coin in self.level.coins[:]:
-            if self.player.rect.colliderect(coin.rect):
-                coin.collect()
-                self.level.coins.remove(coin)
-                self.score += 100
-                
-                self.effects.append(CoinCollectEffect(coin.rect.centerx, coin.rect.centery))
-                
-                for _ in range(8):
-                    self.particles.append(
-                        Particle(coin.rect.centerx, coin.rect.centery,
-                               YELLOW, 0, -2, 25)
-                    )
-        
-        # Update částic a efektů
-        for particle in self.particles[:]:
-            particle.update()
-            if not particle.is_alive():
-                self.particles.remove(particle)
-                
-        for effect in self.effects[:]:
-            effect.update()
-            if not effect.is_alive():
-                self.effects.remove(effect)
-                
-        # Kontrola dosažení vlajky
-        if self.player.rect.colliderect(self.level.flag.rect):
-            self.game_state = "level_complete"
-            self.state_timer = pygame.time.get_ticks()
-            bonus_score = self.time_remaining * 10
-            self.score += bonus_score
-            
-            for _ in range(50):
-                self.particles.append(StarParticle(self.level.flag.rect.centerx, 
-                                                   self.level.flag.rect.centery))
-            
-        # Kontrola pádu do propasti
-        if self.player.rect.top > SCREEN_HEIGHT:
-            self.player_hit()
-            
-        # Aktualizace kamery
-        self.update_camera()
+            self.time_remaining -= 1
+            if self.time_remaining <= 0:
+                self.player_hit()
     
     def create_combo_text(self, x, y):
         """Vytvoří textový efekt pro combo"""
-        class ComboText:
-            def __init__(self, x, y, combo):
-                self.x = x
-                self.y = y
-                self.combo = combo
-                self.lifetime = 60
-                self.velocity_y = -2
-                
-            def update(self):
-                self.y += self.velocity_y
-                self.lifetime -= 1
-                
-            def draw(self, screen, camera_x):
-                if self.lifetime > 0:
-                    alpha = int(255 * (self.lifetime / 60))
-                    font = pygame.font.Font(None, 36)
-                    text = font.render(f"COMBO x{self.combo}!", True, ORANGE)
-                    text.set_alpha(alpha)
-                    screen.blit(text, (int(self.x - camera_x - 50), int(self.y)))
-            
-            def is_alive(self):
-                return self.lifetime > 0
-        
-        return ComboText(x, y, self.combo)
+        return spawn(ComboText, x, y, self.combo)
         
     def update_camera(self):
         # Kamera sleduje hráče
@@ -310,9 +214,11 @@ class Game:
         
     def player_hit(self):
         self.lives -= 1
+        self.deaths += 1
         if self.lives <= 0:
             self.game_state = "game_over"
             self.state_timer = pygame.time.get_ticks()
+            self.finish_game()
         else:
             # Restart pozice hráče
             self.player.rect.x = 100
@@ -325,25 +231,147 @@ class Game:
         if self.current_level > self.max_level:
             self.game_state = "win"
             self.state_timer = pygame.time.get_ticks()
+            self.finish_game()
         else:
-            self.level = Level(self.current_level)
-            self.player.rect.x = 100
-            self.player.rect.y = SCREEN_HEIGHT - GROUND_HEIGHT - PLAYER_HEIGHT
-            self.player.velocity_y = 0
-            self.camera_x = 0
-            self.game_state = "playing"
+            self.load_level(self.current_level)
             
     def reset_game(self):
         self.lives = MAX_LIVES
+        self.deaths = 0
         self.score = 0
-        self.current_level = 1
-        self.level = Level(self.current_level)
+        self.load_level(1)
+        
+    def load_level(self, number):
+        """Načte level a postaví hráče na start"""
+        self.current_level = number
+        if self.level.level_number == number and self.level_start is not None:
+            self.level.restore(self.level_start)  # Týž level - jen vrátit stav ze startu
+        else:
+            self.level = self.preloader.take(number)  # Hotový z pozadí, jinak se postaví hned
+            self.level_start = self._level_snapshot()
+        self.save_progress()
         self.player.rect.x = 100
         self.player.rect.y = SCREEN_HEIGHT - GROUND_HEIGHT - PLAYER_HEIGHT
         self.player.velocity_y = 0
         self.camera_x = 0
         self.game_state = "playing"
         
+    # === SNAPSHOTY ===
+    
+    def snapshot(self, particles=False):
+        """
+        Celý měnitelný stav hry jako kompaktní binární blob (viz snapshot.py):
+        skóre, životy, čas, combo, časovače, LOD, level (bloky, mince,
+        nepřátelé, ...) a hráč. Bere se mezi ticky; restore() ho obnoví
+        jedním voláním - checkpointy, okamžitý retry, skoky v replayi.
+        particles - i částice, efekty a stav jejich náhodných proudů (kosmetika)
+        """
+        out = SnapshotWriter()
+        timers = self.timers
+        hasher = self.hasher
+        out.section(b"GAME")
+        out.data((particles, self.lives, self.deaths, self.score, self.current_level,
+                  self.time_remaining, self.combo, self.game_state, self.state_timer,
+                  self.camera_x, timers.now, timers.remaining(self.second_timer), self.combo_timer,
+                  None if hasher is None else (hasher.digest, hasher.ticks)))
+        self.lod.write_snapshot(out)
+        self.level.write_snapshot(out)
+        self.player.write_snapshot(out, particles)
+        if particles:
+            out.data([[(_EFFECT_TYPES.index(type(effect)), slot_values(effect))
+                       for effect in effects] for effects in (self.particles, self.effects)])
+            out.data(streams.getstate())
+        return out.getvalue()
+    
+    def save_checkpoint(self):
+        self.checkpoint = self.snapshot()
+    
+    def retry(self):
+        """Okamžitý návrat na poslední checkpoint (False, když žádný není)"""
+        if self.checkpoint is None:
+            return False
+        self.restore(self.checkpoint)
+        return True
+    
+    def _level_snapshot(self):
+        """Stav čerstvě načteného levelu (streamované levely snapshot nemají)"""
+        return None if self.level.streamer is not None else self.level.snapshot()
+    
+    def restore(self, blob):
+        """
+        Vrátí hru do stavu ze snapshot(); je-li ve snapshotu jiný level než
+        běžící, nejdřív se postaví (preloader)
+        """
+        src = SnapshotReader(blob)
+        src.expect(b"GAME")
+        (particles, self.lives, self.deaths, self.score, number, self.time_remaining, self.combo,
+         self.game_state, self.state_timer, self.camera_x, now, second, combo,
+         hashed) = src.data()
+        
+        # Časovače se naplánují znovu se zbývajícími ticky
+        self.timers.reset(now)
+        self.second_timer = self.timers.schedule(second, self.count_down_second, period=60)
+        self._combo_timer = None
+        self.combo_timer = combo
+        if self.hasher is not None and hashed is not None:
+            self.hasher.digest, self.hasher.ticks = hashed
+            if self.hasher.history is not None:
+                del self.hasher.history[self.hasher.ticks:]
+        self.lod.read_snapshot(src)
+        
+        if number != self.current_level or self.level.level_number != number:
+            self.current_level = number
+            self.level = self.preloader.take(number)
+            self.level_start = self._level_snapshot()
+        self.level.read_snapshot(src)
+        self.player.read_snapshot(src)
+        
+        # Částice a efekty: ze snapshotu, jinak zmizí
+        for effects in (self.particles, self.effects):
+            for effect in effects:
+                recycle(effect)
+            effects.clear()
+        if particles:
+            for effects, saved in zip((self.particles, self.effects), src.data()):
+                for kind, values in saved:
+                    effect = pool_for(_EFFECT_TYPES[kind]).acquire_blank()
+                    set_slot_values(effect, values)
+                    effects.append(effect)
+            streams.setstate(src.data())
+        
+    # === UKLÁDÁNÍ ===
+    
+    def save_progress(self):
+        """Uloží, odkud pokračovat (level, životy, skóre na jeho startu) - neblokuje"""
+        if self.storage is not None:
+            self.storage.store_save(SaveGame(self.current_level, self.lives, self.score))
+    
+    def resume(self):
+        """Pokračuje z uložené hry (False, když žádná není)"""
+        save = self.storage.save if self.storage is not None else None
+        if save is None or not 1 <= save.level <= self.max_level:
+            return False
+        self.lives = save.lives
+        self.score = save.score
+        self.load_level(save.level)
+        return True
+    
+    def finish_game(self):
+        """Konec hry (game over / výhra) - zápis do tabulky skóre, uložená hra zaniká"""
+        if self.storage is not None:
+            self.high_score_rank = self.storage.add_score(self.score, min(self.current_level, self.max_level))
+            self.storage.clear_save()
+    
+    def close(self):
+        """Dopíše rozepsané soubory a zastaví vlákna na pozadí"""
+        self.preloader.shutdown()
+        if self.storage is not None:
+            try:
+                self.storage.close()
+            except OSError as error:
+                print(f"Uložení se nezdařilo: {error}", file=sys.stderr)
+        sprites.save()  # Nově upečené sprity pro příští start
+        
     def handle_level_complete(self):
         pass  # Čeká na stisknutí Enter
         
@@ -355,13 +383,8 @@ class Game:
         
     def draw(self):
         # === POZADÍ S GRADIENTEM ===
-        # Horní část nebe (světlejší)
-        for i in range(SCREEN_HEIGHT):
-            ratio = i / SCREEN_HEIGHT
-            r = int(135 + (200 - 135) * ratio)
-            g = int(206 + (230 - 206) * ratio)
-            b = int(235 + (255 - 235) * ratio)
-            pygame.draw.line(self.screen, (r, g, b), (0, i), (SCREEN_WIDTH, i))
+        # Nebe, mraky i země jsou předpečené sprity (sprites.py)
+        sprite("sky").draw(self.screen, 0, 0)
         
         # Mraky (animované)
         cloud_positions = [
@@ -374,29 +397,10 @@ class Game:
         for cloud_x, cloud_y in cloud_positions:
             self.draw_cloud(cloud_x, cloud_y)
         
-        # Země s travou
+        # Země s travou; stébla se posouvají s kamerou (vzor se opakuje po 30 px)
         ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
-        
-        # Zemina (hnědá)
-        pygame.draw.rect(self.screen, (139, 90, 43), 
-                        (0, ground_y, SCREEN_WIDTH, GROUND_HEIGHT))
-        
-        # Tráva nahoře (zelená)
-        pygame.draw.rect(self.screen, (34, 139, 34), 
-                        (0, ground_y, SCREEN_WIDTH, 8))
-        
-        # Stébla trávy
-        for i in range(0, SCREEN_WIDTH, 30):
-            grass_x = i + (self.camera_x % 30)
-            pygame.draw.line(self.screen, (0, 180, 0), 
-                           (grass_x, ground_y), 
-                           (grass_x - 3, ground_y - 8), 2)
-            pygame.draw.line(self.screen, (0, 180, 0), 
-                           (grass_x + 10, ground_y), 
-                           (grass_x + 13, ground_y - 10), 2)
-            pygame.draw.line(self.screen, (0, 180, 0), 
-                           (grass_x + 20, ground_y), 
-                           (grass_x + 18, ground_y - 7), 2)
+        sprite("ground").draw(self.screen, 0, ground_y)
+        sprite("grass").draw(self.screen, self.camera_x % 30, ground_y)
         
         # Vykreslení levelu s kamerou
         for platform in self.level.platforms:
@@ -424,7 +428,7 @@ class Game:
         for coin in self.level.coins:
             coin.draw(self.screen, self.camera_x)
             
-        for enemy in self.level.enemies:
+        for enemy in self.level.crowd.sync_visible(self.camera_x):
             enemy.draw(self.screen, self.camera_x)
         
         # Částice a efekty
@@ -454,15 +458,7 @@ class Game:
     
     def draw_cloud(self, x, y):
         """Vykreslí hezký mrak"""
-        cloud_color = (255, 255, 255)
-        # Hlavní části mraku
-        pygame.draw.circle(self.screen, cloud_color, (int(x), int(y)), 20)
-        pygame.draw.circle(self.screen, cloud_color, (int(x + 20), int(y - 5)), 25)
-        pygame.draw.circle(self.screen, cloud_color, (int(x + 40), int(y)), 20)
-        pygame.draw.circle(self.screen, cloud_color, (int(x + 25), int(y + 10)), 18)
-        # Stín mraku (jemný)
-        pygame.draw.circle(self.screen, (240, 240, 240), (int(x + 5), int(y + 3)), 18)
-        pygame.draw.circle(self.screen, (240, 240, 240), (int(x + 25), int(y - 2)), 23)
+        sprite("cloud").draw(self.screen, int(x), int(y))
         
     def draw_gui(self):
         """GUI jako v originálním Super Mario Bros"""
@@ -532,7 +528,6 @@ class Game:
             combo_rect = combo_text.get_rect(center=(SCREEN_WIDTH//2, 80))
             
             # Pulzující efekt
-            import math
             scale = 1 + math.sin(pygame.time.get_ticks() * 0.01) * 0.1
             scaled_width = int(combo_rect.width * scale)
             scaled_height = int(combo_rect.height * scale)
@@ -569,7 +564,7 @@ class Game:
             pygame.draw.rect(self.screen, (50, 50, 50), 
                            (timer_x, timer_y, timer_width, timer_height))
             
-            progress = (self.player.speed_boost_timer / 300) * timer_width
+            progress = (self.player.speed_boost_timer / SPEED_BOOST_DURATION) * timer_width
             pygame.draw.rect(self.screen, (0, 200, 255),
                            (timer_x, timer_y, int(progress), timer_height))
             
@@ -610,7 +605,6 @@ class Game:
         self.screen.blit(overlay, (0, 0))
         
         # Animace pulzování
-        import math
         pulse = 1 + math.sin(pygame.time.get_ticks() * 0.005) * 0.1
         
         complete_text = self.font_large.render("LEVEL DOKONČEN!", True, GREEN)
@@ -669,6 +663,17 @@ class Game:
         restart_text = self.font_small.render("Stiskni R pro restart", True, WHITE)
         restart_rect = restart_text.get_rect(center=(SCREEN_WIDTH//2, SCREEN_HEIGHT//2 + 80))
         self.screen.blit(restart_text, restart_rect)
+        self.draw_high_score(SCREEN_HEIGHT//2 + 130)
+    
+    def draw_high_score(self, y):
+        """Nejlepší skóre z tabulky (a umístění právě dohrané hry)"""
+        if self.storage is None:
+            return
+        text = f"Nejlepší skóre: {self.storage.high_scores.best}"
+        if self.high_score_rank is not None:
+            text += f"  (tvoje hra: {self.high_score_rank + 1}. místo)"
+        high_score_text = self.font_tiny.render(text, True, YELLOW)
+        self.screen.blit(high_score_text, high_score_text.get_rect(center=(SCREEN_WIDTH//2, y)))
         
     def draw_win(self):
         overlay = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
@@ -677,14 +682,12 @@ class Game:
         self.screen.blit(overlay, (0, 0))
         
         # Konfety efekt
-        import math
-        import random
-        random.seed(42)  # Pro konzistentní pozice
+        rng = random.Random(42)  # Pro konzistentní pozice (globální random nepřeseedujeme)
         for i in range(100):
-            x = random.randint(0, SCREEN_WIDTH)
-            y = (random.randint(0, SCREEN_HEIGHT) + pygame.time.get_ticks() // 10) % SCREEN_HEIGHT
-            color = random.choice([RED, YELLOW, GREEN, BLUE, (255, 0, 255)])
-            size = random.randint(3, 8)
+            x = rng.randint(0, SCREEN_WIDTH)
+            y = (rng.randint(0, SCREEN_HEIGHT) + pygame.time.get_ticks() // 10) % SCREEN_HEIGHT
+            color = rng.choice([RED, YELLOW, GREEN, BLUE, (255, 0, 255)])
+            size = rng.randint(3, 8)
             pygame.draw.circle(self.screen, color, (x, y), size)
         
         win_text = self.font_large.render("GRATULUJEME!", True, YELLOW)
@@ -717,3 +720,70 @@ class Game:
         # Blikající text
         if int(pygame.time.get_ticks() / 500) % 2 == 0:
             self.screen.blit(restart_text, restart_rect)
+        
+        self.draw_high_score(SCREEN_HEIGHT//2 + 150)
+
+
+# === PŘEDPEČENÉ POZADÍ ===
+
+@baker("sky")
+def bake_sky():
+    """Gradient nebe přes celou obrazovku (neprůhledný)"""
+    sky = Sprite(pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT)))
+    # Horní část nebe (světlejší)
+    for i in range(SCREEN_HEIGHT):
+        ratio = i / SCREEN_HEIGHT
+        r = int(135 + (200 - 135) * ratio)
+        g = int(206 + (230 - 206) * ratio)
+        b = int(235 + (255 - 235) * ratio)
+        pygame.draw.line(sky.surface, (r, g, b), (0, i), (SCREEN_WIDTH, i))
+    return sky
+
+
+@baker("cloud")
+def bake_cloud():
+    """Mrak; počátek je střed prvního kruhu"""
+    sprite = canvas(60, 28, left=20 + PAD, top=30 + PAD)
+    screen = sprite.surface
+    x, y = sprite.left, sprite.top
+    cloud_color = (255, 255, 255)
+    # Hlavní části mraku
+    pygame.draw.circle(screen, cloud_color, (x, y), 20)
+    pygame.draw.circle(screen, cloud_color, (x + 20, y - 5), 25)
+    pygame.draw.circle(screen, cloud_color, (x + 40, y), 20)
+    pygame.draw.circle(screen, cloud_color, (x + 25, y + 10), 18)
+    # Stín mraku (jemný)
+    pygame.draw.circle(screen, (240, 240, 240), (x + 5, y + 3), 18)
+    pygame.draw.circle(screen, (240, 240, 240), (x + 25, y - 2), 23)
+    return sprite
+
+
+@baker("ground")
+def bake_ground():
+    """Pás země přes šířku obrazovky (neprůhledný)"""
+    ground = Sprite(pygame.Surface((SCREEN_WIDTH, GROUND_HEIGHT)))
+    # Zemina (hnědá)
+    pygame.draw.rect(ground.surface, (139, 90, 43), (0, 0, SCREEN_WIDTH, GROUND_HEIGHT))
+    # Tráva nahoře (zelená)
+    pygame.draw.rect(ground.surface, (34, 139, 34), (0, 0, SCREEN_WIDTH, 8))
+    return ground
+
+
+@baker("grass")
+def bake_grass():
+    """Stébla trávy nad zemí; počátek je horní okraj země"""
+    sprite = canvas(SCREEN_WIDTH, 0, top=10 + PAD)
+    screen = sprite.surface
+    ground_y = sprite.top
+    for i in range(0, SCREEN_WIDTH, 30):
+        grass_x = sprite.left + i
+        pygame.draw.line(screen, (0, 180, 0), 
+                       (grass_x, ground_y), 
+                       (grass_x - 3, ground_y - 8), 2)
+        pygame.draw.line(screen, (0, 180, 0), 
+                       (grass_x + 10, ground_y), 
+                       (grass_x + 13, ground_y - 10), 2)
+        pygame.draw.line(screen, (0, 180, 0), 
+                       (grass_x + 20, ground_y), 
+                       (grass_x + 18, ground_y - 7), 2)
+    return sprite
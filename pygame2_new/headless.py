@@ -0,0 +1,179 @@
+"""
+Headless Batch Runner
+Runs many independent level playthroughs across worker processes without a
+window, frame cap or rendering. Each run is driven by a scripted input
+stream and reports its outcome as a RunResult.
+
+    python headless.py --level 1 --runs 64
+    python headless.py --level 2 --script "right*90 right+jump*40 idle*10" --runs 8
+
+Script format: space separated segments "actions*ticks"; actions are joined
+with '+' from left, right, jump, shoot, or 'idle'. left/right are held for
+the whole segment, jump/shoot are key presses on its first tick.
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import pygame
+from config import FPS, LEVEL_TIME
+from determinism import InputFrame
+
+ACTIONS = ('left', 'right', 'jump', 'shoot')
+Segment = Tuple[Tuple[str, ...], int]  # (actions, ticks)
+
+
+def parse_script(text: str) -> List[Segment]:
+    """'right*60 right+jump*30' -> [(('right',), 60), (('right', 'jump'), 30)]"""
+    segments = []
+    for token in text.split():
+        actions, _, ticks = token.partition('*')
+        names = tuple(name for name in actions.split('+') if name != 'idle')
+        unknown = set(names) - set(ACTIONS)
+        if unknown:
+            raise ValueError(f"unknown action(s) {sorted(unknown)} in {token!r}")
+        segments.append((names, int(ticks or 1)))
+    return segments
+
+
+def random_script(seed: int, ticks: int = LEVEL_TIME * FPS) -> List[Segment]:
+    """Mostly-rightward bot: random runs, jumps and shots"""
+    rng = random.Random(seed)
+    segments = []
+    total = 0
+    while total < ticks:
+        actions = ['left' if rng.random() < 0.15 else 'right']
+        if rng.random() < 0.6:
+            actions.append('jump')
+        if rng.random() < 0.2:
+            actions.append('shoot')
+        length = rng.randint(10, 60)
+        segments.append((tuple(actions), length))
+        total += length
+    return segments
+
+
+def frames(script: Iterable[Segment]) -> Iterator[InputFrame]:
+    """Per-tick input of a script"""
+    for actions, ticks in script:
+        held = InputFrame('left' in actions, 'right' in actions)
+        first = InputFrame('left' in actions, 'right' in actions,
+                           'jump' in actions, 'shoot' in actions)
+        for tick in range(ticks):
+            yield first if tick == 0 else held
+
+
+@dataclass(slots=True)
+class Job:
+    """One playthrough: a level, an input script and a tick budget"""
+    level: int
+    script: Sequence[Segment]
+    max_ticks: int = LEVEL_TIME * FPS
+    seed: Optional[int] = None  # Deterministic mode (see determinism.py)
+    name: str = ''
+
+
+@dataclass(slots=True)
+class RunResult:
+    name: str
+    level: int
+    completed: bool
+    deaths: int
+    score: int
+    ticks: int
+    state: str        # Final game_state
+    distance: int     # Player rect.x at the end
+    seconds: float    # Wall-clock time of the run
+    state_hash: Optional[int] = None  # Final state digest of seeded runs
+
+
+def run_job(job: Job) -> RunResult:
+    """Simulate one job in this process (pygame must be initialized)"""
+    from game import Game
+
+    start = time.perf_counter()
+    game = Game(seed=job.seed)
+    if job.level != game.current_level:
+        game.load_level(job.level)
+
+    ticks = 0
+    for frame in frames(job.script):
+        if ticks >= job.max_ticks or game.game_state != "playing":
+            break
+        game.step(frame)
+        ticks += 1
+
+    return RunResult(
+        name=job.name,
+        level=job.level,
+        completed=game.game_state in ("level_complete", "win"),
+        deaths=game.deaths,
+        score=game.score,
+        ticks=ticks,
+        state=game.game_state,
+        distance=game.player.rect.x,
+        seconds=time.perf_counter() - start,
+        state_hash=game.state_hash,
+    )
+
+
+def _init_worker():
+    # Set here rather than at import, so importing the script helpers
+    # (main.py --script) does not switch the real game to the dummy driver
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    pygame.display.init()
+    pygame.font.init()
+
+
+def run_batch(jobs: Sequence[Job], workers: Optional[int] = None) -> List[RunResult]:
+    """
+    Run jobs across worker processes; results come back in job order
+    workers - process count (None = one per core, 1 = run in this process)
+    """
+    if workers == 1:
+        _init_worker()
+        return [run_job(job) for job in jobs]
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        return list(pool.map(run_job, jobs))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--level", type=int, default=1)
+    parser.add_argument("--runs", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--ticks", type=int, default=LEVEL_TIME * FPS, help="tick budget per run")
+    parser.add_argument("--script", help="input script (default: a random bot per run)")
+    parser.add_argument("--json", action="store_true", help="print one JSON result per run")
+    args = parser.parse_args(argv)
+
+    fixed = parse_script(args.script) if args.script else None
+    jobs = [Job(args.level, fixed or random_script(run), args.ticks, seed=run, name=f"run{run}")
+            for run in range(args.runs)]
+
+    start = time.perf_counter()
+    results = run_batch(jobs, args.workers)
+    elapsed = time.perf_counter() - start
+
+    if args.json:
+        for result in results:
+            print(json.dumps(asdict(result)))
+    else:
+        for result in results:
+            print(f"{result.name:<8} {result.state:<15} score {result.score:>6} "
+                  f"deaths {result.deaths} ticks {result.ticks:>6} x {result.distance}")
+    ticks = sum(result.ticks for result in results)
+    completed = sum(result.completed for result in results)
+    print(f"{len(results)} runs, {completed} completed, {ticks} ticks in {elapsed:.2f} s "
+          f"({ticks / elapsed:.0f} ticks/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
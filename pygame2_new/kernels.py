@@ -0,0 +1,165 @@
+"""
+Collision Kernels
+Array versions of the hottest collision loops. When Numba is importable the
+loop implementations are JIT-compiled (and cached on disk, so only the first
+start pays for compilation); otherwise NumPy equivalents are used. Both
+paths give the results of the Player/Enemy object loops - see
+tests/test_kernels.py.
+
+Set PYGAME2_NO_NUMBA=1 to force the NumPy path.
+"""
+import os
+import numpy as np
+from typing import Tuple
+
+try:
+    if os.environ.get("PYGAME2_NO_NUMBA"):
+        raise ImportError("disabled by PYGAME2_NO_NUMBA")
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:
+    njit = None
+    HAVE_NUMBA = False
+
+
+def _compile(function):
+    return njit(cache=True, nogil=True)(function) if HAVE_NUMBA else None
+
+
+# === LOOP IMPLEMENTATIONS (compiled by Numba) ===
+
+def _first_overlap_loop(left, top, right, bottom, colliders):
+    """Lowest collider index overlapping each box, -1 where none does"""
+    first = np.full(left.shape[0], -1, dtype=np.int64)
+    for i in range(left.shape[0]):
+        for j in range(colliders.shape[0]):
+            if (left[i] < colliders[j, 2] and right[i] > colliders[j, 0]
+                    and top[i] < colliders[j, 3] and bottom[i] > colliders[j, 1]):
+                first[i] = j
+                break
+    return first
+
+
+def _grid_first_overlap_loop(left, top, right, bottom, cell, table, edges, colliders):
+    """Same as _first_overlap_loop, but only over the ids listed in table[cell]"""
+    first = np.full(left.shape[0], -1, dtype=np.int64)
+    for i in range(left.shape[0]):
+        row = cell[i]
+        for k in range(table.shape[1]):
+            j = table[row, k]
+            if j < 0:
+                break
+            if (left[i] < colliders[j, 2] and right[i] > colliders[j, 0]
+                    and top[i] < colliders[j, 3] and bottom[i] > colliders[j, 1]):
+                first[i] = j
+                break
+    return first
+
+
+def _resolve_x_loop(rect, velocity_x, boxes):
+    """
+    Player.check_collision_x against boxes in order
+    rect - (left, top, width, height); returns the new left
+    """
+    x = rect[0]
+    y = rect[1]
+    width = rect[2]
+    height = rect[3]
+    for j in range(boxes.shape[0]):
+        if (x < boxes[j, 2] and x + width > boxes[j, 0]
+                and y < boxes[j, 3] and y + height > boxes[j, 1]):
+            if velocity_x > 0:
+                x = boxes[j, 0] - width
+            elif velocity_x < 0:
+                x = boxes[j, 2]
+    return x
+
+
+def _resolve_y_loop(rect, velocity_y, boxes, head):
+    """
+    Player.check_collision_y against boxes in order
+    head - box also stops upward movement (False for blocks, game.py bumps them)
+    Returns (new top, new velocity_y, landed)
+    """
+    x = rect[0]
+    y = rect[1]
+    width = rect[2]
+    height = rect[3]
+    landed = False
+    for j in range(boxes.shape[0]):
+        if (x < boxes[j, 2] and x + width > boxes[j, 0]
+                and y < boxes[j, 3] and y + height > boxes[j, 1]):
+            if velocity_y > 0:
+                y = boxes[j, 1] - height
+                velocity_y = 0.0
+                landed = True
+            elif velocity_y < 0 and head[j]:
+                y = boxes[j, 3]
+                velocity_y = 0.0
+    return y, velocity_y, landed
+
+
+# === NUMPY IMPLEMENTATIONS ===
+
+def _overlaps(rect, boxes) -> np.ndarray:
+    x, y, width, height = rect
+    return ((x < boxes[:, 2]) & (x + width > boxes[:, 0]) &
+            (y < boxes[:, 3]) & (y + height > boxes[:, 1]))
+
+
+def _first_overlap_numpy(left, top, right, bottom, colliders):
+    if len(colliders) == 0:
+        return np.full(len(left), -1, dtype=np.int64)
+    hit = ((left[:, None] < colliders[:, 2]) & (right[:, None] > colliders[:, 0]) &
+           (top[:, None] < colliders[:, 3]) & (bottom[:, None] > colliders[:, 1]))
+    return np.where(hit.any(axis=1), hit.argmax(axis=1), -1)
+
+
+def _grid_first_overlap_numpy(left, top, right, bottom, cell, table, edges, colliders):
+    c_left, c_top, c_right, c_bottom = edges[:, cell]
+    hit = ((left[:, None] < c_right) & (right[:, None] > c_left) &
+           (top[:, None] < c_bottom) & (bottom[:, None] > c_top))
+    column = hit.argmax(axis=1)
+    first = table[cell, column]
+    return np.where(hit[np.arange(len(cell)), column], first, -1)
+
+
+def _resolve_x_numpy(rect, velocity_x, boxes):
+    # Nothing changes before the first overlap; replay the rest in order
+    hit = _overlaps(rect, boxes)
+    if not hit.any():
+        return rect[0]
+    return _resolve_x_loop(rect, velocity_x, boxes[hit.argmax():])
+
+
+def _resolve_y_numpy(rect, velocity_y, boxes, head):
+    hit = _overlaps(rect, boxes)
+    if not hit.any():
+        return rect[1], velocity_y, False
+    first = hit.argmax()
+    return _resolve_y_loop(rect, velocity_y, boxes[first:], head[first:])
+
+
+# === PUBLIC KERNELS ===
+
+first_overlap = _compile(_first_overlap_loop) or _first_overlap_numpy
+grid_first_overlap = _compile(_grid_first_overlap_loop) or _grid_first_overlap_numpy
+_resolve_x = _compile(_resolve_x_loop) or _resolve_x_numpy
+_resolve_y = _compile(_resolve_y_loop) or _resolve_y_numpy
+
+
+def resolve_x(rect, velocity_x: float, boxes: np.ndarray) -> float:
+    """New rect.left after pushing a moving rect out of boxes (in box order)"""
+    return float(_resolve_x(np.asarray(rect, dtype=np.float64), float(velocity_x), boxes))
+
+
+def resolve_y(rect, velocity_y: float, boxes: np.ndarray,
+              head: np.ndarray) -> Tuple[float, float, bool]:
+    """(rect.top, velocity_y, landed) after vertical collision with boxes"""
+    y, velocity_y, landed = _resolve_y(np.asarray(rect, dtype=np.float64),
+                                       float(velocity_y), boxes, head)
+    return float(y), float(velocity_y), bool(landed)
+
+
+# Export classes
+__all__ = ['HAVE_NUMBA', 'first_overlap', 'grid_first_overlap', 'resolve_x', 'resolve_y']
@@ -1,130 +1,319 @@
-﻿import pygame
+﻿import numpy as np
+import pygame
 from config import *
-from platform import Platform
+from platforms import Platform
 from enemy import Enemy
 from coin import Coin
 from flag import Flag
 from powerup import PowerUp
 from mario_blocks import Block, Pipe, Mushroom, FireFlower
+from ecs import ComponentStore, colliders_from_rects
+from containers import EntityList
+from crowd import ColliderGrid, CrowdSimulation
+from entity_base import CollisionSystem
+from surfaces import SurfaceGraph
+from scheduler import ActiveSet
+from level_data import load_level, level_path
+from streaming import LevelStreamer, LEVEL_OBJECTS
+from tilemap import TileMap, BLOCK_TILES, COIN_OFFSET, T_COIN
+from snapshot import SnapshotWriter, SnapshotReader
 
 class Level:
-    def __init__(self, level_number):
+    def __init__(self, level_number, data=None, streaming=None):
+        """
+        data - hotová LevelData (jinak se načte levels/level_<level_number>.json)
+        streaming - načítat jen chunky kolem kamery (None = podle délky levelu)
+        """
         self.level_number = level_number
         self.platforms = []
-        self.enemies = []
-        self.coins = []
-        self.powerups = []
+        self.enemies = EntityList()
+        self.coins = EntityList()
+        self.powerups = EntityList()
         self.blocks = []
         self.pipes = []
-        self.mushrooms = []
-        self.flowers = []
+        self.mushrooms = EntityList()
+        self.flowers = EntityList()
         self.flag = None
         
-        if level_number == 1:
-            self.create_level_1()
-        elif level_number == 2:
-            self.create_level_2()
-        elif level_number == 3:
-            self.create_level_3()
-            
-    def create_level_1(self):
-        ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
-        self.platforms.append(Platform(0, ground_y, 400, GROUND_HEIGHT))
-        self.platforms.append(Platform(400, ground_y, 200, GROUND_HEIGHT))
-        self.platforms.append(Platform(650, ground_y, 250, GROUND_HEIGHT))
-        self.platforms.append(Platform(950, ground_y, 350, GROUND_HEIGHT))
-        self.platforms.append(Platform(1350, ground_y, 400, GROUND_HEIGHT))
-        self.platforms.append(Platform(1800, ground_y, 600, GROUND_HEIGHT))
-        self.platforms.append(Platform(500, 370, 80, 20))
-        self.platforms.append(Platform(650, 320, 80, 20))
-        self.platforms.append(Platform(1100, 380, 100, 20))
-        self.blocks.append(Block(320, 370, "question", "coin"))
-        self.blocks.append(Block(360, 370, "question", "powerup"))
-        self.blocks.append(Block(400, 370, "brick"))
-        self.blocks.append(Block(440, 370, "question", "coin"))
-        self.blocks.append(Block(560, 320, "question", "coin"))
-        self.blocks.append(Block(700, 270, "question", "powerup"))
-        self.blocks.append(Block(900, 370, "brick"))
-        self.blocks.append(Block(940, 370, "brick"))
-        self.blocks.append(Block(980, 370, "brick"))
-        self.blocks.append(Block(1020, 370, "question", "coin"))
-        self.blocks.append(Block(1060, 370, "brick"))
-        for i in range(8):
-            self.blocks.append(Block(1200 + i*40, 320, "brick"))
-        self.blocks.append(Block(1360, 320, "question", "powerup"))
-        self.pipes.append(Pipe(450, ground_y - 80, 2))
-        self.pipes.append(Pipe(750, ground_y - 120, 3))
-        self.pipes.append(Pipe(1150, ground_y - 160, 4))
-        self.pipes.append(Pipe(1600, ground_y - 120, 3))
-        self.enemies.append(Enemy(380, ground_y - 40))
-        self.enemies.append(Enemy(420, ground_y - 40))
-        self.enemies.append(Enemy(800, ground_y - 40))
-        self.enemies.append(Enemy(950, ground_y - 40))
-        self.enemies.append(Enemy(1000, ground_y - 40))
-        self.enemies.append(Enemy(1400, ground_y - 40))
-        self.enemies.append(Enemy(1500, ground_y - 40))
-        for i in range(5):
-            self.coins.append(Coin(600 + i*30, 350))
-        for i in range(4):
-            self.coins.append(Coin(1110 + i*30, 320))
-        self.flag = Flag(2200, SCREEN_HEIGHT - GROUND_HEIGHT - 180)
+        # Dynamické objekty (nepřátelé, houby) sdílí jeden ComponentStore
+        self.store = ComponentStore()
         
-    def create_level_2(self):
-        ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
-        self.platforms.append(Platform(0, ground_y, 2500, GROUND_HEIGHT))
-        for i in range(5):
-            width = 60 + i*20
-            self.platforms.append(Platform(300 + i*100, ground_y - 60 - i*50, width, 20))
-        self.platforms.append(Platform(900, ground_y - 150, 200, 20))
-        self.platforms.append(Platform(1200, ground_y - 200, 150, 20))
-        self.pipes.append(Pipe(200, ground_y - 80, 2))
-        self.pipes.append(Pipe(500, ground_y - 120, 3))
-        self.pipes.append(Pipe(800, ground_y - 160, 4))
-        self.pipes.append(Pipe(1100, ground_y - 120, 3))
-        self.pipes.append(Pipe(1500, ground_y - 160, 4))
-        self.pipes.append(Pipe(1800, ground_y - 200, 5))
-        self.pipes.append(Pipe(2100, ground_y - 120, 3))
-        for i in range(12):
-            self.blocks.append(Block(400 + i*40, 300, "brick"))
-        self.blocks.append(Block(600, 300, "question", "coin"))
-        self.blocks.append(Block(720, 300, "question", "powerup"))
-        for height in range(5):
-            self.blocks.append(Block(1000, ground_y - 80 - height*40, "brick"))
-            self.blocks.append(Block(1040, ground_y - 80 - height*40, "brick"))
-        self.blocks.append(Block(1300, 250, "question", "coin"))
-        self.blocks.append(Block(1600, 200, "question", "powerup"))
-        self.enemies.append(Enemy(350, ground_y - 40))
-        self.enemies.append(Enemy(600, ground_y - 40))
-        self.enemies.append(Enemy(650, ground_y - 40))
-        self.enemies.append(Enemy(1200, ground_y - 40))
-        self.enemies.append(Enemy(1400, ground_y - 40))
-        self.enemies.append(Enemy(1900, ground_y - 40))
-        for i in range(10):
-            self.coins.append(Coin(950 + i*30, ground_y - 100))
-        for i in range(6):
-            self.coins.append(Coin(1250 + i*30, 220))
-        self.flag = Flag(2300, SCREEN_HEIGHT - GROUND_HEIGHT - 180)
+        # Bloky se updatují jen během bump animace; otazníky jedou na sdílených hodinách
+        self.active_blocks = ActiveSet()
+        self.colliders = None
+        self.crowd = None
+        self.surfaces = None
+        self._coin_list = []
+        self._coin_boxes = None
+        self._coin_version = -1
+        self._solids = None
+        self._objects = None    # Původní objekty v pořadí souboru (i ty už odebrané)
+        self._positions = None  # Kategorie -> {id(objekt): pořadí v souboru} pro snapshoty
         
-    def create_level_3(self):
-        ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
-        self.platforms.append(Platform(0, ground_y, 200, GROUND_HEIGHT))
-        self.platforms.append(Platform(1800, ground_y, 600, GROUND_HEIGHT))
-        platforms_config = [(200, 480, 80), (350, 420, 70), (500, 360, 70), (650, 300, 80), (500, 240, 70), (350, 180, 80), (550, 180, 80), (750, 240, 100), (900, 300, 80), (1050, 250, 100), (1200, 320, 80), (1350, 380, 100), (1500, 440, 120), (1670, 380, 100)]
-        for x, y, width in platforms_config:
-            self.platforms.append(Platform(x, y, width, 20))
-        blocks_config = [(220, 400, "question", "coin"), (380, 340, "question", "powerup"), (530, 280, "question", "coin"), (680, 220, "question", "powerup"), (530, 160, "question", "coin"), (780, 160, "question", "coin"), (1080, 170, "question", "powerup"), (1230, 240, "question", "coin"), (1380, 300, "question", "powerup")]
-        for x, y, block_type, content in blocks_config:
-            self.blocks.append(Block(x, y, block_type, content))
-        brick_positions = [(260, 400), (420, 340), (460, 340), (720, 220), (820, 160), (860, 160)]
-        for x, y in brick_positions:
-            self.blocks.append(Block(x, y, "brick"))
-        self.pipes.append(Pipe(300, 460, 2))
-        self.pipes.append(Pipe(800, 420, 3))
-        self.pipes.append(Pipe(1700, 470, 3))
-        enemies_config = [(230, 430), (380, 370), (680, 250), (800, 190), (1100, 200), (1240, 270), (1530, 390), (1710, 330)]
-        for x, y in enemies_config:
-            self.enemies.append(Enemy(x, y))
-        coin_positions = [(380, 370), (530, 310), (930, 250), (1230, 270), (1530, 390)]
-        for x, y in coin_positions:
-            self.coins.append(Coin(x, y))
-        self.flag = Flag(2200, SCREEN_HEIGHT - GROUND_HEIGHT - 180)
+        # Objekty z datového souboru levelu (levels/level_N.json přes binární cache)
+        if data is None:
+            data = load_level(level_path(level_number))
+        self.name = data.name
+        self.width = data.extent()
+        if len(data.flag):
+            self.flag = Flag(*data.flag[0].tolist())
+        
+        # Bloky a mince obřích levelů v tile mapě (memmap) - jen se streamováním
+        self.tilemap = None
+        if data.tilemap:
+            self.tilemap = TileMap(data.tilemap)
+            self.width = max(self.width, self.tilemap.width)
+            if streaming is False:
+                raise ValueError("Level s tile mapou se vždy streamuje")
+        
+        if streaming is None:
+            streaming = self.width > STREAM_MIN_WIDTH or self.tilemap is not None
+        self.streamer = None
+        if streaming:
+            # Dlouhý level - objekty vznikají/zanikají po chunkách (viz streaming.py)
+            self.streamer = LevelStreamer(self, data)
+        else:
+            self.build(data)
+            self.reindex()
+    
+    def make_object(self, category, values, data):
+        """Jeden objekt levelu z řádku LevelData (category = název seznamu v Level)"""
+        if category == 'platforms':
+            return Platform(*values)
+        if category == 'blocks':
+            x, y, block_type, content = values
+            return Block(x, y, data.string(block_type), data.string(content))
+        if category == 'pipes':
+            return Pipe(*values)
+        if category == 'enemies':
+            x, y, move_range = values
+            return Enemy(x, y, move_range, store=self.store)
+        if category == 'coins':
+            return Coin(*values)
+        if category == 'powerups':
+            x, y, powerup_type = values
+            return PowerUp(x, y, data.string(powerup_type))
+        raise ValueError(f"Neznámá kategorie objektů: {category}")
+    
+    def make_tile(self, x, y, tile):
+        """Objekt jedné buňky tile mapy (blok, nebo mince uprostřed buňky)"""
+        if tile == T_COIN:
+            return Coin(x + COIN_OFFSET, y + COIN_OFFSET)
+        block_type, content = BLOCK_TILES[tile]
+        return Block(x, y, block_type, content)
+    
+    def build(self, data):
+        """Vytvoří všechny objekty levelu z LevelData (v pořadí jako v souboru)"""
+        for category in LEVEL_OBJECTS:
+            objects = getattr(self, category)
+            for values in getattr(data, category).tolist():
+                objects.append(self.make_object(category, values, data))
+        self._positions = {category: {id(obj): position
+                                      for position, obj in enumerate(getattr(self, category))}
+                           for category in ('blocks', 'enemies', 'coins', 'powerups')}
+        self._objects = {category: list(getattr(self, category))
+                         for category in ('enemies', 'coins', 'powerups')}
+    
+    def reindex(self):
+        """Přepočítá indexy nad statickými objekty (po sestavení nebo výměně chunků)"""
+        # Platformy jsou statické - mřížka kolizí se počítá jen při změně jejich množiny
+        self.colliders = ColliderGrid(colliders_from_rects(self.platforms))
+        if self.crowd is None:
+            self.crowd = CrowdSimulation(self.store, self.colliders)
+        else:
+            self.crowd.grid = self.colliders
+        self._solids = None
+        # Graf pochozích ploch (hrany plošin pro nepřátele); staré úseky přestanou platit
+        if self.surfaces is not None:
+            for span in self.surfaces.spans():
+                span.valid = False
+        self.surfaces = SurfaceGraph.from_level(self)
+        
+        for block in self.blocks:
+            block.scheduler = self.active_blocks
+        # Prostorový index bloků po sloupcích (náraz hlavou testuje jen bloky nad hráčem)
+        self.block_columns = {}
+        for order, block in enumerate(self.blocks):
+            for column in range(block.rect.left // BLOCK_COLUMN, (block.rect.right - 1) // BLOCK_COLUMN + 1):
+                self.block_columns.setdefault(column, []).append((order, block))
+    
+    def spawn_mushroom(self, x, y):
+        mushroom = Mushroom(x, y, store=self.store)
+        self.mushrooms.append(mushroom)
+        return mushroom
+    
+    def update_entities(self, index=None, dt=None):
+        """
+        Posune nepřátele a houby jedním průchodem systémů
+        index/dt - jen vybrané sloty a kolik ticků dohánějí (LODScheduler)
+        """
+        self.store.step(self.colliders, index, dt)
+    
+    def blocks_near(self, rect):
+        """Bloky ve sloupcích, které rect zasahuje (v pořadí self.blocks)"""
+        first = rect.left // BLOCK_COLUMN
+        last = (rect.right - 1) // BLOCK_COLUMN
+        if first == last:
+            return [block for _, block in self.block_columns.get(first, ())]
+        found = {}
+        for column in range(first, last + 1):
+            found.update(self.block_columns.get(column, ()))
+        return [found[order] for order in sorted(found)]
+    
+    def break_block(self, block):
+        """Rozbitá cihla zmizí i z grafu pochozích ploch"""
+        self.surfaces.remove_solid(block.rect)
+        self._solids = None
+    
+    def solids(self):
+        """
+        Pevné obdélníky pro kolize hráče jako (boxes, head) - platformy,
+        nerozbité bloky a pipes v pořadí, v jakém je testuje Player;
+        head říká, jestli box zastaví i skok (bloky ne, ty řeší hit_block)
+        """
+        if self._solids is None:
+            blocks = [block for block in self.blocks if not block.broken]
+            rects = ([platform.rect for platform in self.platforms] +
+                     [block.rect for block in blocks] +
+                     [pipe.rect for pipe in self.pipes])
+            head = np.ones(len(rects), dtype=np.bool_)
+            head[len(self.platforms):len(self.platforms) + len(blocks)] = False
+            self._solids = (CollisionSystem.to_boxes(rects), head)
+        return self._solids
+    
+    def coin_boxes(self):
+        """
+        (živé mince, pole jejich obdélníků ve stejném pořadí) - přepočítá se
+        jen po změně seznamu
+        """
+        if self._coin_version != self.coins.version:
+            self._coin_list = list(self.coins)
+            self._coin_boxes = CollisionSystem.to_boxes(coin.rect for coin in self._coin_list)
+            self._coin_version = self.coins.version
+        return self._coin_list, self._coin_boxes
+    
+    def flush_removals(self):
+        """Odložené mazání - volá se jednou na konci ticku"""
+        removed = 0
+        for entities in (self.enemies, self.coins, self.powerups, self.mushrooms, self.flowers):
+            removed += entities.flush()
+        return removed
+    
+    # === SNAPSHOTY ===
+    
+    def snapshot(self):
+        """Měnitelný stav levelu jako binární blob (viz snapshot.py)"""
+        out = SnapshotWriter()
+        self.write_snapshot(out)
+        return out.getvalue()
+    
+    def restore(self, blob):
+        """Vrátí level do stavu ze snapshot() - jen téhož levelu"""
+        self.read_snapshot(SnapshotReader(blob))
+    
+    def _live(self, category):
+        """Pořadí živých objektů kategorie (v pořadí seznamu) jako indexy v souboru"""
+        entities = getattr(self, category)
+        positions = self._positions[category]
+        return [positions[id(obj)] for obj in entities if obj in entities]
+    
+    def write_snapshot(self, out):
+        """
+        Bloky, mince, power-upy, nepřátelé, houby, květiny a ComponentStore
+        Bere se mezi ticky (po flush_removals); objekty se odkazují pořadím
+        v datovém souboru, takže snapshot jde obnovit i do čerstvě postaveného
+        levelu téhož čísla
+        """
+        if self._positions is None:
+            raise ValueError("Snapshot streamovaného levelu není podporován")
+        objects = self._objects
+        out.section(b"LEVL")
+        out.pack("i4I", self.level_number, len(self.blocks), len(objects['enemies']),
+                 len(objects['coins']), len(objects['powerups']))
+        self.store.write_snapshot(out)
+        
+        # Bloky a jejich bump animace
+        out.array([(block.hit, block.broken, block.bump_offset) for block in self.blocks], np.int8)
+        positions = self._positions['blocks']
+        out.array([positions[id(block)] for block in self.active_blocks], np.int32)
+        out.pack("q", self.active_blocks.clock.ticks)
+        
+        # Mince a power-upy: které ještě jsou v seznamu (a v jakém pořadí) + jejich stav
+        for category in ('coins', 'powerups'):
+            out.array(self._live(category), np.int32)
+            out.array([item.collected for item in objects[category]], np.bool_)
+            out.array([item.animation_offset for item in objects[category]], np.float64)
+        
+        # Nepřátelé: živí odkazují na svůj slot ve store
+        out.array(self._live('enemies'), np.int32)
+        out.array([(enemy.alive, -1 if enemy.handle is None else enemy.handle)
+                   for enemy in objects['enemies']], np.int64)
+        
+        # Houby a květiny vznikají za hry - uloží se celé
+        out.array([mushroom.handle for mushroom in self.mushrooms
+                   if mushroom.handle is not None], np.int64)
+        out.data([(flower.rect.x, flower.rect.y, flower.collected, flower.animation_offset,
+                   flower.spawning, flower.spawn_offset)
+                  for flower in self.flowers])
+    
+    def read_snapshot(self, src):
+        if self._positions is None:
+            raise ValueError("Snapshot streamovaného levelu není podporován")
+        objects = self._objects
+        src.expect(b"LEVL")
+        number, *counts = src.unpack("i4I")
+        if (number, counts) != (self.level_number,
+                                [len(self.blocks), len(objects['enemies']),
+                                 len(objects['coins']), len(objects['powerups'])]):
+            raise ValueError(f"Snapshot patří k jinému levelu (level {number})")
+        self.store.read_snapshot(src)
+        
+        broken = [block.broken for block in self.blocks]
+        for block, (hit, is_broken, bump_offset) in zip(self.blocks, src.array(np.int8).tolist()):
+            block.hit = bool(hit)
+            block.broken = bool(is_broken)
+            block.bump_offset = bump_offset
+        for block in list(self.active_blocks):
+            self.active_blocks.deactivate(block)
+        for position in src.array(np.int32).tolist():
+            self.active_blocks.activate(self.blocks[position])
+        self.active_blocks.clock.ticks = src.value("q")
+        
+        for category in ('coins', 'powerups'):
+            live = src.array(np.int32).tolist()
+            items = objects[category]
+            for item, collected, offset in zip(items, src.array(np.bool_).tolist(),
+                                               src.array(np.float64).tolist()):
+                item.collected = collected
+                item.animation_offset = offset
+            entities = getattr(self, category)
+            entities.clear()
+            entities.extend(items[position] for position in live)
+        
+        live = src.array(np.int32).tolist()
+        enemies = objects['enemies']
+        for enemy, (alive, handle) in zip(enemies, src.array(np.int64).tolist()):
+            enemy.alive = bool(alive)
+            if handle >= 0:
+                enemy.attach(self.store, handle)
+        self.enemies.clear()
+        self.enemies.extend(enemies[position] for position in live)
+        
+        self.mushrooms.clear()
+        for handle in src.array(np.int64).tolist():
+            mushroom = Mushroom.attached(self.store, handle)
+            mushroom._collected = False
+            self.mushrooms.append(mushroom)
+        self.flowers.clear()
+        for x, y, collected, offset, spawning, spawn_offset in src.data():
+            flower = FireFlower(x, y)
+            flower.collected = collected
+            flower.animation_offset = offset
+            flower.spawning = spawning
+            flower.spawn_offset = spawn_offset
+            self.flowers.append(flower)
+        
+        # Jiné rozbité cihly = jiné pevné plochy
+        if broken != [block.broken for block in self.blocks]:
+            self.reindex()
+        self._solids = None
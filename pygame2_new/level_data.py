@@ -0,0 +1,254 @@
+"""
+Level Data
+Declarative level files (levels/level_N.json) compiled into a compact binary
+cache. The cache is keyed by a hash of the source, so editing a level file
+invalidates it automatically; loads after the first skip JSON parsing.
+
+Source format - every entry is a flat list:
+    platforms: [x, y, width, height]
+    blocks:    [x, y, block_type, content or null]
+    pipes:     [x, y, height in segments]
+    enemies:   [x, y, move_range]
+    coins:     [x, y]
+    powerups:  [x, y, powerup_type]
+    flag:      [x, y]
+    tilemap:   "file.tiles" (optional, blocks/coins in a memory-mapped tile
+               map next to the level file - see tilemap.py)
+"""
+import hashlib
+import json
+import os
+import struct
+import threading
+from typing import Dict, List, Optional
+import numpy as np
+
+LEVEL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "levels")
+CACHE_DIR = os.path.join(LEVEL_DIR, "__cache__")
+
+MAGIC = b"MLVL"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sH16sH")    # magic, version, source hash, section count
+_SECTION = struct.Struct("<4sIH")      # tag, rows, columns (int32 each)
+
+# (section tag, attribute, columns, columns holding string-table indices)
+_LAYOUT = (
+    (b"PLAT", 'platforms', 4, ()),
+    (b"BLCK", 'blocks', 4, (2, 3)),
+    (b"PIPE", 'pipes', 3, ()),
+    (b"ENMY", 'enemies', 3, ()),
+    (b"COIN", 'coins', 2, ()),
+    (b"POWR", 'powerups', 3, (2,)),
+    (b"FLAG", 'flag', 2, ()),
+)
+
+
+class LevelData:
+    """
+    One level as int32 arrays (one row per object, in file order)
+    String fields (block types, contents, powerup types) are indices into
+    strings; -1 stands for None.
+    """
+    __slots__ = (('name', 'strings', 'source_hash', 'tilemap')
+                 + tuple(layout[1] for layout in _LAYOUT))
+
+    def __init__(self, name: str = "", strings: Optional[List[str]] = None,
+                 source_hash: bytes = b"\0" * 16, tilemap: str = "", **arrays):
+        self.name = name
+        self.strings = strings if strings is not None else []
+        self.source_hash = source_hash
+        self.tilemap = tilemap  # Tile map file path ("" = none)
+        for _, attribute, columns, _ in _LAYOUT:
+            rows = arrays.get(attribute)
+            array = (np.zeros((0, columns), dtype=np.int32) if rows is None
+                     else np.asarray(rows, dtype=np.int32).reshape(-1, columns))
+            setattr(self, attribute, array)
+
+    def string(self, index: int) -> Optional[str]:
+        return None if index < 0 else self.strings[index]
+
+    def extent(self) -> int:
+        """Rightmost platform edge or object position (level length in px)"""
+        edges = [0]
+        if len(self.platforms):
+            edges.append(int((self.platforms[:, 0] + self.platforms[:, 2]).max()))
+        for _, attribute, _, _ in _LAYOUT[1:]:
+            array = getattr(self, attribute)
+            if len(array):
+                edges.append(int(array[:, 0].max()))
+        return max(edges)
+
+    # === SOURCE ===
+
+    @classmethod
+    def from_source(cls, source: dict, source_hash: bytes = b"\0" * 16) -> 'LevelData':
+        """Compile a parsed level file"""
+        strings: List[str] = []
+        lookup: Dict[str, int] = {}
+
+        def intern(value) -> int:
+            if value is None:
+                return -1
+            if value not in lookup:
+                lookup[value] = len(strings)
+                strings.append(value)
+            return lookup[value]
+
+        arrays = {}
+        for _, attribute, columns, string_columns in _LAYOUT:
+            rows = source.get(attribute) or []
+            if attribute == 'flag' and rows:
+                rows = [rows]
+            packed = []
+            for row in rows:
+                if len(row) != columns:
+                    raise ValueError(f"{attribute}: expected {columns} values, got {row!r}")
+                packed.append([intern(value) if column in string_columns else int(value)
+                               for column, value in enumerate(row)])
+            arrays[attribute] = packed
+        return cls(source.get("name", ""), strings, source_hash,
+                   source.get("tilemap") or "", **arrays)
+
+    def to_source(self) -> dict:
+        """Inverse of from_source (the level file as a dict)"""
+        source = {"name": self.name}
+        if self.tilemap:
+            source["tilemap"] = self.tilemap
+        for _, attribute, _, string_columns in _LAYOUT:
+            rows = [[self.string(value) if column in string_columns else value
+                     for column, value in enumerate(row)]
+                    for row in getattr(self, attribute).tolist()]
+            if attribute == 'flag':
+                if rows:
+                    source['flag'] = rows[0]
+            else:
+                source[attribute] = rows
+        return source
+
+    # === BINARY CACHE ===
+
+    def to_bytes(self) -> bytes:
+        text = "\0".join([self.name, self.tilemap] + self.strings).encode("utf-8")
+        parts = [_HEADER.pack(MAGIC, FORMAT_VERSION, self.source_hash, len(_LAYOUT) + 1),
+                 _SECTION.pack(b"STRS", len(text), 0), text]
+        for tag, attribute, columns, _ in _LAYOUT:
+            array = getattr(self, attribute)
+            parts.append(_SECTION.pack(tag, len(array), columns))
+            parts.append(array.astype("<i4").tobytes())
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'LevelData':
+        magic, version, source_hash, sections = _HEADER.unpack_from(data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a level cache of this version")
+        offset = _HEADER.size
+        strings = ["", ""]
+        arrays = {}
+        attributes = {tag: attribute for tag, attribute, _, _ in _LAYOUT}
+        for _ in range(sections):
+            tag, rows, columns = _SECTION.unpack_from(data, offset)
+            offset += _SECTION.size
+            if tag == b"STRS":
+                strings = data[offset:offset + rows].decode("utf-8").split("\0")
+                offset += rows
+                continue
+            count = rows * columns
+            arrays[attributes[tag]] = np.frombuffer(
+                data, dtype="<i4", count=count, offset=offset).reshape(rows, columns)
+            offset += count * 4
+        return cls(strings[0], strings[2:], source_hash, strings[1], **arrays)
+
+
+def level_path(number: int) -> str:
+    return os.path.join(LEVEL_DIR, f"level_{number}.json")
+
+
+def level_count() -> int:
+    """Number of consecutive level files level_1.json, level_2.json, ..."""
+    count = 0
+    while os.path.exists(level_path(count + 1)):
+        count += 1
+    return count
+
+
+def source_hash(source: bytes) -> bytes:
+    return hashlib.blake2b(source, digest_size=16,
+                           person=b"mlvl-v%d" % FORMAT_VERSION).digest()
+
+
+def _located(data: LevelData, path: str) -> LevelData:
+    """Tile map path relative to the level file -> usable path"""
+    if data.tilemap:
+        data.tilemap = os.path.join(os.path.dirname(os.path.abspath(path)), data.tilemap)
+    return data
+
+
+def compile_level(path: str) -> LevelData:
+    """Parse and compile a level file, ignoring the cache"""
+    with open(path, "rb") as file:
+        source = file.read()
+    return _located(LevelData.from_source(json.loads(source), source_hash(source)), path)
+
+
+def load_level(path: str, cache_dir: Optional[str] = CACHE_DIR) -> LevelData:
+    """
+    Level from its cache when the cache matches the source, otherwise
+    compile it and (re)write the cache
+    cache_dir=None disables caching
+    """
+    if cache_dir is None:
+        return compile_level(path)
+    with open(path, "rb") as file:
+        source = file.read()
+    digest = source_hash(source)
+
+    cache_path = os.path.join(cache_dir, os.path.splitext(os.path.basename(path))[0] + ".bin")
+    try:
+        with open(cache_path, "rb") as file:
+            cached = file.read()
+        magic, version, cached_hash, _ = _HEADER.unpack_from(cached)
+        if (magic, version, cached_hash) == (MAGIC, FORMAT_VERSION, digest):
+            return _located(LevelData.from_bytes(cached), path)
+    except (OSError, ValueError, KeyError, struct.error):
+        pass  # Missing, stale or damaged cache - recompile
+
+    data = LevelData.from_source(json.loads(source), digest)
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        temp_path = f"{cache_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data.to_bytes())
+        os.replace(temp_path, cache_path)  # Readers never see a half-written cache
+    except OSError:
+        pass  # Read-only install: run without a cache
+    return _located(data, path)
+
+
+def save_level(data: LevelData, path: str):
+    """Write a level file in the layout of the hand-made ones (one object per line)"""
+    source = data.to_source()
+    lines = ["{", f'  "name": {json.dumps(source["name"])},']
+    if data.tilemap:
+        # Stored relative, so the level and its tile map can move together
+        tilemap = os.path.relpath(os.path.abspath(data.tilemap),
+                                  os.path.dirname(os.path.abspath(path)))
+        lines.append(f'  "tilemap": {json.dumps(tilemap)},')
+    for _, attribute, _, _ in _LAYOUT[:-1]:
+        rows = source[attribute]
+        if rows:
+            body = ",\n".join(f"    {json.dumps(row)}" for row in rows)
+            lines.append(f'  "{attribute}": [\n{body}\n  ],')
+        else:
+            lines.append(f'  "{attribute}": [],')
+    lines.append(f'  "flag": {json.dumps(source.get("flag"))}')
+    lines.append("}")
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "w", encoding="utf-8") as file:
+        file.write("\n".join(lines) + "\n")
+    os.replace(temp_path, path)
+
+
+# Export classes
+__all__ = ['LevelData', 'LEVEL_DIR', 'CACHE_DIR', 'level_path', 'level_count',
+           'compile_level', 'load_level', 'save_level']
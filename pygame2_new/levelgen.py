@@ -0,0 +1,287 @@
+"""
+Level Generator
+Seeded procedural levels for scaling tests. Produces LevelData (the same
+thing the level files compile to), so generated levels go through Level,
+streaming, headless runs and benchmarks like the hand-made ones.
+
+    python levelgen.py --length 200000 --enemies 10000 --coins 50000 --out big.json
+    python levelgen.py --length 50000 --ground solid --seed 7 --out levels/level_4.json
+    python levelgen.py --length 20000000 --out huge.json --tilemap huge.tiles
+
+Counts default to DENSITY (objects per 1000 px, roughly level 1) times the
+length; --density scales all defaults, explicit counts override them.
+Solids (platforms, blocks, pipes) never overlap each other and nothing
+spawns inside them: a placement that would is drawn again (a few times,
+then left out). Platform widths are whole tiles (TILE_SIZE), so a level
+bakes a handful of platform sprites rather than one per platform.
+With --tilemap, blocks and coins go to a memory-mapped tile map instead of
+the level file (see tilemap.py).
+"""
+import argparse
+import hashlib
+import sys
+from dataclasses import asdict, dataclass
+from typing import Optional
+
+import numpy as np
+from config import SCREEN_HEIGHT, GROUND_HEIGHT, ENEMY_WIDTH, ENEMY_HEIGHT, COIN_SIZE, TILE_SIZE
+from level_data import LevelData, save_level
+from tilemap import TileMap, bake_tilemap
+
+GROUND_Y = SCREEN_HEIGHT - GROUND_HEIGHT
+GROUND_MODES = ('solid', 'gaps')  # One unbroken floor / floor with jumpable pits
+START_CLEAR = 400   # No objects in front of the player's spawn
+END_CLEAR = 300     # ... nor around the flag
+MIN_LENGTH = 2000
+PLACE_ATTEMPTS = 8  # Rounds of drawing again placements that hit a solid
+PIPE_WIDTH = 60
+
+# Objects per 1000 px of level
+DENSITY = {'platforms': 1.5, 'blocks': 8.0, 'pipes': 1.5,
+           'enemies': 3.0, 'coins': 4.0, 'powerups': 0.25}
+
+# String table of generated levels (indices used in the block/powerup rows)
+_STRINGS = ["question", "brick", "solid", "coin", "powerup", "extra_life", "speed_boost"]
+_QUESTION, _BRICK, _SOLID, _COIN, _POWERUP, _EXTRA_LIFE, _SPEED_BOOST = range(len(_STRINGS))
+
+
+@dataclass(slots=True)
+class LevelSpec:
+    """What to generate; None counts come from DENSITY"""
+    length: int = 20000
+    seed: int = 0
+    ground: str = 'gaps'
+    max_gap: int = 150        # Widest pit (a running jump clears ~180 px)
+    density: float = 1.0      # Scales the DENSITY defaults
+    platforms: Optional[int] = None
+    blocks: Optional[int] = None
+    pipes: Optional[int] = None
+    enemies: Optional[int] = None
+    coins: Optional[int] = None
+    powerups: Optional[int] = None
+    name: str = ''
+
+    def count(self, category: str) -> int:
+        value = getattr(self, category)
+        if value is None:
+            value = round(DENSITY[category] * self.density * self.length / 1000)
+        return int(value)
+
+
+def _ground(spec: LevelSpec, rng) -> np.ndarray:
+    """Floor segments [x, y, width, height] covering 0..length"""
+    if spec.ground not in GROUND_MODES:
+        raise ValueError(f"ground must be one of {GROUND_MODES}, got {spec.ground!r}")
+    if spec.length < MIN_LENGTH:
+        raise ValueError(f"length must be at least {MIN_LENGTH} px, got {spec.length}")
+    segments = []
+    x = 0
+    width = 2 * START_CLEAR  # Safe start
+    while x + width < spec.length - 2 * END_CLEAR:
+        segments.append((x, GROUND_Y, width, GROUND_HEIGHT))
+        x += width
+        if spec.ground == 'gaps' and rng.random() < 0.3:
+            x += int(rng.integers(50, max(50, spec.max_gap) + 1))
+        width = int(rng.integers(5, 18)) * TILE_SIZE  # 200..680
+    segments.append((x, GROUND_Y, spec.length - x, GROUND_HEIGHT))  # Safe finish
+    return np.array(segments, dtype=np.int32)
+
+
+def _on_ground(ground: np.ndarray, count: int, width: int, rng) -> np.ndarray:
+    """count x positions of width-wide objects standing fully on the floor"""
+    left = np.maximum(ground[:, 0], START_CLEAR)
+    right = np.minimum(ground[:, 0] + ground[:, 2], ground[-1, 0] + ground[-1, 2] - END_CLEAR)
+    room = np.maximum(right - left - width, 0).astype(np.float64)  # The start segment has room
+    segment = rng.choice(len(ground), size=count, p=room / room.sum())
+    return (left[segment] + rng.random(count) * room[segment]).astype(np.int64)
+
+
+class _Occupied:
+    """Solid boxes (x, y, width, height) placed so far, bucketed by x columns"""
+    __slots__ = ('_columns',)
+    COLUMN = 256
+
+    def __init__(self):
+        self._columns = {}
+
+    def _span(self, x: int, width: int) -> range:
+        return range(x // self.COLUMN, (x + width - 1) // self.COLUMN + 1)
+
+    def overlaps(self, x: int, y: int, width: int, height: int) -> bool:
+        """True if the box intersects a placed one (touching edges do not count)"""
+        for column in self._span(x, width):
+            for left, top, right, bottom in self._columns.get(column, ()):
+                if x < right and left < x + width and y < bottom and top < y + height:
+                    return True
+        return False
+
+    def add(self, x: int, y: int, width: int, height: int):
+        box = (x, y, x + width, y + height)
+        for column in self._span(x, width):
+            self._columns.setdefault(column, []).append(box)
+
+    def keep_clear(self, boxes: np.ndarray, solid: bool = True) -> np.ndarray:
+        """
+        Mask of the boxes that overlap nothing placed so far (earlier boxes
+        of the same call included); solid=True places the kept ones
+        """
+        keep = np.zeros(len(boxes), dtype=bool)
+        for i, box in enumerate(boxes.tolist()):
+            if not self.overlaps(*box):
+                keep[i] = True
+                if solid:
+                    self.add(*box)
+        return keep
+
+
+def _place(occupied: _Occupied, draw, count: int, solid: bool = True) -> np.ndarray:
+    """
+    Up to count rows from draw(n) -> (n, 4+) x, y, width, height, ... whose
+    boxes stay clear of occupied; rejected ones are drawn again, at most
+    PLACE_ATTEMPTS rounds in all
+    """
+    placed = []
+    missing = count
+    for _ in range(PLACE_ATTEMPTS):
+        rows = np.asarray(draw(missing), dtype=np.int64)
+        rows = rows[occupied.keep_clear(rows[:, :4], solid)]
+        placed.append(rows)
+        missing -= len(rows)
+        if missing <= 0:
+            break
+    return np.concatenate(placed)
+
+
+def _standing(x: np.ndarray, width: int, height) -> np.ndarray:
+    """Boxes of objects standing on the floor at x"""
+    height = np.broadcast_to(height, np.shape(x))
+    return np.column_stack([x, GROUND_Y - height, np.full(len(x), width), height])
+
+
+def _rows(spec: LevelSpec, count: int, spacing: int, longest: int, rng):
+    """
+    x of count objects laid out in runs of 1..longest, spacing px apart,
+    and the run each object belongs to
+    """
+    lengths = rng.integers(1, longest + 1, size=count)  # At least as many runs as needed
+    lengths = lengths[:np.searchsorted(np.cumsum(lengths), count) + 1]
+    starts = rng.integers(START_CLEAR, spec.length - END_CLEAR - longest * spacing,
+                          size=len(lengths))
+    run = np.repeat(np.arange(len(lengths)), lengths)[:count]
+    offset = np.arange(count) - (np.cumsum(lengths) - lengths)[run]
+    return starts[run] + offset * spacing, run
+
+
+def _sorted(rows: np.ndarray) -> np.ndarray:
+    return rows[np.argsort(rows[:, 0], kind='stable')] if len(rows) else rows
+
+
+def generate_level(spec: LevelSpec) -> LevelData:
+    """The level described by spec; the same spec always gives the same level"""
+    rng = np.random.default_rng(spec.seed)
+    ground = _ground(spec, rng)
+    occupied = _Occupied()  # Solids above the floor
+
+    # Block rows at two heights; question blocks hold coins or powerups
+    def block_rows(n):
+        x, run = _rows(spec, n, 40, 5, rng)
+        y = rng.choice([320, 370], size=len(run) and run[-1] + 1)[run]
+        return np.column_stack([x, y, np.full(n, 40), np.full(n, 40)])
+
+    placed = _place(occupied, block_rows, spec.count('blocks'))
+    count = len(placed)
+    kind = rng.choice([_QUESTION, _BRICK, _SOLID], size=count, p=[0.4, 0.55, 0.05])
+    content = np.where(kind == _QUESTION,
+                       np.where(rng.random(count) < 0.75, _COIN, _POWERUP), -1)
+    blocks = _sorted(np.column_stack([placed[:, :2], kind, content]))
+
+    # Pipes stand on the floor
+    count = spec.count('pipes')
+    pipes = _place(occupied, lambda n: _standing(_on_ground(ground, n, PIPE_WIDTH, rng), PIPE_WIDTH,
+                                                 rng.integers(2, 4, size=n) * 40), count)
+    pipes = _sorted(np.column_stack([pipes[:, :2], pipes[:, 3] // 40]))
+
+    # Floating platforms
+    count = spec.count('platforms')
+    floating = _place(occupied, lambda n: np.column_stack([
+        rng.integers(START_CLEAR, spec.length - END_CLEAR - 200, size=n),
+        rng.integers(30, 43, size=n) * 10,   # y 300..420
+        rng.integers(2, 6, size=n) * TILE_SIZE,   # width 80..200
+        np.full(n, 20),
+    ]), count)
+    platforms = np.concatenate([ground, _sorted(floating)])
+
+    # Enemies patrol the floor (never inside a pipe), a fifth of them floating platforms
+    count = spec.count('enemies')
+    on_platforms = int((rng.random(count) < 0.2).sum()) if len(floating) else 0
+    floor = _place(occupied, lambda n: _standing(_on_ground(ground, n, ENEMY_WIDTH, rng),
+                                                 ENEMY_WIDTH, ENEMY_HEIGHT),
+                   count - on_platforms, solid=False)
+
+    def on_platform(n):
+        """Enemy boxes on random floating platforms, plus the platform width"""
+        platform = floating[rng.integers(0, len(floating), size=n)]
+        x = platform[:, 0] + rng.random(n) * (platform[:, 2] - ENEMY_WIDTH)
+        return np.column_stack([x, platform[:, 1] - ENEMY_HEIGHT, np.full(n, ENEMY_WIDTH),
+                                np.full(n, ENEMY_HEIGHT), platform[:, 2]])
+
+    lifted = _place(occupied, on_platform, on_platforms, solid=False)
+    move_range = rng.integers(50, 151, size=len(floor) + len(lifted))
+    move_range[len(floor):] = np.minimum(move_range[len(floor):], lifted[:, 4] // 2)
+    enemies = _sorted(np.column_stack([np.concatenate([floor[:, :2], lifted[:, :2]]), move_range]))
+
+    # Coin rows in the air
+    count = spec.count('coins')
+    x, run = _rows(spec, count, COIN_SIZE + 5, 6, rng)
+    y = (rng.integers(25, 50, size=len(run) and run[-1] + 1) * 10)[run]  # y 250..490
+    coins = _sorted(np.column_stack([x, y]))
+
+    # Powerups lying on the floor
+    count = spec.count('powerups')
+    x = _place(occupied, lambda n: _standing(_on_ground(ground, n, 30, rng), 30, 30),
+               count, solid=False)[:, 0]
+    kind = rng.choice([_EXTRA_LIFE, _SPEED_BOOST], size=len(x))
+    powerups = _sorted(np.column_stack([x, np.full(len(x), GROUND_Y - 30), kind]))
+
+    flag = [[spec.length - 200, GROUND_Y - 180]]
+    source = repr(sorted(asdict(spec).items())).encode()
+    return LevelData(spec.name or f"Generated {spec.seed}", list(_STRINGS),
+                     hashlib.blake2b(source, digest_size=16).digest(),
+                     platforms=platforms, blocks=blocks, pipes=pipes, enemies=enemies,
+                     coins=coins, powerups=powerups, flag=flag)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--length", type=int, default=20000, help="level length in px")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--ground", choices=GROUND_MODES, default='gaps')
+    parser.add_argument("--max-gap", type=int, default=150, help="widest pit in px")
+    parser.add_argument("--density", type=float, default=1.0, help="scale of the default counts")
+    for category in DENSITY:
+        parser.add_argument(f"--{category}", type=int, help=f"number of {category}")
+    parser.add_argument("--name", default="")
+    parser.add_argument("--out", help="level file to write (default: only print the summary)")
+    parser.add_argument("--tilemap", help="put blocks and coins into this tile map file")
+    args = parser.parse_args(argv)
+
+    spec = LevelSpec(args.length, args.seed, args.ground, args.max_gap, args.density,
+                     *(getattr(args, category) for category in DENSITY), name=args.name)
+    try:
+        data = generate_level(spec)
+    except ValueError as error:
+        parser.error(str(error))
+    if args.tilemap:
+        data = bake_tilemap(data, args.tilemap)
+        tiles = TileMap(args.tilemap)
+        print(f"{args.tilemap}: {tiles.columns} x {tiles.rows} tiles, "
+              f"{sum(tiles.counts().values())} used", file=sys.stderr)
+    if args.out:
+        save_level(data, args.out)
+    counts = ", ".join(f"{len(getattr(data, category))} {category}" for category in DENSITY)
+    print(f"{data.name}: {data.extent()} px, {counts}"
+          + (f" -> {args.out}" if args.out else ""), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Level of Detail Scheduler
+Distant entities are updated every Nth tick in round-robin slices and catch
+up the skipped ticks when their slice comes around. Catch-up counts every
+tick the entity was awake since its last update, across tier changes; ticks
+spent asleep outside the simulation region are never caught up.
+"""
+import numpy as np
+from config import LOD_TIERS
+from ecs import ComponentStore
+from typing import Optional, Sequence, Tuple
+
+
+class LODScheduler:
+    """
+    Buckets entities by distance from a focus point (the player)
+
+    tiers - ((max_distance, period), ...) sorted by distance; an entity in a
+            tier with period N is updated on ticks where (slot + tick) % N == 0,
+            so each tick handles roughly 1/N of that tier
+    """
+    __slots__ = ('tiers', 'tick', '_limits', '_periods', '_last_update', '_last_seen',
+                 '_generation', 'tier_counts', 'due_count')
+
+    def __init__(self, tiers: Sequence[Tuple[float, int]] = LOD_TIERS):
+        self.tiers = tuple(tiers)
+        self.tick = 0
+        self._limits = np.array([limit for limit, _ in self.tiers], dtype=np.float64)
+        self._periods = np.array([period for _, period in self.tiers], dtype=np.int64)
+        self._last_update = np.zeros(0, dtype=np.int64)
+        self._last_seen = np.zeros(0, dtype=np.int64)   # Last tick the slot was awake
+        self._generation = np.zeros(0, dtype=np.uint32)
+        self.tier_counts = [0] * len(self.tiers)
+        self.due_count = 0
+
+    @property
+    def max_period(self) -> int:
+        return int(self._periods.max())
+
+    def _sync(self, store: ComponentStore):
+        """Grow bookkeeping with the store and reset recycled slots"""
+        if len(self._last_update) < store.capacity:
+            grow = store.capacity - len(self._last_update)
+            self._last_update = np.concatenate(
+                [self._last_update, np.full(grow, self.tick - 1, dtype=np.int64)])
+            self._last_seen = np.concatenate(
+                [self._last_seen, np.full(grow, self.tick - 1, dtype=np.int64)])
+            self._generation = np.concatenate(
+                [self._generation, store.generation[len(self._generation):store.capacity]])
+        recycled = np.flatnonzero(self._generation[:store.count] != store.generation[:store.count])
+        if len(recycled):
+            self._last_update[recycled] = self.tick - 1
+            self._last_seen[recycled] = self.tick - 1
+            self._generation[recycled] = store.generation[recycled]
+
+    def schedule(self, store: ComponentStore, index: np.ndarray,
+                 focus_x: float) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """
+        Pick the slots due this tick
+        index - awake slots
+        Returns (due slots, ticks to catch up for each of them); the ticks are
+        None when every due slot is exactly one tick behind
+        """
+        self._sync(store)
+        # Slots that just woke up skip the ticks they slept through: their
+        # last update moves forward by the length of the sleep
+        woke = index[self._last_seen[index] < self.tick - 1]
+        self._last_update[woke] += self.tick - 1 - self._last_seen[woke]
+        self._last_seen[index] = self.tick
+
+        center = store.pos[index, 0] + store.size[index, 0] / 2
+        tier = np.searchsorted(self._limits, np.abs(center - focus_x))
+        tier = np.minimum(tier, len(self._limits) - 1)
+        period = self._periods[tier]
+
+        due_mask = (index + self.tick) % period == 0
+        due = index[due_mask]
+
+        # Catch up every awake tick since the last update, even when the
+        # entity changed tiers in between (its old slice may have been longer)
+        dt = self.tick - self._last_update[due]
+        self._last_update[due] = self.tick
+        if (dt == 1).all():
+            dt = None  # Everyone at full rate - the plain one-tick step
+
+        self.tier_counts = np.bincount(tier, minlength=len(self.tiers)).tolist()
+        self.due_count = len(due)
+        self.tick += 1
+        return due, dt
+
+    def write_snapshot(self, out):
+        out.pack("q", self.tick)
+        out.array(self._last_update, np.int64)
+        out.array(self._last_seen, np.int64)
+        out.array(self._generation, np.uint32)
+
+    def read_snapshot(self, src):
+        self.tick = src.value("q")
+        self._last_update = src.array(np.int64)
+        self._last_seen = src.array(np.int64)
+        self._generation = src.array(np.uint32)
+
+    def stats(self) -> dict:
+        return {'tiers': list(self.tier_counts), 'due': self.due_count}
+
+
+# Export classes
+__all__ = ['LODScheduler']
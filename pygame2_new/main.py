@@ -1,11 +1,62 @@
+import argparse
+import os
 import pygame
 import sys
+from config import FPS
 from game import Game
+from persistence import SAVE_DIR
+from sprites import sprites, SPRITE_CACHE
 
-def main():
-    pygame.init()
-    game = Game()
-    game.run()
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Super Mario Bros")
+    parser.add_argument("--fast-forward", type=int, metavar="TICKS", default=0,
+                        help="nejdřív odsimuluje TICKS ticků bez omezení FPS, pak se hraje normálně")
+    parser.add_argument("--render-every", type=int, metavar="N", default=0,
+                        help="při přetáčení kreslit každý N-tý tick (0 = nekreslit)")
+    parser.add_argument("--script", help="vstup pro přetáčení ve formátu headless.py (jinak nic nemačká)")
+    parser.add_argument("--level", type=int, help="startovní level (jinak pokračuje z uložené hry)")
+    parser.add_argument("--seed", type=int, help="deterministický režim (viz determinism.py)")
+    parser.add_argument("--exit", action="store_true", help="po přetočení skončit místo hraní")
+    parser.add_argument("--headless", action="store_true",
+                        help="bez okna (SDL dummy driver), implikuje --exit")
+    parser.add_argument("--frames", type=int, help="skončit po N snímcích (měření startu, viz benchmark.py)")
+    parser.add_argument("--sprite-cache", metavar="PATH", default=SPRITE_CACHE,
+                        help="soubor s předpečenými sprity (prázdný = bez cache na disku)")
+    return parser.parse_args(argv)
+
+def init_pygame():
+    """Jen moduly, které hra používá (okno a fonty) - pygame.init() by spouštěl i mixer, joystick, ..."""
+    pygame.display.init()
+    pygame.font.init()
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.headless:
+        os.environ["SDL_VIDEODRIVER"] = "dummy"
+        os.environ["SDL_AUDIODRIVER"] = "dummy"
+        args.exit = True
+    init_pygame()
+    sprites.path = args.sprite_cache or None
+    # Ukládá se jen živá hra (ne headless ani deterministické běhy)
+    save_dir = None if args.headless or args.seed is not None else SAVE_DIR
+    game = Game(seed=args.seed, save_dir=save_dir, level=args.level, resume=args.level is None)
+    
+    if args.fast_forward:
+        inputs = None
+        if args.script:
+            # Skriptovaný vstup jen na vyžádání - headless.py (multiprocessing) by zdržel start
+            from headless import parse_script, frames
+            inputs = frames(parse_script(args.script))
+        stats = game.fast_forward(args.fast_forward, inputs, args.render_every)
+        print(f"fast-forward: {stats['ticks']} ticks in {stats['seconds']:.2f} s "
+              f"({stats['ticks_per_second']:.0f} ticks/s, {stats['ticks_per_second'] / FPS:.1f}x), "
+              f"state {stats['state']}, score {game.score}, lives {game.lives}")
+        if game.state_hash is not None:
+            print(f"state hash {game.state_hash:016x}")
+    
+    if not args.exit:
+        game.run(args.frames)
+    game.close()
     pygame.quit()
     sys.exit()
 
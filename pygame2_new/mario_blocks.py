@@ -1,16 +1,30 @@
+import math
 import pygame
 from config import *
+from fonts import font
+from sprites import baker, canvas, sprite, PAD
+from ecs import StoreView, KIND_MUSHROOM, KIND_FIREBALL, F_SPAWNING, F_EXPIRES
 
 class Block:
     """Otázníkový blok nebo cihlový blok"""
-    def __init__(self, x, y, block_type="question", content=None):
+    __slots__ = ('rect', 'block_type', 'content', 'hit', 'bump_offset', 'broken',
+                 'scheduler')
+    
+    def __init__(self, x, y, block_type="question", content=None, scheduler=None):
         self.rect = pygame.Rect(x, y, 40, 40)
         self.block_type = block_type  # "question", "brick", "solid"
         self.content = content  # "coin", "powerup", None
         self.hit = False
-        self.animation_offset = 0
         self.bump_offset = 0
         self.broken = False
+        self.scheduler = scheduler  # ActiveSet levelu - blok v něm je jen během bump animace
+    
+    @property
+    def animation_offset(self):
+        """Animace otazníku jede na sdílených hodinách - blok sám nic nepočítá"""
+        if self.scheduler is None:
+            return 0
+        return self.scheduler.clock.phase(0.1, 2 * 3.14159)
         
     def hit_block(self, player):
         """Udeří do bloku - vrátí co má dát podle stavu Maria"""
@@ -23,12 +37,12 @@ class Block:
                 self.broken = True
                 return "break"
             else:
-                self.bump_offset = -10
+                self.bump()
                 return None
         
         elif self.block_type == "question":
             self.hit = True
-            self.bump_offset = -10
+            self.bump()
             
             # Podle obsahu bloku
             if self.content == "coin":
@@ -42,14 +56,17 @@ class Block:
             
         return None
     
+    def bump(self):
+        """Spustí bump animaci a přihlásí blok k updatům"""
+        self.bump_offset = -10
+        if self.scheduler is not None:
+            self.scheduler.activate(self)
+    
     def update(self):
-        # Animace otázníku
-        if not self.hit and self.block_type == "question":
-            self.animation_offset = (self.animation_offset + 0.1) % (2 * 3.14159)
-        
-        # Bump animace
+        """Bump animace - vrací True, dokud blok ještě něco dělá"""
         if self.bump_offset < 0:
             self.bump_offset += 2
+        return self.bump_offset < 0
             
     def draw(self, screen, camera_x):
         if self.broken:
@@ -58,134 +75,146 @@ class Block:
         x = self.rect.x - camera_x
         y = self.rect.y + self.bump_offset
         
-        if self.block_type == "question":
-            if self.hit:
-                # Použitý blok (tmavý)
-                pygame.draw.rect(screen, (139, 90, 43), (x, y, 40, 40))
-                pygame.draw.rect(screen, (100, 60, 30), (x, y, 40, 40), 3)
-                
-                # Prázdný vzor
-                pygame.draw.rect(screen, (100, 60, 30), (x + 10, y + 10, 20, 20))
-            else:
-                # Aktivní otázníkový blok
-                # Oranžová barva s gradientem
-                pygame.draw.rect(screen, (255, 180, 0), (x, y, 40, 40))
-                pygame.draw.rect(screen, (255, 140, 0), (x + 2, y + 2, 36, 36))
-                pygame.draw.rect(screen, (255, 200, 50), (x + 5, y + 5, 30, 30))
-                
-                # Otazník
-                import math
-                bounce = int(math.sin(self.animation_offset) * 2)
-                font = pygame.font.Font(None, 36)
-                question_text = font.render("?", True, WHITE)
-                text_rect = question_text.get_rect(center=(x + 20, y + 20 + bounce))
-                screen.blit(question_text, text_rect)
-                
-                # Okraj
-                pygame.draw.rect(screen, (200, 120, 0), (x, y, 40, 40), 3)
-                
-        elif self.block_type == "brick":
-            # Cihlový blok
-            brick_color = (178, 34, 34)
-            pygame.draw.rect(screen, brick_color, (x, y, 40, 40))
-            
-            # Vzor cihel
-            pygame.draw.rect(screen, (205, 92, 92), (x, y, 40, 2))
-            pygame.draw.rect(screen, (205, 92, 92), (x, y, 2, 40))
-            
-            # Čáry mezi cihlami
-            pygame.draw.line(screen, (139, 0, 0), (x + 20, y), (x + 20, y + 40), 2)
-            pygame.draw.line(screen, (139, 0, 0), (x, y + 20), (x + 40, y + 20), 2)
-            
-            # Okraj
-            pygame.draw.rect(screen, (128, 0, 0), (x, y, 40, 40), 2)
-            
-        elif self.block_type == "solid":
-            # Pevný blok (nelze rozbít)
-            pygame.draw.rect(screen, (120, 120, 120), (x, y, 40, 40))
-            pygame.draw.rect(screen, (160, 160, 160), (x + 2, y + 2, 36, 36))
-            pygame.draw.rect(screen, (80, 80, 80), (x, y, 40, 40), 2)
+        if self.block_type == "question" and not self.hit:
+            # Předpečené je jen tělo bloku, otazník poskakuje
+            sprite("block", "question").draw(screen, x, y)
+            bounce = int(math.sin(self.animation_offset) * 2)
+            question_text = font(36).render("?", True, WHITE)
+            text_rect = question_text.get_rect(center=(x + 20, y + 20 + bounce))
+            screen.blit(question_text, text_rect)
+        else:
+            look = "used" if self.block_type == "question" else self.block_type
+            sprite("block", look).draw(screen, x, y)
 
 
-class Pipe:
-    """Zelená roura jako v Mario"""
-    def __init__(self, x, y, height=2):
-        self.rect = pygame.Rect(x, y, 60, height * 40)
-        self.height = height
+@baker("block")
+def bake_block(look):
+    """Blok bez animovaných částí - look: question (bez otazníku), used, brick, solid"""
+    sprite = canvas(40, 40)
+    screen = sprite.surface
+    x, y = sprite.left, sprite.top
+    
+    if look == "used":
+        # Použitý blok (tmavý)
+        pygame.draw.rect(screen, (139, 90, 43), (x, y, 40, 40))
+        pygame.draw.rect(screen, (100, 60, 30), (x, y, 40, 40), 3)
         
-    def draw(self, screen, camera_x):
-        x = self.rect.x - camera_x
-        y = self.rect.y
+        # Prázdný vzor
+        pygame.draw.rect(screen, (100, 60, 30), (x + 10, y + 10, 20, 20))
+        
+    elif look == "question":
+        # Aktivní otázníkový blok
+        # Oranžová barva s gradientem
+        pygame.draw.rect(screen, (255, 180, 0), (x, y, 40, 40))
+        pygame.draw.rect(screen, (255, 140, 0), (x + 2, y + 2, 36, 36))
+        pygame.draw.rect(screen, (255, 200, 50), (x + 5, y + 5, 30, 30))
         
-        # Zelená barva roury
-        pipe_green = (0, 180, 0)
-        pipe_dark = (0, 130, 0)
+        # Okraj (otazník do něj nezasahuje, kreslí se až přes sprite)
+        pygame.draw.rect(screen, (200, 120, 0), (x, y, 40, 40), 3)
         
-        # Hlavní tělo roury
-        pygame.draw.rect(screen, pipe_green, (x, y + 20, 60, self.rect.height - 20))
+    elif look == "brick":
+        # Cihlový blok
+        brick_color = (178, 34, 34)
+        pygame.draw.rect(screen, brick_color, (x, y, 40, 40))
         
-        # Vrchol roury (širší)
-        pygame.draw.rect(screen, pipe_green, (x - 5, y, 70, 20))
-        pygame.draw.rect(screen, pipe_dark, (x - 5, y, 70, 8))
+        # Vzor cihel
+        pygame.draw.rect(screen, (205, 92, 92), (x, y, 40, 2))
+        pygame.draw.rect(screen, (205, 92, 92), (x, y, 2, 40))
         
-        # Vnitřek roury (černá díra)
-        pygame.draw.ellipse(screen, BLACK, (x + 10, y + 8, 40, 16))
-        pygame.draw.ellipse(screen, (20, 20, 20), (x + 12, y + 10, 36, 12))
+        # Čáry mezi cihlami
+        pygame.draw.line(screen, (139, 0, 0), (x + 20, y), (x + 20, y + 40), 2)
+        pygame.draw.line(screen, (139, 0, 0), (x, y + 20), (x + 40, y + 20), 2)
         
-        # Svislé čáry pro texturu
-        for i in range(3):
-            line_x = x + 15 + i * 15
-            pygame.draw.line(screen, pipe_dark, (line_x, y + 20), 
-                           (line_x, y + self.rect.height), 2)
+        # Okraj
+        pygame.draw.rect(screen, (128, 0, 0), (x, y, 40, 40), 2)
         
-        # Okraje
-        pygame.draw.rect(screen, pipe_dark, (x - 5, y, 70, 20), 3)
-        pygame.draw.rect(screen, pipe_dark, (x, y + 20, 60, self.rect.height - 20), 3)
+    elif look == "solid":
+        # Pevný blok (nelze rozbít)
+        pygame.draw.rect(screen, (120, 120, 120), (x, y, 40, 40))
+        pygame.draw.rect(screen, (160, 160, 160), (x + 2, y + 2, 36, 36))
+        pygame.draw.rect(screen, (80, 80, 80), (x, y, 40, 40), 2)
+    return sprite
+
+
+class Pipe:
+    """Zelená roura jako v Mario"""
+    __slots__ = ('rect', 'height')
+    
+    def __init__(self, x, y, height=2):
+        self.rect = pygame.Rect(x, y, 60, height * 40)
+        self.height = height
+        
+    def draw(self, screen, camera_x):
+        sprite("pipe", self.rect.height).draw(screen, self.rect.x - camera_x, self.rect.y)
+
+
+@baker("pipe")
+def bake_pipe(height):
+    """Roura vysoká height px (vrchol přesahuje tělo o 5 px do stran)"""
+    sprite = canvas(60, height, left=5 + PAD, right=5 + PAD)
+    screen = sprite.surface
+    x, y = sprite.left, sprite.top
+    
+    # Zelená barva roury
+    pipe_green = (0, 180, 0)
+    pipe_dark = (0, 130, 0)
+    
+    # Hlavní tělo roury
+    pygame.draw.rect(screen, pipe_green, (x, y + 20, 60, height - 20))
+    
+    # Vrchol roury (širší)
+    pygame.draw.rect(screen, pipe_green, (x - 5, y, 70, 20))
+    pygame.draw.rect(screen, pipe_dark, (x - 5, y, 70, 8))
+    
+    # Vnitřek roury (černá díra)
+    pygame.draw.ellipse(screen, BLACK, (x + 10, y + 8, 40, 16))
+    pygame.draw.ellipse(screen, (20, 20, 20), (x + 12, y + 10, 36, 12))
+    
+    # Svislé čáry pro texturu
+    for i in range(3):
+        line_x = x + 15 + i * 15
+        pygame.draw.line(screen, pipe_dark, (line_x, y + 20), 
+                       (line_x, y + height), 2)
+    
+    # Okraje
+    pygame.draw.rect(screen, pipe_dark, (x - 5, y, 70, 20), 3)
+    pygame.draw.rect(screen, pipe_dark, (x, y + 20, 60, height - 20), 3)
+    return sprite
 
 
-class Mushroom:
+class Mushroom(StoreView):
     """Power-up houba pro zvětšení Maria"""
-    def __init__(self, x, y):
-        self.rect = pygame.Rect(x, y, 30, 30)
-        self.velocity_x = 2
-        self.velocity_y = 0
-        self.collected = False
-        self.spawning = True
-        self.spawn_offset = 40
+    __slots__ = ('_collected',)
+    
+    def __init__(self, x, y, store=None):
+        super().__init__(store, KIND_MUSHROOM, x, y, 30, 30,
+                         velocity_x=2, flags=F_SPAWNING, max_fall=10, timer=40)
+        self._collected = False
+        
+    @property
+    def collected(self):
+        return self._collected
+    
+    @collected.setter
+    def collected(self, value):
+        self._collected = value
+        if value:
+            self.release()
+    
+    @property
+    def spawning(self):
+        return self.has_flag(F_SPAWNING)
+    
+    @property
+    def spawn_offset(self):
+        # Během spawnu timer odpočítává výjezd z bloku
+        return self.timer
         
     def update(self, platforms):
+        """Samostatný update (Level.update_entities je dávkový)"""
         if self.collected:
             return
-            
-        # Spawn animace
-        if self.spawning:
-            self.spawn_offset -= 1
-            if self.spawn_offset <= 0:
-                self.spawning = False
-            return
-        
-        # Pohyb
-        self.rect.x += self.velocity_x
-        
-        # Gravitace
-        self.velocity_y += GRAVITY
-        if self.velocity_y > 10:
-            self.velocity_y = 10
-            
-        self.rect.y += self.velocity_y
-        
-        # Kolize s platformami
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                if self.velocity_y > 0:
-                    self.rect.bottom = platform.rect.top
-                    self.velocity_y = 0
-        
-        # Kolize se zemí
-        ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
-        if self.rect.bottom >= ground_y:
-            self.rect.bottom = ground_y
-            self.velocity_y = 0
+        self.step(platforms)
     
     def draw(self, screen, camera_x):
         if self.collected:
@@ -212,6 +241,8 @@ class Mushroom:
 
 class FireFlower:
     """Ohnivá květina pro fire power"""
+    __slots__ = ('rect', 'collected', 'animation_offset', 'spawning', 'spawn_offset')
+    
     def __init__(self, x, y):
         self.rect = pygame.Rect(x, y, 30, 30)
         self.collected = False
@@ -239,8 +270,6 @@ class FireFlower:
         x = self.rect.x - camera_x
         y = self.rect.y - self.spawn_offset
         
-        import math
-        
         # Stonek
         pygame.draw.rect(screen, (0, 180, 0), (x + 12, y + 20, 6, 10))
         
@@ -258,34 +287,31 @@ class FireFlower:
         pygame.draw.circle(screen, ORANGE, (x + 15, y + 15), 3)
 
 
-class Fireball:
+class Fireball(StoreView):
     """Ohnivá koule vystřelená Mariem"""
-    def __init__(self, x, y, direction):
-        self.rect = pygame.Rect(x, y, 12, 12)
-        self.velocity_x = 8 * direction
-        self.velocity_y = -3
-        self.lifetime = 180
+    __slots__ = ('direction',)
+    
+    def __init__(self, x, y, direction, store=None):
+        super().__init__(store, KIND_FIREBALL, x, y, 12, 12, **self._components(direction))
         self.direction = direction
         
-    def update(self, platforms):
-        self.lifetime -= 1
-        
-        self.rect.x += self.velocity_x
-        self.velocity_y += 0.5
-        self.rect.y += self.velocity_y
+    def reset(self, x, y, direction, store=None):
+        """Znovupoužití z poolu - nový slot ve store"""
+        self._bind(store, KIND_FIREBALL, x, y, 12, 12, **self._components(direction))
+        self.direction = direction
+    
+    @staticmethod
+    def _components(direction):
+        return dict(velocity_x=8 * direction, velocity_y=-3, flags=F_EXPIRES,
+                    gravity=0.5, max_fall=float('inf'), bounce=-8, timer=180)
         
-        # Odskok od země
-        ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
-        if self.rect.bottom >= ground_y:
-            self.rect.bottom = ground_y
-            self.velocity_y = -8
+    @property
+    def lifetime(self):
+        return self.timer
         
-        # Odskok od platforem
-        for platform in platforms:
-            if self.rect.colliderect(platform.rect):
-                if self.velocity_y > 0:
-                    self.rect.bottom = platform.rect.top
-                    self.velocity_y = -8
+    def update(self, platforms):
+        """Samostatný update (Player.update posouvá všechny koule najednou)"""
+        self.step(platforms)
     
     def draw(self, screen, camera_x):
         if self.lifetime <= 0:
@@ -1,18 +1,31 @@
+import math
 import pygame
-import random
 from config import *
+from determinism import stream
+from fonts import font
+
+# Vlastní náhodné proudy - deterministický režim je přeseeduje (viz Game)
+_particle_rng = stream('particles')
+_star_rng = stream('stars')
 
 class Particle:
     """Částicový efekt pro exploze, skoky atd."""
+    __slots__ = ('x', 'y', 'color', 'velocity_x', 'velocity_y', 'lifetime',
+                 'max_lifetime', 'size', 'gravity')
+    
     def __init__(self, x, y, color, velocity_x=0, velocity_y=0, lifetime=30):
+        self.reset(x, y, color, velocity_x, velocity_y, lifetime)
+        
+    def reset(self, x, y, color, velocity_x=0, velocity_y=0, lifetime=30):
+        """Znovupoužití z poolu - stejné argumenty jako konstruktor"""
         self.x = x
         self.y = y
         self.color = color
-        self.velocity_x = velocity_x + random.uniform(-2, 2)
-        self.velocity_y = velocity_y + random.uniform(-5, -2)
+        self.velocity_x = velocity_x + _particle_rng.uniform(-2, 2)
+        self.velocity_y = velocity_y + _particle_rng.uniform(-5, -2)
         self.lifetime = lifetime
         self.max_lifetime = lifetime
-        self.size = random.randint(2, 5)
+        self.size = _particle_rng.randint(2, 5)
         self.gravity = 0.3
         
     def update(self):
@@ -36,14 +49,19 @@ class Particle:
 
 class StarParticle:
     """Hvězdičkový efekt pro speciální události"""
+    __slots__ = ('x', 'y', 'angle', 'velocity_y', 'lifetime', 'size', 'rotation_speed')
+    
     def __init__(self, x, y):
+        self.reset(x, y)
+        
+    def reset(self, x, y):
         self.x = x
         self.y = y
-        self.angle = random.uniform(0, 360)
-        self.velocity_y = random.uniform(-3, -1)
+        self.angle = _star_rng.uniform(0, 360)
+        self.velocity_y = _star_rng.uniform(-3, -1)
         self.lifetime = 60
-        self.size = random.randint(5, 10)
-        self.rotation_speed = random.uniform(-5, 5)
+        self.size = _star_rng.randint(5, 10)
+        self.rotation_speed = _star_rng.uniform(-5, 5)
         
     def update(self):
         self.y += self.velocity_y
@@ -55,7 +73,6 @@ class StarParticle:
         if self.lifetime > 0:
             alpha = int(255 * (self.lifetime / 60))
             # Kreslení hvězdičky
-            import math
             points = []
             for i in range(5):
                 angle1 = math.radians(self.angle + i * 72)
@@ -77,7 +94,12 @@ class StarParticle:
 
 class CoinCollectEffect:
     """Efekt při sebrání mince"""
+    __slots__ = ('x', 'y', 'lifetime', 'velocity_y')
+    
     def __init__(self, x, y):
+        self.reset(x, y)
+        
+    def reset(self, x, y):
         self.x = x
         self.y = y
         self.lifetime = 30
@@ -90,10 +112,38 @@ class CoinCollectEffect:
     def draw(self, screen, camera_x):
         if self.lifetime > 0:
             alpha = int(255 * (self.lifetime / 30))
-            font = pygame.font.Font(None, 24)
-            text = font.render("+10", True, YELLOW)
+            text = font(24).render("+10", True, YELLOW)
             text.set_alpha(alpha)
             screen.blit(text, (int(self.x - camera_x), int(self.y)))
     
     def is_alive(self):
         return self.lifetime > 0
+
+
+class ComboText:
+    """Textový efekt "COMBO xN!" při zabití více nepřátel v řadě"""
+    __slots__ = ('x', 'y', 'combo', 'lifetime', 'velocity_y')
+    
+    def __init__(self, x, y, combo):
+        self.reset(x, y, combo)
+        
+    def reset(self, x, y, combo):
+        self.x = x
+        self.y = y
+        self.combo = combo
+        self.lifetime = 60
+        self.velocity_y = -2
+        
+    def update(self):
+        self.y += self.velocity_y
+        self.lifetime -= 1
+        
+    def draw(self, screen, camera_x):
+        if self.lifetime > 0:
+            alpha = int(255 * (self.lifetime / 60))
+            text = font(36).render(f"COMBO x{self.combo}!", True, ORANGE)
+            text.set_alpha(alpha)
+            screen.blit(text, (int(self.x - camera_x - 50), int(self.y)))
+    
+    def is_alive(self):
+        return self.lifetime > 0
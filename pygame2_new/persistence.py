@@ -0,0 +1,293 @@
+"""
+Persistence
+Save game (progress at the start of the last level) and high-score table as
+small binary files. Writes go through a background thread: the game loop
+only hands over bytes, the writer replaces files atomically (temp file,
+fsync, rename) and fsyncs each directory once per batch. A file written
+again before the previous write reached the disk is coalesced - only the
+newest contents are written.
+
+Loading is a single read and struct unpack per file; missing or damaged
+files read as "no save" / an empty table.
+"""
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+SAVE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "saves")
+SAVE_FILE = "save.bin"
+HIGH_SCORE_FILE = "highscores.bin"
+HIGH_SCORE_COUNT = 10
+BATCH_DELAY = 0.05  # Seconds the writer waits for more writes before a batch
+
+_SAVE = struct.Struct("<4sHiii")     # magic, version, level, lives, score
+_SCORES = struct.Struct("<4sHH")     # magic, version, entry count
+_ENTRY = struct.Struct("<iiq")       # score, level, unix time
+FORMAT_VERSION = 1
+
+
+@dataclass(slots=True)
+class SaveGame:
+    """Where to continue: level number, lives and score at its start"""
+    level: int = 1
+    lives: int = 0
+    score: int = 0
+
+    def to_bytes(self) -> bytes:
+        return _SAVE.pack(b"MSAV", FORMAT_VERSION, self.level, self.lives, self.score)
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'SaveGame':
+        magic, version, level, lives, score = _SAVE.unpack(data)
+        if magic != b"MSAV" or version != FORMAT_VERSION:
+            raise ValueError("not a save game of this version")
+        return cls(level, lives, score)
+
+
+class HighScores:
+    """Best scores, highest first; entries are (score, level, unix time)"""
+    __slots__ = ('entries', 'size')
+
+    def __init__(self, entries=(), size: int = HIGH_SCORE_COUNT):
+        self.size = size
+        self.entries: List[Tuple[int, int, int]] = sorted(entries, key=lambda entry: -entry[0])[:size]
+
+    def qualifies(self, score: int) -> bool:
+        return score > 0 and (len(self.entries) < self.size or score > self.entries[-1][0])
+
+    def add(self, score: int, level: int, when: Optional[int] = None) -> Optional[int]:
+        """Insert a score; returns its rank (0 = best) or None if it did not make the table"""
+        if not self.qualifies(score):
+            return None
+        rank = next((i for i, entry in enumerate(self.entries) if score > entry[0]),
+                    len(self.entries))
+        self.entries.insert(rank, (score, level, int(time.time()) if when is None else when))
+        del self.entries[self.size:]
+        return rank
+
+    @property
+    def best(self) -> int:
+        return self.entries[0][0] if self.entries else 0
+
+    def to_bytes(self) -> bytes:
+        return (_SCORES.pack(b"MHSC", FORMAT_VERSION, len(self.entries))
+                + b"".join(_ENTRY.pack(*entry) for entry in self.entries))
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'HighScores':
+        magic, version, count = _SCORES.unpack_from(data)
+        if magic != b"MHSC" or version != FORMAT_VERSION:
+            raise ValueError("not a high-score table of this version")
+        return cls(_ENTRY.iter_unpack(data[_SCORES.size:_SCORES.size + count * _ENTRY.size]))
+
+
+def _read(path: str) -> Optional[bytes]:
+    try:
+        with open(path, "rb") as file:
+            return file.read()
+    except OSError:
+        return None
+
+
+def read_save(path: str) -> Optional[SaveGame]:
+    data = _read(path)
+    try:
+        return None if data is None else SaveGame.from_bytes(data)
+    except (ValueError, struct.error):
+        return None  # Damaged or old save - start over
+
+
+def read_high_scores(path: str) -> HighScores:
+    data = _read(path)
+    try:
+        return HighScores() if data is None else HighScores.from_bytes(data)
+    except (ValueError, struct.error):
+        return HighScores()
+
+
+class BackgroundWriter:
+    """
+    Writes files on a daemon thread
+    write() never blocks on disk I/O. Pending writes are kept per path, so
+    a path written several times before the thread gets to it is written
+    once with the newest data. Writing None deletes the file.
+
+    A batch that fails is retried once; if the retry fails too, the error is
+    kept in last_error and raised by the next flush() or close().
+    """
+    __slots__ = ('batch_delay', '_pending', '_busy', '_cond', '_thread', '_closed',
+                 'submitted', 'written', 'coalesced', 'batches', 'failed', 'last_error')
+
+    def __init__(self, batch_delay: float = BATCH_DELAY):
+        self.batch_delay = batch_delay
+        self._pending: Dict[str, Optional[bytes]] = {}
+        self._busy = False
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None  # Started on first write
+        self._closed = False
+        self.submitted = 0
+        self.written = 0
+        self.coalesced = 0   # Writes replaced by a newer one before reaching the disk
+        self.batches = 0
+        self.failed = 0      # Files lost after the retry
+        self.last_error: Optional[OSError] = None
+
+    def write(self, path: str, data: Optional[bytes]):
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("writer is closed")
+            if path in self._pending:
+                self.coalesced += 1
+            self._pending[path] = data
+            self.submitted += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="save-writer", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until everything written so far is on disk; False on timeout
+        Raises the OSError of a write that failed since the last flush()
+        """
+        with self._cond:
+            done = self._cond.wait_for(lambda: not self._pending and not self._busy, timeout)
+            error, self.last_error = self.last_error, None
+        if error is not None:
+            raise error
+        return done
+
+    def close(self, timeout: Optional[float] = 5.0) -> bool:
+        """Flush and stop the thread (also when flush() raises)"""
+        try:
+            return self.flush(timeout)
+        finally:
+            with self._cond:
+                self._closed = True
+                self._cond.notify_all()
+            if self._thread is not None:
+                self._thread.join(timeout)
+                self._thread = None
+
+    def _run(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._closed)
+                if not self._pending:
+                    return  # Closed
+            time.sleep(self.batch_delay)  # Let a burst of writes pile up into one batch
+            with self._cond:
+                batch = self._pending
+                self._pending = {}
+                self._busy = True
+            try:
+                try:
+                    self._write_batch(batch)
+                except OSError:
+                    time.sleep(self.batch_delay)
+                    self._write_batch(batch)  # One retry - e.g. a briefly locked file
+            except OSError as error:
+                # The game goes on without persistence, flush() reports it
+                with self._cond:
+                    self.last_error = error
+                    self.failed += len(batch)
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self.batches += 1
+                    self._cond.notify_all()
+
+    def _write_batch(self, batch: Dict[str, Optional[bytes]]):
+        """Write and fsync every file first, then rename them all, then fsync the directories"""
+        renames = []
+        renamed = 0
+        try:
+            for path, data in batch.items():
+                if data is None:
+                    continue
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+                temp_path = f"{path}.{os.getpid()}.tmp"
+                renames.append((temp_path, path))
+                with open(temp_path, "wb") as file:
+                    file.write(data)
+                    file.flush()
+                    os.fsync(file.fileno())
+            for temp_path, path in renames:
+                os.replace(temp_path, path)
+                renamed += 1
+        finally:
+            for temp_path, _ in renames[renamed:]:  # Not renamed - don't leave them behind
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+        for path, data in batch.items():
+            if data is None:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+        for directory in {os.path.dirname(path) or "." for path in batch}:
+            _fsync_directory(directory)
+        self.written += len(batch)
+
+    def stats(self) -> dict:
+        return {'submitted': self.submitted, 'written': self.written,
+                'coalesced': self.coalesced, 'batches': self.batches,
+                'failed': self.failed, 'pending': len(self._pending)}
+
+
+def _fsync_directory(directory: str):
+    """Make renames durable (not possible on every platform)"""
+    try:
+        fd = os.open(directory, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class Storage:
+    """Save game and high scores of one directory, written in the background"""
+    __slots__ = ('directory', 'writer', 'save', 'high_scores')
+
+    def __init__(self, directory: str = SAVE_DIR, writer: Optional[BackgroundWriter] = None):
+        self.directory = directory
+        self.writer = writer if writer is not None else BackgroundWriter()
+        self.save = read_save(self._path(SAVE_FILE))
+        self.high_scores = read_high_scores(self._path(HIGH_SCORE_FILE))
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+
+    def store_save(self, save: SaveGame):
+        self.save = save
+        self.writer.write(self._path(SAVE_FILE), save.to_bytes())
+
+    def clear_save(self):
+        if self.save is not None:
+            self.save = None
+            self.writer.write(self._path(SAVE_FILE), None)
+
+    def add_score(self, score: int, level: int) -> Optional[int]:
+        """Record a finished game; returns its rank or None"""
+        rank = self.high_scores.add(score, level)
+        if rank is not None:
+            self.writer.write(self._path(HIGH_SCORE_FILE), self.high_scores.to_bytes())
+        return rank
+
+    def close(self):
+        """Flush and stop the writer; raises OSError if a write was lost"""
+        self.writer.close()
+
+
+# Export classes
+__all__ = ['SaveGame', 'HighScores', 'BackgroundWriter', 'Storage', 'read_save',
+           'read_high_scores', 'SAVE_DIR', 'HIGH_SCORE_COUNT']
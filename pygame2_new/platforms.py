@@ -0,0 +1,72 @@
+import pygame
+from config import *
+from sprites import baker, canvas, sprite
+
+class Platform:
+    __slots__ = ('rect', 'color')
+    
+    def __init__(self, x, y, width, height, color=PLATFORM_COLOR):
+        self.rect = pygame.Rect(x, y, width, height)
+        self.color = color
+        
+    def draw(self, screen, camera_x):
+        # Cihlový vzor je předpečený (sprites.py), kreslí se jedním blitem
+        sprite("platform", self.rect.width, self.rect.height, self.color).draw(
+            screen, self.rect.x - camera_x, self.rect.y)
+
+
+@baker("platform")
+def bake_platform(width, height, color):
+    brick_width = 30
+    brick_height = 10
+    
+    # Malta první řady cihel přesahuje až o šířku cihly doleva
+    sprite = canvas(width, height, left=brick_width)
+    screen = sprite.surface
+    x, y = sprite.left, sprite.top
+    
+    # === CIHLOVÁ PLATFORMA ===
+    # Základní barva
+    brick_color = (178, 34, 34)
+    mortar_color = (139, 69, 19)
+    highlight_color = (205, 92, 92)
+    shadow_color = (128, 0, 0)
+    
+    # Vykreslení hlavního obdélníku
+    pygame.draw.rect(screen, color, (x, y, width, height))
+    
+    # Horní světlý okraj (3D efekt)
+    pygame.draw.line(screen, highlight_color, (x, y), (x + width, y), 2)
+    pygame.draw.line(screen, highlight_color, (x, y), (x, y + height), 2)
+    
+    # Spodní tmavý okraj (3D efekt)
+    pygame.draw.line(screen, shadow_color, (x, y + height - 1), 
+                    (x + width, y + height - 1), 2)
+    pygame.draw.line(screen, shadow_color, (x + width - 1, y), 
+                    (x + width - 1, y + height), 2)
+    
+    # Vzor cihel
+    for row in range(0, height, brick_height):
+        # Střídání řad pro cihlový vzor
+        offset = (brick_width // 2) if (row // brick_height) % 2 == 0 else 0
+        
+        for col in range(-brick_width, width + brick_width, brick_width):
+            brick_x = x + col + offset
+            brick_y = y + row
+            
+            # Zkontrolovat, zda je cihla v hranicích platformy
+            if brick_x >= x - brick_width and brick_x < x + width:
+                # Svislé čáry mezi cihlami (malta)
+                pygame.draw.line(screen, mortar_color, 
+                               (brick_x, brick_y), 
+                               (brick_x, brick_y + brick_height), 1)
+                
+        # Vodorovné čáry mezi cihlami
+        if row > 0:
+            pygame.draw.line(screen, mortar_color, 
+                           (x, brick_y), 
+                           (x + width, brick_y), 1)
+    
+    # Vnější černý okraj
+    pygame.draw.rect(screen, BLACK, (x, y, width, height), 1)
+    return sprite
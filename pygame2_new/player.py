@@ -1,8 +1,30 @@
+import numpy as np
 import pygame
 from config import *
+from ecs import ComponentStore, colliders_from_rects
+from containers import EntityList
+from pool import spawn, recycle, recycle_dead, pool_for
+from timers import TimerWheel, timer_property
+from kernels import resolve_x, resolve_y
+from particle import Particle
+from mario_blocks import Fireball
+from fonts import font
+from snapshot import SnapshotWriter, SnapshotReader, slot_values, set_slot_values
 
 class Player:
-    def __init__(self, x, y):
+    __slots__ = ('rect', 'velocity_x', 'velocity_y', 'on_ground', 'facing_right',
+                 'animation_frame', 'jump_particles', 'is_jumping', 'speed_multiplier',
+                 '_speed_boost_timer', 'power_state', '_invincible_timer', '_transform_timer',
+                 'fireballs', 'fireball_store', 'can_shoot', '_shoot_cooldown',
+                 'timers', 'owns_timers')
+    
+    # Odpočty běží v TimerWheel - čtení vrací zbývající ticky, zápis spustí nový odpočet
+    speed_boost_timer = timer_property('speed_boost_timer')
+    invincible_timer = timer_property('invincible_timer')
+    transform_timer = timer_property('transform_timer')
+    shoot_cooldown = timer_property('shoot_cooldown')
+    
+    def __init__(self, x, y, timers=None):
         self.rect = pygame.Rect(x, y, PLAYER_WIDTH, SMALL_MARIO_HEIGHT)
         self.velocity_x = 0
         self.velocity_y = 0
@@ -12,38 +34,41 @@ class Player:
         self.jump_particles = []
         self.is_jumping = False
         self.speed_multiplier = 1.0
-        self.speed_boost_timer = 0
+        
+        # Časovače - sdílené s Game (ta je posouvá), jinak vlastní
+        self.owns_timers = timers is None
+        self.timers = TimerWheel() if timers is None else timers
+        self._speed_boost_timer = None
+        self._invincible_timer = None
+        self._transform_timer = None
+        self._shoot_cooldown = None
         
         # Power stavy
         self.power_state = POWER_SMALL  # 0=malý, 1=super, 2=fire
-        self.invincible_timer = 0
-        self.transform_timer = 0
         
         # Fire Mario
-        self.fireballs = []
+        self.fireballs = EntityList()
+        self.fireball_store = ComponentStore(capacity=4)
         self.can_shoot = True
-        self.shoot_cooldown = 0
         
-    def update(self, keys, platforms, blocks=None, pipes=None):
-        # Speed boost
+    def update(self, keys, platforms, blocks=None, pipes=None, solids=None):
+        """
+        solids - (boxes, head) from Level.solids(); když je k dispozici,
+                 kolize řeší kernely nad poli místo smyček přes objekty
+        """
+        # Částice skoku se hýbou každý tick (i bez kreslení, např. při přetáčení)
+        for particle in self.jump_particles:
+            particle.update()
+        recycle_dead(self.jump_particles)
+        
+        # Speed boost (odpočty posouvá TimerWheel, tady se jen ptáme)
         if self.speed_boost_timer > 0:
-            self.speed_boost_timer -= 1
             self.speed_multiplier = 1.5
         else:
             self.speed_multiplier = 1.0
-        
-        # Invincibility timer
-        if self.invincible_timer > 0:
-            self.invincible_timer -= 1
-        
-        # Transform animation
-        if self.transform_timer > 0:
-            self.transform_timer -= 1
             
         # Shoot cooldown
-        if self.shoot_cooldown > 0:
-            self.shoot_cooldown -= 1
-        else:
+        if self.shoot_cooldown == 0:
             self.can_shoot = True
             
         # Horizontální pohyb
@@ -59,11 +84,13 @@ class Player:
             if self.on_ground:
                 self.animation_frame += 0.3
         
-        # Update fireballs
-        for fireball in self.fireballs[:]:
-            fireball.update(platforms)
-            if not fireball.is_alive():
-                self.fireballs.remove(fireball)
+        # Update fireballs - všechny koule jedním krokem store
+        if self.fireballs:
+            self.fireball_store.step(colliders_from_rects(platforms))
+            for fireball in self.fireballs:
+                if not fireball.is_alive():
+                    self.fireballs.remove(fireball)
+                    fireball.release()
             
         # Aplikace gravitace
         self.velocity_y += GRAVITY
@@ -74,11 +101,24 @@ class Player:
             
         # Aktualizace pozice
         self.rect.x += self.velocity_x
-        self.check_collision_x(platforms, blocks, pipes)
+        if solids is not None:
+            self.rect.x = int(resolve_x(self.rect, self.velocity_x, solids[0]))
+        else:
+            self.check_collision_x(platforms, blocks, pipes)
         
         self.rect.y += self.velocity_y
         self.on_ground = False
-        self.check_collision_y(platforms, blocks, pipes)
+        if solids is not None:
+            top, self.velocity_y, self.on_ground = resolve_y(
+                self.rect, self.velocity_y, *solids)
+            self.rect.y = int(top)
+            self.check_ground()
+        else:
+            self.check_collision_y(platforms, blocks, pipes)
+        
+        # Vlastní časovače posuneme sami (sdílené posouvá Game hned po tomto update)
+        if self.owns_timers:
+            self.timers.advance()
         
     def check_collision_x(self, platforms, blocks=None, pipes=None):
         """Kontrola kolize na ose X s platformami, bloky a pipesama"""
@@ -143,7 +183,10 @@ class Player:
                         self.rect.top = pipe.rect.bottom
                         self.velocity_y = 0
                     
-        # Kolize se zemí
+        self.check_ground()
+            
+    def check_ground(self):
+        """Kolize se zemí"""
         ground_y = SCREEN_HEIGHT - GROUND_HEIGHT
         if self.rect.bottom >= ground_y:
             self.rect.bottom = ground_y
@@ -154,15 +197,14 @@ class Player:
         self.velocity_y = -PLAYER_JUMP_POWER
         self.is_jumping = True
         # Částice při skoku
-        from particle import Particle
         for _ in range(8):
             self.jump_particles.append(
-                Particle(self.rect.centerx, self.rect.bottom, 
+                spawn(Particle, self.rect.centerx, self.rect.bottom, 
                         (200, 200, 200), 0, 2, 20)
             )
     
     def activate_speed_boost(self):
-        self.speed_boost_timer = 300  # 5 sekund při 60 FPS
+        self.speed_boost_timer = SPEED_BOOST_DURATION
     
     def power_up(self):
         """Zvětšení Maria (houba)"""
@@ -208,9 +250,9 @@ class Player:
     def shoot_fireball(self):
         """Vystřelení ohnivé koule"""
         if self.power_state == POWER_FIRE and self.can_shoot and len(self.fireballs) < 2:
-            from mario_blocks import Fireball
             direction = 1 if self.facing_right else -1
-            fireball = Fireball(self.rect.centerx, self.rect.centery, direction)
+            fireball = spawn(Fireball, self.rect.centerx, self.rect.centery, direction,
+                             self.fireball_store)
             self.fireballs.append(fireball)
             self.can_shoot = False
             self.shoot_cooldown = 15
@@ -228,11 +270,8 @@ class Player:
             fireball.draw(screen, camera_x)
         
         # Vykreslení částic skoku
-        for particle in self.jump_particles[:]:
-            particle.update()
+        for particle in self.jump_particles:
             particle.draw(screen, camera_x)
-            if not particle.is_alive():
-                self.jump_particles.remove(particle)
         
         # Speed boost efekt (modrá aura)
         if self.speed_boost_timer > 0:
@@ -310,8 +349,7 @@ class Player:
         
         # Logo "M" na čepici
         pygame.draw.circle(screen, WHITE, (x + 20, head_y + int(6 * scale)), 4)
-        font = pygame.font.Font(None, 16)
-        m_text = font.render("M", True, RED)
+        m_text = font(16).render("M", True, RED)
         screen.blit(m_text, (x + 17, head_y + int(2 * scale)))
         
         # === OČI ===
@@ -361,3 +399,71 @@ class Player:
         shadow_surface.set_alpha(50)
         shadow_surface.fill(BLACK)
         screen.blit(shadow_surface, (x, y + self.rect.height))
+    
+    # === SNAPSHOTY ===
+    
+    def snapshot(self, particles=False):
+        """Stav hráče jako binární blob (viz snapshot.py)"""
+        out = SnapshotWriter()
+        self.write_snapshot(out, particles)
+        return out.getvalue()
+    
+    def restore(self, blob):
+        self.read_snapshot(SnapshotReader(blob))
+    
+    def write_snapshot(self, out, particles=False):
+        """
+        Pohyb, power stav, zbývající odpočty a ohnivé koule (s jejich store)
+        particles - i částice skoku (kosmetika)
+        """
+        out.section(b"PLYR")
+        out.data((tuple(self.rect), self.velocity_x, self.velocity_y, self.on_ground,
+                  self.facing_right, self.animation_frame, self.is_jumping,
+                  self.speed_multiplier, self.power_state, self.can_shoot,
+                  self.timers.now if self.owns_timers else None,
+                  (self.speed_boost_timer, self.invincible_timer,
+                   self.transform_timer, self.shoot_cooldown)))
+        self.fireball_store.write_snapshot(out)
+        out.array([(fireball.handle, fireball.direction) for fireball in self.fireballs
+                   if fireball.handle is not None], np.int64)
+        out.data([slot_values(particle) for particle in self.jump_particles]
+                 if particles else None)
+    
+    def read_snapshot(self, src):
+        """
+        Obnoví stav z write_snapshot(); se sdílenými časovači musí jejich
+        vlastník (Game) předtím nastavit hodiny (TimerWheel.reset)
+        """
+        src.expect(b"PLYR")
+        (rect, self.velocity_x, self.velocity_y, self.on_ground, self.facing_right,
+         self.animation_frame, self.is_jumping, self.speed_multiplier, self.power_state,
+         self.can_shoot, now, timers) = src.data()
+        self.rect.update(rect)
+        if now is not None:
+            self.timers.reset(now)
+            self._speed_boost_timer = self._invincible_timer = None
+            self._transform_timer = self._shoot_cooldown = None
+        (self.speed_boost_timer, self.invincible_timer,
+         self.transform_timer, self.shoot_cooldown) = timers
+        
+        # Koule patří do poolu - staré se vrátí, nové se navážou na sloty ze snapshotu
+        for fireball in self.fireballs:
+            recycle(fireball)
+        self.fireballs.clear()
+        self.fireball_store.read_snapshot(src)
+        pool = pool_for(Fireball)
+        for handle, direction in src.array(np.int64).tolist():
+            fireball = pool.acquire_blank()
+            fireball.attach(self.fireball_store, handle)
+            fireball.direction = direction
+            self.fireballs.append(fireball)
+        
+        # Částice skoku: ze snapshotu, jinak zmizí
+        for particle in self.jump_particles:
+            recycle(particle)
+        self.jump_particles.clear()
+        pool = pool_for(Particle)
+        for values in src.data() or ():
+            particle = pool.acquire_blank()
+            set_slot_values(particle, values)
+            self.jump_particles.append(particle)
@@ -0,0 +1,116 @@
+"""
+Object Pools
+Recycles short-lived objects (particles, text effects, fireballs) instead of
+allocating a new one per event and leaving the old one to the GC
+"""
+from typing import Dict, List, Set
+
+
+class ObjectPool:
+    """
+    Free list of objects of one type
+    acquire() reuses a released object and calls its reset() with the same
+    arguments the constructor takes, so the object is indistinguishable from
+    a freshly built one; releasing an object that is already in the pool
+    raises ValueError (it would be handed out twice)
+    """
+    __slots__ = ('cls', '_free', '_pooled', 'in_use', 'high_water', 'created', 'reused')
+
+    def __init__(self, cls, prealloc: int = 0, *args):
+        self.cls = cls
+        self._free: List = []
+        self._pooled: Set[int] = set()  # id() of the objects in _free
+        self.in_use = 0
+        self.high_water = 0  # Most objects handed out at once
+        self.created = 0
+        self.reused = 0
+        for _ in range(prealloc):
+            obj = cls(*args)
+            self._free.append(obj)
+            self._pooled.add(id(obj))
+            self.created += 1
+
+    def acquire(self, *args, **kwargs):
+        if self._free:
+            obj = self._free.pop()
+            self._pooled.discard(id(obj))
+            obj.reset(*args, **kwargs)
+            self.reused += 1
+        else:
+            obj = self.cls(*args, **kwargs)
+            self.created += 1
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+
+    def acquire_blank(self):
+        """An object without reset() - the caller sets its state (snapshot restore)"""
+        if self._free:
+            obj = self._free.pop()
+            self._pooled.discard(id(obj))
+            self.reused += 1
+        else:
+            obj = self.cls.__new__(self.cls)
+            self.created += 1
+        self.in_use += 1
+        if self.in_use > self.high_water:
+            self.high_water = self.in_use
+        return obj
+
+    def release(self, obj):
+        if id(obj) in self._pooled:
+            raise ValueError(f"{type(obj).__name__} released twice")
+        self._pooled.add(id(obj))
+        self.in_use -= 1
+        self._free.append(obj)
+
+    def stats(self) -> dict:
+        return {'in_use': self.in_use, 'free': len(self._free),
+                'high_water': self.high_water, 'created': self.created,
+                'reused': self.reused}
+
+
+# One pool per type
+_pools: Dict[type, ObjectPool] = {}
+
+
+def pool_for(cls) -> ObjectPool:
+    pool = _pools.get(cls)
+    if pool is None:
+        pool = _pools[cls] = ObjectPool(cls)
+    return pool
+
+
+def spawn(cls, *args, **kwargs):
+    """Get an object of type cls from its pool"""
+    return pool_for(cls).acquire(*args, **kwargs)
+
+
+def recycle(obj):
+    """Return an object obtained from spawn() to its pool"""
+    pool_for(type(obj)).release(obj)
+
+
+def recycle_dead(objects: List):
+    """
+    Keep live objects in place and recycle the rest
+    Compacts the list without allocating a copy
+    """
+    alive = 0
+    for obj in objects:
+        if obj.is_alive():
+            objects[alive] = obj
+            alive += 1
+        else:
+            recycle(obj)
+    del objects[alive:]
+
+
+def stats() -> dict:
+    """Statistics of all pools keyed by class name"""
+    return {cls.__name__: pool.stats() for cls, pool in _pools.items()}
+
+
+# Export classes
+__all__ = ['ObjectPool', 'pool_for', 'spawn', 'recycle', 'recycle_dead', 'stats']
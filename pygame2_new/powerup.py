@@ -4,6 +4,8 @@ from config import *
 
 class PowerUp:
     """Power-up prvky jako extra život, speed boost, etc."""
+    __slots__ = ('rect', 'powerup_type', 'collected', 'animation_offset')
+    
     def __init__(self, x, y, powerup_type="extra_life"):
         self.rect = pygame.Rect(x, y, 30, 30)
         self.powerup_type = powerup_type
@@ -0,0 +1,81 @@
+"""
+Level Preloading
+Builds the next level on a background thread while the level-complete
+screen is shown, so the switch on Enter is just an attribute swap. If the
+level is not ready by then, take() waits for the build already in flight or
+builds it on the calling thread.
+"""
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+
+class LevelPreloader:
+    """
+    One background build slot for "the level we will need next"
+
+    build is the level factory (Level); it must not touch state shared with
+    the running game. Requesting another level replaces the pending one.
+    """
+    __slots__ = ('build', '_executor', '_number', '_future', 'hits', 'waits', 'fallbacks')
+
+    def __init__(self, build: Callable[[int], object]):
+        self.build = build
+        self._executor: Optional[ThreadPoolExecutor] = None  # Started on first request
+        self._number: Optional[int] = None
+        self._future: Optional[Future] = None
+        self.hits = 0       # take() found the level ready
+        self.waits = 0      # take() waited for a build in flight
+        self.fallbacks = 0  # take() built the level itself
+
+    def request(self, number: int):
+        """Start building level number in the background (no-op if already pending)"""
+        if self._future is not None and self._number == number:
+            return
+        self.cancel()
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="level-preload")
+        self._number = number
+        self._future = self._executor.submit(self.build, number)
+
+    def ready(self, number: int) -> bool:
+        return self._number == number and self._future is not None and self._future.done()
+
+    def take(self, number: int):
+        """
+        Level number - the preloaded one when it is done, otherwise the
+        result of the build in flight, otherwise a fresh synchronous build
+        """
+        future = self._future if self._number == number else None
+        self.cancel()
+        if future is not None and not future.cancel():  # cancel() fails once it started
+            if future.done():
+                self.hits += 1
+            else:
+                self.waits += 1
+            try:
+                return future.result()
+            except Exception:
+                pass  # Build again below so the error surfaces on this thread
+        self.fallbacks += 1
+        return self.build(number)
+
+    def cancel(self):
+        """Forget the pending level (a build already running finishes unused)"""
+        if self._future is not None:
+            self._future.cancel()
+        self._future = None
+        self._number = None
+
+    def shutdown(self):
+        self.cancel()
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {'pending': self._number, 'hits': self.hits, 'waits': self.waits,
+                'fallbacks': self.fallbacks}
+
+
+# Export classes
+__all__ = ['LevelPreloader']
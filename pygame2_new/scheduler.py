@@ -0,0 +1,63 @@
+"""
+Active-Set Scheduling
+Objects register while they have work to do and drop out when idle, so the
+per-frame cost follows the number of busy objects, not the level size
+"""
+import math
+
+
+class AnimationClock:
+    """
+    Frame counter shared by looping animations
+    Objects derive their phase from it instead of advancing their own offset
+    """
+    __slots__ = ('ticks',)
+
+    def __init__(self):
+        self.ticks = 0
+
+    def advance(self):
+        self.ticks += 1
+
+    def phase(self, speed: float, period: float = 2 * math.pi) -> float:
+        """Offset an object advancing by speed every frame would have now"""
+        return (self.ticks * speed) % period
+
+
+class ActiveSet:
+    """
+    Ordered set of objects with update() -> bool
+    update() returning False (idle) removes the object until it is
+    activated again
+    """
+    __slots__ = ('clock', '_active')
+
+    def __init__(self, clock: AnimationClock = None):
+        self.clock = clock if clock is not None else AnimationClock()
+        self._active = {}  # Insertion-ordered set
+
+    def activate(self, obj):
+        self._active[obj] = None
+
+    def deactivate(self, obj):
+        self._active.pop(obj, None)
+
+    def update(self):
+        """Advance the shared clock and update every busy object"""
+        self.clock.advance()
+        idle = [obj for obj in self._active if not obj.update()]
+        for obj in idle:
+            del self._active[obj]
+
+    def __len__(self) -> int:
+        return len(self._active)
+
+    def __contains__(self, obj) -> bool:
+        return obj in self._active
+
+    def __iter__(self):
+        return iter(self._active)
+
+
+# Export classes
+__all__ = ['AnimationClock', 'ActiveSet']
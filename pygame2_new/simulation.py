@@ -0,0 +1,72 @@
+"""
+Simulation Regions
+Entities outside the camera window (plus a margin) are put to sleep and
+woken again when the region reaches them
+"""
+import numpy as np
+from config import SCREEN_WIDTH, SIM_REGION_MARGIN
+from ecs import ComponentStore, F_SLEEPING
+from typing import Iterable
+
+
+class SimulationRegion:
+    """
+    Horizontal window around the camera in which entities are simulated
+    Store-backed entities sleep through the F_SLEEPING flag, plain Entity
+    objects through Entity.is_active
+    """
+    __slots__ = ('margin', 'left', 'right', 'active_count', 'sleeping_count')
+
+    def __init__(self, margin: float = SIM_REGION_MARGIN):
+        self.margin = margin
+        self.left = 0.0
+        self.right = 0.0
+        self.active_count = 0
+        self.sleeping_count = 0
+
+    def move(self, camera_x: float):
+        """Recenter the region on the camera"""
+        self.left = camera_x - self.margin
+        self.right = camera_x + SCREEN_WIDTH + self.margin
+
+    def update(self, camera_x: float, store: ComponentStore) -> np.ndarray:
+        """
+        Wake entities inside the region, put the rest to sleep
+        Returns slot indices of the awake entities
+        """
+        self.move(camera_x)
+        index = store.live(include_sleeping=True)
+        x = store.pos[index, 0]
+        inside = (x + store.size[index, 0] >= self.left) & (x <= self.right)
+        awake = index[inside]
+        store.flags[awake] &= np.uint8(~F_SLEEPING & 0xFF)
+        store.flags[index[~inside]] |= F_SLEEPING
+
+        self.active_count = len(awake)
+        self.sleeping_count = len(index) - len(awake)
+        return awake
+
+    def update_entities(self, entities: Iterable):
+        """Same for entity_base.Entity objects (uses Entity.is_active)"""
+        active = sleeping = 0
+        for entity in entities:
+            if not entity.is_alive:
+                continue
+            rect = entity.rect
+            entity.is_active = rect.right >= self.left and rect.left <= self.right
+            if entity.is_active:
+                active += 1
+            else:
+                sleeping += 1
+        self.active_count += active
+        self.sleeping_count += sleeping
+
+    def contains(self, rect) -> bool:
+        return rect.right >= self.left and rect.left <= self.right
+
+    def stats(self) -> dict:
+        return {'active': self.active_count, 'sleeping': self.sleeping_count}
+
+
+# Export classes
+__all__ = ['SimulationRegion']
@@ -0,0 +1,120 @@
+"""
+State Snapshots
+Compact binary blobs of mutable game state: scalars packed with struct,
+component arrays as raw bytes, the whole payload zlib-compressed. Taking a
+snapshot copies no Python objects and restoring one writes the state back
+into existing objects, so checkpoints, instant retries and replay seeking
+cost a fraction of rebuilding a level.
+
+A blob is a sequence of tagged sections (Game writes its own, then Level
+and Player); readers check the tags so a blob of the wrong kind or from a
+different level fails loudly instead of restoring garbage. Blobs are a
+runtime format - they are not meant to outlive the code version that wrote
+them.
+"""
+import marshal
+import struct
+import zlib
+from typing import Tuple
+import numpy as np
+
+MAGIC = b"MSNP"
+FORMAT_VERSION = 2
+_HEADER = struct.Struct("<4sH")  # magic, version
+
+
+class SnapshotWriter:
+    """Collects sections of a snapshot; getvalue() returns the blob"""
+    __slots__ = ('_parts',)
+
+    def __init__(self):
+        self._parts = []
+
+    def section(self, tag: bytes):
+        """Start a section; the reader must expect() the same tag"""
+        self._parts.append(struct.pack("<4s", tag))
+
+    def pack(self, fmt: str, *values):
+        """Scalars in struct format fmt (little endian, no padding)"""
+        self._parts.append(struct.pack("<" + fmt, *values))
+
+    def array(self, values, dtype):
+        """An array of any shape, stored as dtype"""
+        array = np.ascontiguousarray(values, dtype=dtype)
+        self.pack("B%dI" % array.ndim, array.ndim, *array.shape)
+        self._parts.append(array.tobytes())
+
+    def data(self, values):
+        """Nested tuples/lists of plain values (ints, floats, strings, None)"""
+        self.blob(marshal.dumps(values))
+
+    def blob(self, data: bytes):
+        self.pack("I", len(data))
+        self._parts.append(data)
+
+    def getvalue(self) -> bytes:
+        return _HEADER.pack(MAGIC, FORMAT_VERSION) + zlib.compress(b"".join(self._parts), 1)
+
+
+class SnapshotReader:
+    """Reads back what a SnapshotWriter wrote, in the same order"""
+    __slots__ = ('_data', '_offset')
+
+    def __init__(self, blob: bytes):
+        magic, version = _HEADER.unpack_from(blob)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError("not a snapshot of this version")
+        self._data = zlib.decompress(memoryview(blob)[_HEADER.size:])
+        self._offset = 0
+
+    def expect(self, tag: bytes):
+        found, = self.unpack("4s")
+        if found != tag:
+            raise ValueError(f"snapshot section {tag!r} expected, found {found!r}")
+
+    def unpack(self, fmt: str) -> Tuple:
+        fmt = "<" + fmt
+        values = struct.unpack_from(fmt, self._data, self._offset)
+        self._offset += struct.calcsize(fmt)
+        return values
+
+    def value(self, fmt: str):
+        """A single scalar"""
+        return self.unpack(fmt)[0]
+
+    def array(self, dtype) -> np.ndarray:
+        """The next array as a writable copy"""
+        ndim = self.value("B")
+        shape = self.unpack("%dI" % ndim)
+        dtype = np.dtype(dtype)
+        count = int(np.prod(shape, dtype=np.int64))
+        array = np.frombuffer(self._data, dtype=dtype, count=count, offset=self._offset)
+        self._offset += count * dtype.itemsize
+        return array.reshape(shape).copy()
+
+    def data(self):
+        return marshal.loads(self.blob())
+
+    def blob(self) -> bytes:
+        size = self.value("I")
+        data = self._data[self._offset:self._offset + size]
+        self._offset += size
+        return data
+
+    @property
+    def done(self) -> bool:
+        return self._offset == len(self._data)
+
+
+def slot_values(obj) -> tuple:
+    """Values of all __slots__ of an object (plain-valued objects like particles)"""
+    return tuple(getattr(obj, name) for name in type(obj).__slots__)
+
+
+def set_slot_values(obj, values):
+    for name, value in zip(type(obj).__slots__, values):
+        setattr(obj, name, value)
+
+
+# Export classes
+__all__ = ['SnapshotWriter', 'SnapshotReader', 'slot_values', 'set_slot_values']
@@ -0,0 +1,277 @@
+"""
+Sprite Cache
+Static artwork (sky, ground, platforms, pipes, blocks) baked into surfaces
+once instead of being drawn primitive by primitive every frame, and kept in
+a disk cache between runs.
+
+Bakers are functions registered with @baker(name). They draw onto a canvas()
+and return it; sprite(name, *args) bakes on the first request and then
+returns the same surface. A baker's fingerprint hashes its compiled code
+(bytecode, names and constants, nested functions included), the config.py
+constants it reads and the pygame/SDL version, so changing any of them
+invalidates that baker's sprites - and only those - automatically. Hashing
+the code object needs no source files, so the warm path stays cheap.
+
+The cache file is an index followed by raw pixel buffers. It is read with a
+single read() at startup (load()); sprites are decoded from it on first use,
+and save() writes the file back when anything had to be baked. Sprites are
+used from the main thread only.
+"""
+import hashlib
+import marshal
+import os
+import struct
+import threading
+import time
+from types import CodeType
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+import pygame
+import config
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "__cache__")
+SPRITE_CACHE = os.path.join(CACHE_DIR, "sprites.bin")
+MEMORY_BUDGET = 32 * 1024 * 1024  # Pixel bytes kept in memory and in the file
+PAD = 4                           # Canvas margin for strokes over an object's edge
+
+MAGIC = b"MSPR"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHI")  # magic, version, index size (marshal)
+
+
+class Sprite:
+    """A baked surface; (left, top) is the object's origin inside it"""
+    __slots__ = ('surface', 'left', 'top')
+
+    def __init__(self, surface: pygame.Surface, left: int = 0, top: int = 0):
+        self.surface = surface
+        self.left = left
+        self.top = top
+
+    def draw(self, screen: pygame.Surface, x, y):
+        screen.blit(self.surface, (x - self.left, y - self.top))
+
+    @property
+    def mode(self) -> str:
+        return "RGBA" if self.surface.get_flags() & pygame.SRCALPHA else "RGB"
+
+    @property
+    def nbytes(self) -> int:
+        width, height = self.surface.get_size()
+        return width * height * len(self.mode)
+
+
+def canvas(width: int, height: int, left: int = PAD, top: int = PAD,
+           right: int = PAD, bottom: int = PAD) -> Sprite:
+    """Transparent sprite with a margin around a width x height object"""
+    surface = pygame.Surface((left + width + right, top + height + bottom), pygame.SRCALPHA)
+    return Sprite(surface, left, top)
+
+
+def _hash_code(code: CodeType, digest) -> set:
+    """
+    Feed a function's bytecode, names and constants (nested code included)
+    to digest; returns the config.py constants the function reads
+    """
+    digest.update(code.co_code)
+    digest.update(repr(code.co_names).encode())
+    names = {name for name in code.co_names if name.isupper() and hasattr(config, name)}
+    for constant in code.co_consts:
+        if isinstance(constant, CodeType):
+            names |= _hash_code(constant, digest)
+        else:
+            digest.update(repr(constant).encode())
+    return names
+
+
+class Baker:
+    """A registered baking function and its fingerprint (computed on first use)"""
+    __slots__ = ('name', 'function', '_fingerprint')
+
+    def __init__(self, name: str, function: Callable[..., Sprite]):
+        self.name = name
+        self.function = function
+        self._fingerprint: Optional[bytes] = None
+
+    @property
+    def fingerprint(self) -> bytes:
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16, person=b"mspr-v%d" % FORMAT_VERSION)
+            for name in sorted(_hash_code(self.function.__code__, digest)):
+                digest.update(f"{name}={getattr(config, name)!r};".encode())
+            digest.update(f"pygame {pygame.version.ver} SDL {pygame.get_sdl_version()}".encode())
+            self._fingerprint = digest.digest()
+        return self._fingerprint
+
+
+_BAKERS: Dict[str, Baker] = {}
+
+
+def baker(name: str):
+    """Register a function returning a Sprite as the baker of sprite(name, ...)"""
+    def register(function):
+        _BAKERS[name] = Baker(name, function)
+        return function
+    return register
+
+
+class SpriteCache:
+    """
+    Baked sprites by (name, *args), least recently used first
+    Sprites over the memory budget are dropped (and baked again if needed).
+    path=None keeps the cache in memory only.
+    """
+    __slots__ = ('path', 'budget', '_sprites', '_stored', '_bytes', '_loaded', '_dirty',
+                 'baked', 'decoded', 'stale', 'evicted', 'bake_time', 'load_time')
+
+    def __init__(self, path: Optional[str] = SPRITE_CACHE, budget: int = MEMORY_BUDGET):
+        self.path = path
+        self.budget = budget
+        self._sprites: 'OrderedDict[tuple, Sprite]' = OrderedDict()
+        # Entries of the cache file not used yet: key -> (fingerprint, mode, size, left, top, pixels)
+        self._stored: Dict[tuple, Tuple] = {}
+        self._bytes = 0
+        self._loaded = False
+        self._dirty = False
+        self.baked = 0
+        self.decoded = 0
+        self.stale = 0       # File entries whose baker changed
+        self.evicted = 0
+        self.bake_time = 0.0
+        self.load_time = 0.0
+
+    def get(self, name: str, *args) -> Sprite:
+        key = (name,) + args
+        sprite = self._sprites.get(key)
+        if sprite is None:
+            return self._fetch(key)
+        self._sprites.move_to_end(key)
+        return sprite
+
+    def _fetch(self, key: tuple) -> Sprite:
+        if not self._loaded:
+            self.load()
+        baker = _BAKERS[key[0]]
+        entry = self._stored.pop(key, None)
+        if entry is not None and entry[0] == baker.fingerprint:
+            start = time.perf_counter()
+            _, mode, size, left, top, pixels = entry
+            sprite = Sprite(_displayed(pygame.image.frombuffer(pixels, size, mode), copy=True), left, top)
+            self.load_time += time.perf_counter() - start
+            self.decoded += 1
+        else:
+            start = time.perf_counter()
+            sprite = baker.function(*key[1:])
+            sprite.surface = _displayed(sprite.surface)
+            self.bake_time += time.perf_counter() - start
+            self.baked += 1
+            self.stale += entry is not None
+            self._dirty = True
+        self._sprites[key] = sprite
+        self._bytes += sprite.nbytes
+        while self._bytes > self.budget and len(self._sprites) > 1:
+            _, dropped = self._sprites.popitem(last=False)
+            self._bytes -= dropped.nbytes
+            self.evicted += 1
+        return sprite
+
+    def load(self) -> bool:
+        """Read the cache file (one read, decoding waits for get()); False if there is none"""
+        if self._loaded:
+            return bool(self._stored)
+        self._loaded = True
+        if self.path is None:
+            return False
+        start = time.perf_counter()
+        try:
+            with open(self.path, "rb") as file:
+                data = file.read()
+            magic, version, index_size = _HEADER.unpack_from(data)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                raise ValueError("not a sprite cache of this version")
+            index = marshal.loads(data[_HEADER.size:_HEADER.size + index_size])
+        except (OSError, ValueError, EOFError, TypeError, struct.error):
+            return False  # Missing or damaged cache - everything gets baked
+        finally:
+            self.load_time += time.perf_counter() - start
+        pixels = memoryview(data)[_HEADER.size + index_size:]
+        offset = 0
+        for key, fingerprint, mode, size, left, top in index:
+            length = size[0] * size[1] * len(mode)
+            self._stored[key] = (fingerprint, mode, size, left, top, pixels[offset:offset + length])
+            offset += length
+        return True
+
+    def save(self) -> bool:
+        """Write the cache file if something was baked; False if there was nothing to write"""
+        if self.path is None or not self._dirty:
+            return False
+        index = []
+        parts = []
+        total = 0
+        for key, sprite in reversed(self._sprites.items()):  # Most recently used first
+            if total + sprite.nbytes > self.budget:
+                break
+            index.append((key, _BAKERS[key[0]].fingerprint, sprite.mode,
+                          sprite.surface.get_size(), sprite.left, sprite.top))
+            parts.append(pygame.image.tobytes(sprite.surface, sprite.mode))
+            total += sprite.nbytes
+        for key, (fingerprint, mode, size, left, top, pixels) in self._stored.items():
+            baker = _BAKERS.get(key[0])
+            if baker is None or baker.fingerprint != fingerprint or total + len(pixels) > self.budget:
+                continue  # Unused this run and stale or over budget
+            index.append((key, fingerprint, mode, size, left, top))
+            parts.append(pixels)
+            total += len(pixels)
+        index_data = marshal.dumps(index)
+        try:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            temp_path = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(temp_path, "wb") as file:
+                file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, len(index_data)))
+                file.write(index_data)
+                for part in parts:
+                    file.write(part)
+            os.replace(temp_path, self.path)  # Readers never see a half-written cache
+        except OSError:
+            return False  # Read-only install: bake again next time
+        self._dirty = False
+        return True
+
+    def clear(self):
+        """Forget all sprites (memory and the loaded file); the next get() loads again"""
+        self._sprites.clear()
+        self._stored.clear()
+        self._bytes = 0
+        self._loaded = False
+        self._dirty = False
+
+    def stats(self) -> dict:
+        return {'sprites': len(self._sprites), 'bytes': self._bytes, 'stored': len(self._stored),
+                'baked': self.baked, 'decoded': self.decoded, 'stale': self.stale,
+                'evicted': self.evicted, 'bake_ms': self.bake_time * 1000,
+                'load_ms': self.load_time * 1000}
+
+
+def _displayed(surface: pygame.Surface, copy: bool = False) -> pygame.Surface:
+    """
+    The surface in the display's pixel format (fast blits), once a window exists
+    copy=True - surface borrows a buffer (frombuffer), the result must not
+    """
+    if pygame.display.get_surface() is None:
+        return surface.copy() if copy else surface
+    return surface.convert_alpha() if surface.get_flags() & pygame.SRCALPHA else surface.convert()
+
+
+# Shared cache of the game
+sprites = SpriteCache()
+
+
+def sprite(name: str, *args) -> Sprite:
+    """Baked sprite name for these arguments (e.g. sprite("platform", 200, 20, BROWN))"""
+    return sprites.get(name, *args)
+
+
+# Export classes
+__all__ = ['Sprite', 'SpriteCache', 'canvas', 'baker', 'sprite', 'sprites',
+           'SPRITE_CACHE', 'MEMORY_BUDGET', 'PAD']
@@ -0,0 +1,211 @@
+"""
+Level Streaming
+Long levels are cut into vertical chunks CHUNK_WIDTH pixels wide. Only the
+chunks around the camera have live objects and collider indices; chunks are
+materialized from the level data as the camera approaches and dropped after
+it passes. Changes the player made (collected coins, killed enemies, hit or
+broken blocks, where surviving enemies walked to) persist across reloads.
+Blocks and coins of a level with a tile map come from the map instead and
+keep their state in its state bits.
+"""
+import math
+import numpy as np
+from config import SCREEN_WIDTH, CHUNK_WIDTH, STREAM_MARGIN, COIN_SIZE
+from tilemap import T_COIN, S_HIT, S_BROKEN, S_COLLECTED
+from typing import Dict, Set, Tuple
+
+# Object lists of a Level built from LevelData, in construction order
+LEVEL_OBJECTS = ('platforms', 'blocks', 'pipes', 'enemies', 'coins', 'powerups')
+
+# Width of objects whose data row has no width column
+_WIDTHS = {'blocks': 40, 'pipes': 60, 'coins': COIN_SIZE, 'powerups': 30, 'enemies': 0}
+
+
+class LevelStreamer:
+    """
+    Keeps the objects of chunks [first, last] of a Level materialized
+
+    Static objects belong to every chunk they overlap; an enemy belongs to
+    the chunk its left edge was in when it was last unloaded. The loaded
+    window only moves once the camera needs a chunk outside it or the window
+    is more than one chunk wider than needed on a side, so walking back and
+    forth over a chunk border does not reload anything.
+    """
+    __slots__ = ('level', 'data', 'chunk_width', 'margin', 'first', 'last',
+                 '_index', '_loaded', 'removed', '_saved', '_moved', 'tilemap',
+                 '_tile_blocks', '_tile_coins', 'loads', 'unloads')
+
+    def __init__(self, level, data, chunk_width: int = CHUNK_WIDTH, margin: int = STREAM_MARGIN):
+        self.level = level
+        self.data = data
+        self.chunk_width = chunk_width
+        self.margin = margin
+        self.first = self.last = None
+
+        # Per category: rows sorted by first chunk, their first/last chunks
+        # and the widest chunk span (vectorized, so setup stays cheap for huge levels)
+        self._index: Dict[str, tuple] = {}
+        for category in LEVEL_OBJECTS:
+            rows = getattr(data, category)
+            right = (rows[:, 0] + rows[:, 2] if category == 'platforms'
+                     else rows[:, 0] + _WIDTHS[category])
+            starts = rows[:, 0] // chunk_width
+            ends = np.maximum(rows[:, 0], right - 1) // chunk_width
+            order = np.argsort(starts, kind='stable')
+            span = int((ends - starts).max()) if len(rows) else 0
+            self._index[category] = (starts[order], ends[order], order, span)
+
+        self._loaded: Dict[str, Dict[int, object]] = {category: {} for category in LEVEL_OBJECTS}
+        self.removed: Dict[str, Set[int]] = {category: set() for category in LEVEL_OBJECTS}
+        self._saved: Dict[str, Dict[int, tuple]] = {'blocks': {}, 'enemies': {}}
+        self._moved: Dict[int, int] = {}  # Enemy row -> chunk it walked into
+        # Objects of tile map cells, by flat tile index
+        self.tilemap = level.tilemap
+        self._tile_blocks: Dict[int, object] = {}
+        self._tile_coins: Dict[int, object] = {}
+        self.loads = 0     # Objects materialized so far
+        self.unloads = 0
+        self.update(0)
+
+    def chunk_of(self, x: float) -> int:
+        return math.floor(x / self.chunk_width)
+
+    def window(self, camera_x: float) -> Tuple[int, int]:
+        """Chunks the camera at camera_x needs"""
+        return (self.chunk_of(camera_x - self.margin),
+                self.chunk_of(camera_x + SCREEN_WIDTH + self.margin))
+
+    def update(self, camera_x: float) -> bool:
+        """Load/unload chunks for the camera; returns True if anything changed"""
+        first, last = self.window(camera_x)
+        if (self.first is not None and self.first <= first and last <= self.last
+                and first - self.first <= 1 and self.last - last <= 1):
+            return False
+        self._harvest()
+        self.first, self.last = first, last
+        for category in LEVEL_OBJECTS:
+            self._sync(category)
+        if self.tilemap is not None:
+            self._sync_tiles()
+        level = self.level
+        for category in ('platforms', 'blocks', 'pipes'):
+            loaded = self._loaded[category]
+            getattr(level, category)[:] = [loaded[row] for row in sorted(loaded)]
+        level.blocks.extend(self._tile_blocks[index] for index in sorted(self._tile_blocks))
+        level.reindex()
+        return True
+
+    # === SYNC ===
+
+    def _harvest(self):
+        """Remember what the player removed from the loaded chunks"""
+        level = self.level
+        for category, gone in (('coins', lambda coin: coin.collected or coin not in level.coins),
+                               ('powerups', lambda item: item.collected or item not in level.powerups),
+                               ('enemies', lambda enemy: not enemy.alive or enemy not in level.enemies)):
+            loaded = self._loaded[category]
+            for row in [row for row, obj in loaded.items() if gone(obj)]:
+                del loaded[row]
+                self.removed[category].add(row)
+        for index in [index for index, coin in self._tile_coins.items()
+                      if coin.collected or coin not in level.coins]:
+            del self._tile_coins[index]
+            self.tilemap.mark(index, S_COLLECTED)
+
+    def _wanted(self, category: str) -> Set[int]:
+        starts, ends, order, span = self._index[category]
+        low = np.searchsorted(starts, self.first - span, 'left')
+        high = np.searchsorted(starts, self.last, 'right')
+        wanted = set(order[low:high][ends[low:high] >= self.first].tolist())
+        if category == 'enemies' and self._moved:
+            wanted -= self._moved.keys()
+            wanted.update(row for row, chunk in self._moved.items()
+                          if self.first <= chunk <= self.last)
+        return wanted - self.removed[category]
+
+    def _sync(self, category: str):
+        loaded = self._loaded[category]
+        for row in sorted(set(loaded) - self._wanted(category)):
+            self._unload(category, row, loaded.pop(row))
+        # Asked again: an unloaded enemy may have walked into a wanted chunk
+        for row in sorted(self._wanted(category) - set(loaded)):
+            loaded[row] = self._load(category, row)
+
+    def _load(self, category: str, row: int):
+        level = self.level
+        obj = level.make_object(category, getattr(self.data, category)[row].tolist(), self.data)
+        saved = self._saved.get(category, {}).pop(row, None)
+        if category == 'blocks' and saved is not None:
+            obj.hit, obj.broken, obj.content = saved
+        elif category == 'enemies':
+            if saved is not None:
+                obj.store.load_state(obj.handle, saved)
+            level.enemies.add(obj)
+        elif category in ('coins', 'powerups'):
+            getattr(level, category).add(obj)
+        self.loads += 1
+        return obj
+
+    def _unload(self, category: str, row: int, obj):
+        level = self.level
+        if category == 'blocks':
+            if obj.hit or obj.broken:
+                self._saved['blocks'][row] = (obj.hit, obj.broken, obj.content)
+            level.active_blocks.deactivate(obj)
+        elif category == 'enemies':
+            # The enemy moves to the chunk it walked into
+            home = self.chunk_of(obj.rect.x)
+            if home != self.chunk_of(int(self.data.enemies[row, 0])):
+                self._moved[row] = home
+            else:
+                self._moved.pop(row, None)
+            self._saved['enemies'][row] = obj.store.save_state(obj.handle)
+            level.enemies.discard_now(obj)
+            obj.release()
+        elif category in ('coins', 'powerups'):
+            getattr(level, category).discard_now(obj)
+        self.unloads += 1
+
+    def _sync_tiles(self):
+        level = self.level
+        tilemap = self.tilemap
+        first, last = tilemap.column_range(self.first * self.chunk_width,
+                                           (self.last + 1) * self.chunk_width)
+        wanted = set(tilemap.present(first, last).tolist())
+        for index in sorted(set(self._tile_blocks) - wanted):
+            block = self._tile_blocks.pop(index)
+            bits = (S_HIT if block.hit else 0) | (S_BROKEN if block.broken else 0)
+            if bits:
+                tilemap.mark(index, bits)
+            level.active_blocks.deactivate(block)
+            self.unloads += 1
+        for index in sorted(set(self._tile_coins) - wanted):
+            level.coins.discard_now(self._tile_coins.pop(index))
+            self.unloads += 1
+        for index in sorted(wanted - set(self._tile_blocks) - set(self._tile_coins)):
+            x, y, tile, state = tilemap.tile(index)
+            obj = level.make_tile(x, y, tile)
+            if tile == T_COIN:
+                level.coins.add(obj)
+                self._tile_coins[index] = obj
+            else:
+                obj.hit = bool(state & S_HIT)
+                self._tile_blocks[index] = obj
+            self.loads += 1
+
+    # === INFO ===
+
+    def loaded_count(self) -> int:
+        return (sum(len(loaded) for loaded in self._loaded.values())
+                + len(self._tile_blocks) + len(self._tile_coins))
+
+    def stats(self) -> dict:
+        return {'chunks': (self.first, self.last),
+                'loaded': self.loaded_count(),
+                'removed': sum(len(rows) for rows in self.removed.values()),
+                'loads': self.loads,
+                'unloads': self.unloads}
+
+
+# Export classes
+__all__ = ['LevelStreamer', 'LEVEL_OBJECTS']
@@ -0,0 +1,221 @@
+"""
+Walkable Surfaces
+Precomputed graph of floor spans (tops of platforms, blocks and pipes) so
+edge detection and patrol bounds are lookups instead of platform scans
+"""
+from bisect import bisect_right
+from typing import Dict, Iterable, List, Optional, Tuple
+import pygame
+
+
+class Span:
+    """
+    Contiguous walkable strip at height top, from left to right (exclusive)
+    Each end is either a wall (something solid stands there) or a drop;
+    a drop links to the span an entity lands on when it walks off
+    """
+    __slots__ = ('left', 'right', 'top', 'left_wall', 'right_wall',
+                 'left_link', 'right_link', 'valid')
+
+    def __init__(self, left: int, right: int, top: int,
+                 left_wall: bool = False, right_wall: bool = False):
+        self.left = left
+        self.right = right
+        self.top = top
+        self.left_wall = left_wall
+        self.right_wall = right_wall
+        self.left_link: Optional['Span'] = None
+        self.right_link: Optional['Span'] = None
+        self.valid = True  # Cleared when the span is rebuilt
+
+    @property
+    def width(self) -> int:
+        return self.right - self.left
+
+    def contains(self, x: float) -> bool:
+        return self.left <= x < self.right
+
+    def supports(self, rect: pygame.Rect) -> bool:
+        """Rect stands on this span"""
+        return (self.valid and rect.bottom == self.top
+                and rect.left < self.right and rect.right > self.left)
+
+    def __repr__(self):
+        return f"Span({self.left}, {self.right}, top={self.top})"
+
+
+class SurfaceGraph:
+    """
+    Walkable spans of a level grouped into rows by height
+
+    Spans at the same height that touch are merged; parts of a top that are
+    covered by another solid (a pipe standing on the ground, a brick on a
+    brick) are cut out and the cut ends are marked as walls.
+    """
+    __slots__ = ('_sources', '_solids', 'rows', '_lefts', '_heights')
+
+    def __init__(self, rects: Iterable[pygame.Rect] = ()):
+        self._sources: Dict[int, List[pygame.Rect]] = {}  # Surface rects by top
+        self._solids: List[pygame.Rect] = []
+        self.rows: Dict[int, List[Span]] = {}
+        self._lefts: Dict[int, List[int]] = {}
+        self._heights: List[int] = []
+        for rect in rects:
+            self._add_source(pygame.Rect(rect))
+        for top in self._sources:
+            self._build_row(top)
+        self._heights = sorted(self.rows)
+        self._link(self.spans())
+
+    @classmethod
+    def from_level(cls, level) -> 'SurfaceGraph':
+        """Platforms, unbroken blocks and pipes of a Level"""
+        rects = [platform.rect for platform in level.platforms]
+        rects += [block.rect for block in level.blocks if not block.broken]
+        rects += [pipe.rect for pipe in level.pipes]
+        return cls(rects)
+
+    # === BUILD ===
+
+    def _add_source(self, rect: pygame.Rect):
+        self._sources.setdefault(rect.top, []).append(rect)
+        self._solids.append(rect)
+
+    def _build_row(self, top: int):
+        """Merge the surfaces at one height and cut out covered parts"""
+        for span in self.rows.get(top, ()):
+            span.valid = False
+        sources = sorted(self._sources.get(top, ()), key=lambda rect: rect.left)
+
+        merged: List[List[int]] = []
+        for rect in sources:
+            if merged and rect.left <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], rect.right)
+            else:
+                merged.append([rect.left, rect.right])
+
+        covers = sorted((solid.left, solid.right) for solid in self._solids
+                        if solid.top < top <= solid.bottom)
+        spans = []
+        for left, right in merged:
+            left_wall = False
+            for cover_left, cover_right in covers:
+                if cover_right <= left or cover_left >= right:
+                    continue
+                if cover_left > left:
+                    spans.append(Span(left, cover_left, top, left_wall, True))
+                left = max(left, cover_right)
+                left_wall = True
+                if left >= right:
+                    break
+            if left < right:
+                spans.append(Span(left, right, top, left_wall, False))
+
+        # A solid right next to an end (a step up) is a wall as well
+        for span in spans:
+            for cover_left, cover_right in covers:
+                span.left_wall |= cover_right == span.left
+                span.right_wall |= cover_left == span.right
+
+        if spans:
+            self.rows[top] = spans
+            self._lefts[top] = [span.left for span in spans]
+        else:
+            self.rows.pop(top, None)
+            self._lefts.pop(top, None)
+
+    def _landing(self, x: float, above: int) -> Optional[Span]:
+        """Highest span below height above that contains x"""
+        for top in self._heights[bisect_right(self._heights, above):]:
+            span = self._span_in_row(top, x)
+            if span is not None:
+                return span
+        return None
+
+    def _link(self, spans: Iterable[Span]):
+        for span in spans:
+            span.left_link = None if span.left_wall else self._landing(span.left - 1, span.top)
+            span.right_link = None if span.right_wall else self._landing(span.right, span.top)
+
+    # === QUERIES ===
+
+    def spans(self) -> List[Span]:
+        return [span for top in self._heights for span in self.rows[top]]
+
+    def _span_in_row(self, top: int, x: float) -> Optional[Span]:
+        lefts = self._lefts.get(top)
+        if not lefts:
+            return None
+        i = bisect_right(lefts, x) - 1
+        if i >= 0 and self.rows[top][i].contains(x):
+            return self.rows[top][i]
+        return None
+
+    def span_at(self, x: float, top: int) -> Optional[Span]:
+        """Span at height top that contains x"""
+        return self._span_in_row(top, x)
+
+    def span_under(self, rect: pygame.Rect, cached: Optional[Span] = None) -> Optional[Span]:
+        """
+        Span the rect stands on (None while airborne)
+        cached - span returned last time; reused without a lookup while the
+        rect is still on it
+        """
+        if cached is not None and cached.supports(rect):
+            return cached
+        lefts = self._lefts.get(rect.bottom)
+        if not lefts:
+            return None
+        row = self.rows[rect.bottom]
+        i = bisect_right(lefts, rect.right - 1) - 1
+        # The larger overlap wins when a rect straddles two spans
+        best = None
+        best_overlap = 0
+        while i >= 0 and row[i].right > rect.left:
+            overlap = min(rect.right, row[i].right) - max(rect.left, row[i].left)
+            if overlap > best_overlap:
+                best, best_overlap = row[i], overlap
+            i -= 1
+        return best
+
+    def is_edge(self, span: Span, x: float) -> bool:
+        """Point x is past a drop end of span (walls are not edges)"""
+        if x >= span.right:
+            return not span.right_wall
+        if x < span.left:
+            return not span.left_wall
+        return False
+
+    def patrol_bounds(self, span: Span, width: int) -> Tuple[int, int]:
+        """Range of rect.x keeping a rect of this width fully on the span"""
+        return span.left, max(span.left, span.right - width)
+
+    # === INCREMENTAL UPDATE ===
+
+    def remove_solid(self, rect: pygame.Rect):
+        """Drop one surface (e.g. a broken brick) and patch affected rows"""
+        rect = pygame.Rect(rect)
+        if rect not in self._solids:
+            return
+        self._solids.remove(rect)
+        self._sources[rect.top].remove(rect)
+
+        rows = [top for top in self._sources if rect.top <= top <= rect.bottom]
+        stale = set()
+        for top in rows:
+            stale.update(id(span) for span in self.rows.get(top, ()))
+            self._build_row(top)
+        self._heights = sorted(self.rows)
+
+        # Relink rebuilt spans and every span that pointed at a stale one
+        relink = [span for top in rows for span in self.rows.get(top, ())]
+        relink += [span for span in self.spans()
+                   if id(span.left_link) in stale or id(span.right_link) in stale]
+        self._link(relink)
+
+    def __len__(self) -> int:
+        return sum(len(row) for row in self.rows.values())
+
+
+# Export classes
+__all__ = ['Span', 'SurfaceGraph']
@@ -0,0 +1,508 @@
+"""
+Game Systems
+Game.update split into an ordered pipeline of systems. Each system can be
+disabled and is timed; collision results are collected per category and
+dispatched to subscribers as one batch.
+"""
+import time
+import numpy as np
+import pygame
+from config import *
+from ecs import KIND_ENEMY
+from entity_base import CollisionSystem
+from mario_blocks import FireFlower
+from particle import Particle, StarParticle, CoinCollectEffect
+from pool import spawn, recycle, recycle_dead
+from typing import Callable, Dict, List, Optional
+
+
+class CollisionEvents:
+    """
+    Per-category event batches
+    emit() only queues, dispatch() hands the whole batch to every handler
+    subscribed to the category (in subscription order) and clears it
+    """
+    __slots__ = ('_handlers', '_queues', 'counts')
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable]] = {}
+        self._queues: Dict[str, List] = {}
+        self.counts: Dict[str, int] = {}  # Events dispatched per category
+
+    def subscribe(self, category: str, handler: Callable[[List], None]):
+        self._handlers.setdefault(category, []).append(handler)
+        self._queues.setdefault(category, [])
+
+    def emit(self, category: str, event):
+        self._queues.setdefault(category, []).append(event)
+
+    def dispatch(self, category: str):
+        batch = self._queues.get(category)
+        if not batch:
+            return
+        self._queues[category] = []
+        self.counts[category] = self.counts.get(category, 0) + len(batch)
+        for handler in self._handlers.get(category, ()):
+            handler(batch)
+
+
+class System:
+    """
+    One step of the game tick
+    Subclasses implement update(dt); the pipeline measures its run time
+    """
+    __slots__ = ('game', 'enabled', 'calls', 'total_time', 'last_time')
+    name = 'system'
+
+    def __init__(self, game):
+        self.game = game
+        self.enabled = True
+        self.calls = 0
+        self.total_time = 0.0
+        self.last_time = 0.0
+
+    @property
+    def events(self) -> CollisionEvents:
+        return self.game.systems.events
+
+    def update(self, dt: int):
+        raise NotImplementedError("Subclasses must implement update()")
+
+
+class SystemPipeline:
+    """Ordered list of systems run once per tick"""
+    __slots__ = ('systems', 'events', '_by_name')
+
+    def __init__(self, systems=()):
+        self.systems: List[System] = []
+        self.events = CollisionEvents()
+        self._by_name: Dict[str, System] = {}
+        for system in systems:
+            self.add(system)
+
+    def add(self, system: System, before: Optional[str] = None):
+        """Append a system, or insert it in front of the one named before"""
+        if before is None:
+            self.systems.append(system)
+        else:
+            self.systems.insert(self.systems.index(self._by_name[before]), system)
+        self._by_name[system.name] = system
+        return system
+
+    def get(self, name: str) -> System:
+        return self._by_name[name]
+
+    def set_enabled(self, name: str, enabled: bool):
+        self._by_name[name].enabled = enabled
+
+    def update(self, dt: int = 1):
+        clock = time.perf_counter
+        for system in self.systems:
+            if not system.enabled:
+                continue
+            start = clock()
+            system.update(dt)
+            elapsed = clock() - start
+            system.calls += 1
+            system.total_time += elapsed
+            system.last_time = elapsed
+
+    def stats(self) -> Dict[str, dict]:
+        """Timing per system in milliseconds"""
+        return {system.name: {'calls': system.calls,
+                              'last_ms': system.last_time * 1000,
+                              'avg_ms': system.total_time * 1000 / max(1, system.calls),
+                              'total_ms': system.total_time * 1000,
+                              'enabled': system.enabled}
+                for system in self.systems}
+
+    def reset_stats(self):
+        for system in self.systems:
+            system.calls = 0
+            system.total_time = 0.0
+            system.last_time = 0.0
+
+
+# === SYSTEMS (in tick order) ===
+
+class StreamingSystem(System):
+    """Loads and drops chunks of streamed levels around the camera"""
+    __slots__ = ()
+    name = 'streaming'
+
+    def update(self, dt):
+        streamer = self.game.level.streamer
+        if streamer is not None:
+            streamer.update(self.game.camera_x)
+
+
+class PlayerSystem(System):
+    """Input and player movement with blocks and pipes"""
+    __slots__ = ()
+    name = 'player'
+
+    def update(self, dt):
+        game = self.game
+        keys = game.key_state if game.key_state is not None else pygame.key.get_pressed()
+        game.player.update(keys, game.level.platforms, game.level.blocks, game.level.pipes,
+                           game.level.solids())
+
+
+class TimerSystem(System):
+    """Player countdowns, combo window and the level clock"""
+    __slots__ = ()
+    name = 'timers'
+
+    def update(self, dt):
+        self.game.timers.advance(dt)
+
+
+class BlockSystem(System):
+    """Bump animations and head hits from below"""
+    __slots__ = ()
+    name = 'blocks'
+
+    def __init__(self, game):
+        super().__init__(game)
+        game.systems.events.subscribe('block_hit', self.on_block_hits)
+
+    def update(self, dt):
+        game = self.game
+        player = game.player
+        game.level.active_blocks.update()
+
+        # Kontrola kolize Maria s blokem (zdola) - jen bloky ve sloupcích nad hráčem
+        for block in game.level.blocks_near(player.rect):
+            if player.rect.colliderect(block.rect):
+                if player.velocity_y < 0:  # Mario skáče nahoru
+                    overlap = player.rect.top - block.rect.bottom
+                    if overlap > -10:  # Udření zdola
+                        player.rect.top = block.rect.bottom
+                        player.velocity_y = 0
+                        self.events.emit('block_hit', (block, block.hit_block(player)))
+        self.events.dispatch('block_hit')
+
+    def on_block_hits(self, hits):
+        game = self.game
+        for block, content in hits:
+            if content == "coin":
+                game.score += 100
+            elif content == "mushroom":
+                game.level.spawn_mushroom(block.rect.x, block.rect.y)
+                game.score += 1000
+            elif content == "flower":
+                flower = FireFlower(block.rect.x, block.rect.y)
+                game.level.flowers.append(flower)
+                game.score += 1000
+            elif content == "break":
+                game.score += 50
+                game.level.break_block(block)
+                # Částice rozbitých cihel
+                for _ in range(8):
+                    game.particles.append(
+                        spawn(Particle, block.rect.centerx, block.rect.centery,
+                              (178, 34, 34), 0, -5, 30)
+                    )
+
+
+class EntitySystem(System):
+    """Batched ComponentStore step of awake enemies and mushrooms"""
+    __slots__ = ()
+    name = 'entities'
+
+    def update(self, dt):
+        game = self.game
+        store = game.level.store
+        # Nepřátelé a houby - jen probuzené; vzdálené každý N-tý tick (dohánějí zmeškané)
+        awake = game.region.update(game.camera_x, store)
+        game.awake_index, game.awake_enemies = store.bound(awake, KIND_ENEMY)
+        due, ticks = game.lod.schedule(store, awake, game.player.rect.centerx)
+        game.level.update_entities(due, ticks)
+
+
+class PickupSystem(System):
+    """Mushrooms, fire flowers and the old power-ups"""
+    __slots__ = ()
+    name = 'pickups'
+
+    def __init__(self, game):
+        super().__init__(game)
+        events = game.systems.events
+        events.subscribe('mushroom', self.on_mushrooms)
+        events.subscribe('flower', self.on_flowers)
+        events.subscribe('powerup', self.on_powerups)
+
+    def update(self, dt):
+        level = self.game.level
+        player_rect = self.game.player.rect
+        events = self.events
+
+        for mushroom in level.mushrooms:
+            if player_rect.colliderect(mushroom.rect) and not mushroom.collected:
+                events.emit('mushroom', mushroom)
+        events.dispatch('mushroom')
+
+        for flower in level.flowers:
+            flower.update()
+            if player_rect.colliderect(flower.rect) and not flower.collected:
+                events.emit('flower', flower)
+        events.dispatch('flower')
+
+        for powerup in level.powerups:
+            powerup.update()
+            if player_rect.colliderect(powerup.rect) and not powerup.collected:
+                events.emit('powerup', powerup)
+        events.dispatch('powerup')
+
+    def on_mushrooms(self, mushrooms):
+        game = self.game
+        for mushroom in mushrooms:
+            mushroom.collected = True
+            game.level.mushrooms.remove(mushroom)
+            if game.player.power_up():
+                # Hvězdičkový efekt
+                for _ in range(15):
+                    game.particles.append(spawn(StarParticle, mushroom.rect.centerx, mushroom.rect.centery))
+
+    def on_flowers(self, flowers):
+        game = self.game
+        for flower in flowers:
+            flower.collected = True
+            game.level.flowers.remove(flower)
+            if game.player.fire_power_up():
+                # Ohnivý efekt
+                for _ in range(20):
+                    game.particles.append(
+                        spawn(Particle, flower.rect.centerx, flower.rect.centery,
+                              (255, 100, 0), 0, -3, 40)
+                    )
+
+    def on_powerups(self, powerups):
+        game = self.game
+        for powerup in powerups:
+            powerup.collect()
+            game.level.powerups.remove(powerup)
+
+            if powerup.powerup_type == "extra_life":
+                if game.lives < MAX_LIVES:
+                    game.lives += 1
+                game.score += 100
+                for _ in range(15):
+                    game.particles.append(spawn(StarParticle, powerup.rect.centerx, powerup.rect.centery))
+
+            elif powerup.powerup_type == "speed_boost":
+                game.player.activate_speed_boost()
+                game.score += 50
+                for _ in range(20):
+                    game.particles.append(
+                        spawn(Particle, powerup.rect.centerx, powerup.rect.centery,
+                              (0, 150, 255), 0, 0, 40)
+                    )
+
+
+class EnemySystem(System):
+    """
+    Fireball and player contacts with awake enemies, tested in batches
+    Events: 'fireball_hit' (enemy, fireball), 'enemy_contact' (enemy, stomped)
+    """
+    __slots__ = ()
+    name = 'enemies'
+
+    def __init__(self, game):
+        super().__init__(game)
+        events = game.systems.events
+        events.subscribe('fireball_hit', self.on_fireball_hits)
+        events.subscribe('enemy_contact', self.on_enemy_contacts)
+
+    def update(self, dt):
+        game = self.game
+        player = game.player
+        enemies = game.awake_enemies
+        enemy_boxes = game.level.store.boxes(game.awake_index)
+
+        # Kolize s ohnivou koulí - každý nepřítel spálí první zasahující kouli
+        fireballs = list(player.fireballs)
+        if fireballs and len(enemy_boxes):
+            burnt = CollisionSystem.check_aabb_pairs(
+                enemy_boxes, CollisionSystem.to_boxes(fireball.rect for fireball in fireballs))
+            spent = set()
+            for i in np.flatnonzero(burnt.any(axis=1)).tolist():
+                for j in np.flatnonzero(burnt[i]).tolist():
+                    if j not in spent and enemies[i].alive:
+                        spent.add(j)
+                        self.events.emit('fireball_hit', (enemies[i], fireballs[j]))
+                        break
+        self.events.dispatch('fireball_hit')
+
+        # Kolize s nepřítelem (skok = chodidla nad středem nepřítele, bottom - 10 < centery)
+        touching = CollisionSystem.check_aabb_many(player.rect, enemy_boxes)
+        stomping = CollisionSystem.is_stomp_many(player.rect, player.velocity_y,
+                                                 enemy_boxes, tolerance=9)
+        falling = player.velocity_y > 0
+        for i in np.flatnonzero(touching).tolist():
+            if enemies[i].alive:
+                stomped = bool(stomping[i]) and falling
+                falling = falling and not stomped  # Po skoku hráč letí nahoru
+                self.events.emit('enemy_contact', (enemies[i], stomped))
+        self.events.dispatch('enemy_contact')
+
+        # Combo timer
+        if game.combo_timer == 0:
+            game.combo = 0
+
+    def on_fireball_hits(self, hits):
+        game = self.game
+        for enemy, fireball in hits:
+            enemy.kill()
+            game.level.enemies.remove(enemy)
+            game.player.fireballs.remove(fireball)
+            fireball.release()
+            game.score += 100
+            # Exploze
+            for _ in range(10):
+                game.particles.append(
+                    spawn(Particle, enemy.rect.centerx, enemy.rect.centery,
+                          (255, 100, 0), 0, -3, 25)
+                )
+
+    def on_enemy_contacts(self, contacts):
+        game = self.game
+        for enemy, stomped in contacts:
+            if stomped:
+                # Skok na nepřítele
+                enemy.kill()
+                game.level.enemies.remove(enemy)
+                game.player.velocity_y = -10
+
+                # Combo systém
+                game.combo += 1
+                game.combo_timer = 120
+                bonus = 100 * game.combo
+                game.score += bonus
+
+                # Částicový efekt
+                for _ in range(15):
+                    game.particles.append(
+                        spawn(Particle, enemy.rect.centerx, enemy.rect.centery,
+                              (139, 90, 43), 0, -2, 30)
+                    )
+
+                if game.combo > 1:
+                    game.effects.append(game.create_combo_text(enemy.rect.centerx, enemy.rect.centery))
+            else:
+                # Hráč byl zasažen
+                if game.player.take_damage():
+                    game.player_hit()
+                    break  # Hráč je zpět na startu, ostatní dotyky už neplatí
+
+
+class CoinSystem(System):
+    """Player against all coins in one batched test"""
+    __slots__ = ()
+    name = 'coins'
+
+    def __init__(self, game):
+        super().__init__(game)
+        game.systems.events.subscribe('coin', self.on_coins)
+
+    def update(self, dt):
+        coins, boxes = self.game.level.coin_boxes()
+        for i in np.flatnonzero(CollisionSystem.check_aabb_many(
+                self.game.player.rect, boxes)).tolist():
+            if not coins[i].collected:
+                self.events.emit('coin', coins[i])
+        self.events.dispatch('coin')
+
+    def on_coins(self, coins):
+        game = self.game
+        for coin in coins:
+            coin.collect()
+            game.level.coins.remove(coin)
+            game.score += 100
+
+            game.effects.append(spawn(CoinCollectEffect, coin.rect.centerx, coin.rect.centery))
+
+            for _ in range(8):
+                game.particles.append(
+                    spawn(Particle, coin.rect.centerx, coin.rect.centery,
+                          YELLOW, 0, -2, 25)
+                )
+
+
+class EffectSystem(System):
+    """Particles and text effects (dead ones go back to their pools)"""
+    __slots__ = ()
+    name = 'effects'
+
+    def update(self, dt):
+        game = self.game
+        for particle in game.particles:
+            particle.update()
+        recycle_dead(game.particles)
+
+        for effect in game.effects:
+            effect.update()
+        recycle_dead(game.effects)
+
+
+class GoalSystem(System):
+    """Reaching the flag and falling into a pit"""
+    __slots__ = ()
+    name = 'goal'
+
+    def update(self, dt):
+        game = self.game
+        flag = game.level.flag
+        # Kontrola dosažení vlajky
+        if game.player.rect.colliderect(flag.rect):
+            game.game_state = "level_complete"
+            game.state_timer = pygame.time.get_ticks()
+            bonus_score = game.time_remaining * 10
+            game.score += bonus_score
+            if game.current_level < game.max_level:
+                game.preloader.request(game.current_level + 1)
+
+            for _ in range(50):
+                game.particles.append(spawn(StarParticle, flag.rect.centerx, flag.rect.centery))
+
+        # Kontrola pádu do propasti
+        if game.player.rect.top > SCREEN_HEIGHT:
+            game.player_hit()
+
+
+class CleanupSystem(System):
+    """Deferred removals (O(1) swap-remove, safe during iteration)"""
+    __slots__ = ()
+    name = 'cleanup'
+
+    def update(self, dt):
+        self.game.level.flush_removals()
+        self.game.player.fireballs.flush(recycle)
+
+
+class CameraSystem(System):
+    __slots__ = ()
+    name = 'camera'
+
+    def update(self, dt):
+        self.game.update_camera()
+
+
+DEFAULT_SYSTEMS = (StreamingSystem, PlayerSystem, TimerSystem, BlockSystem, EntitySystem,
+                   PickupSystem, EnemySystem, CoinSystem, EffectSystem, GoalSystem,
+                   CleanupSystem, CameraSystem)
+
+
+def build_pipeline(game, systems=DEFAULT_SYSTEMS) -> SystemPipeline:
+    """Pipeline with one instance of each system class, in the given order"""
+    pipeline = game.systems = SystemPipeline()
+    for system_cls in systems:
+        pipeline.add(system_cls(game))
+    return pipeline
+
+
+# Export classes
+__all__ = ['CollisionEvents', 'System', 'SystemPipeline', 'build_pipeline', 'DEFAULT_SYSTEMS',
+           'StreamingSystem', 'PlayerSystem', 'TimerSystem', 'BlockSystem', 'EntitySystem',
+           'PickupSystem', 'EnemySystem', 'CoinSystem', 'EffectSystem', 'GoalSystem',
+           'CleanupSystem', 'CameraSystem']
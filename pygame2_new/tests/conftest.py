@@ -0,0 +1,30 @@
+"""
+Test setup: game modules import each other by plain name (python main.py
+runs from pygame2_new/), so the game directory goes first on sys.path.
+Run from the repository root: python -m pytest pygame2_new/tests
+"""
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+GAME_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, GAME_DIR)
+
+import pytest  # noqa: E402 - after the path setup above
+
+
+@pytest.fixture
+def game():
+    """Seeded (deterministic) game on level 1 without a window"""
+    import pygame
+    from game import Game
+
+    pygame.display.init()
+    pygame.font.init()
+    game = Game(seed=1)
+    yield game
+    game.close()
+    pygame.quit()
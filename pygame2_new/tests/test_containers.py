@@ -0,0 +1,72 @@
+"""
+EntityList - deferred removal and generational handles
+"""
+from types import SimpleNamespace
+
+from containers import EntityList
+
+
+def _items(count):
+    return [SimpleNamespace(name=i) for i in range(count)]
+
+
+def test_removal_is_deferred_but_hidden_immediately():
+    items = _items(5)
+    entities = EntityList(items)
+    entities.remove(items[1])
+    entities.remove(items[3])
+    # Marked objects are gone for len, iteration and `in` right away...
+    assert len(entities) == 3
+    assert list(entities) == [items[0], items[2], items[4]]
+    assert items[1] not in entities
+    assert entities.is_pending(items[1])
+    # ...and leave the dense list on flush
+    removed = []
+    assert entities.flush(removed.append) == 2
+    assert removed == [items[1], items[3]]
+    assert len(entities) == 3
+    assert sorted(item.name for item in entities) == [0, 2, 4]
+
+
+def test_remove_while_iterating():
+    items = _items(6)
+    entities = EntityList(items)
+    seen = []
+    for item in entities:
+        seen.append(item.name)
+        if item.name % 2 == 0:
+            entities.remove(items[item.name + 1])  # Not visited any more
+    assert seen == [0, 2, 4]
+    entities.flush()
+    assert sorted(item.name for item in entities) == [0, 2, 4]
+
+
+def test_stale_handle_rejected_after_flush():
+    first, second = _items(2)
+    entities = EntityList()
+    handle = entities.add(first)
+    assert entities.get(handle) is first
+    entities.remove(handle)
+    assert entities.get(handle) is first  # Still resolvable until the flush
+    entities.flush()
+    assert entities.get(handle) is None
+
+    # The freed slot is reused with a new generation
+    reused = entities.add(second)
+    assert reused != handle
+    assert entities.get(reused) is second
+    assert entities.get(handle) is None
+    entities.remove(handle)  # Stale handle - ignored
+    assert entities.flush() == 0
+    assert list(entities) == [second]
+
+
+def test_version_changes_with_membership():
+    items = _items(3)
+    entities = EntityList(items)
+    version = entities.version
+    entities.remove(items[0])
+    assert entities.version != version
+    version = entities.version
+    entities.remove(items[0])  # Already marked
+    assert entities.version == version
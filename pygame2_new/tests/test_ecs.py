@@ -0,0 +1,70 @@
+"""
+ComponentStore - generational handles, slot reuse and views
+"""
+import numpy as np
+import pytest
+
+from ecs import (F_ALIVE, F_SLEEPING, KIND_ENEMY, KIND_MUSHROOM, ComponentStore,
+                 StoreView, handle_generation, handle_index)
+
+
+def test_destroy_frees_slot_and_bumps_generation():
+    store = ComponentStore(capacity=2)
+    first = store.create(KIND_ENEMY, 10, 20, 40, 40)
+    second = store.create(KIND_MUSHROOM, 50, 20, 30, 30)
+    assert handle_index(first) == 0 and handle_index(second) == 1
+    assert len(store) == 2
+
+    store.destroy(first)
+    assert not store.is_valid(first)
+    assert len(store) == 1
+    with pytest.raises(KeyError):
+        store.index(first)
+    store.destroy(first)  # Stale handle - ignored
+    assert len(store) == 1
+
+    reused = store.create(KIND_ENEMY, 70, 20, 40, 40)
+    assert handle_index(reused) == handle_index(first)
+    assert handle_generation(reused) == handle_generation(first) + 1
+    assert store.is_valid(reused) and not store.is_valid(first)
+    assert store.pos[store.index(reused)].tolist() == [70, 20]
+    assert store.is_valid(second)
+
+
+def test_grows_past_capacity():
+    store = ComponentStore(capacity=1)
+    handles = [store.create(KIND_ENEMY, i, 0, 10, 10) for i in range(9)]
+    assert store.capacity >= 9 and store.count == 9
+    assert [store.pos[store.index(handle), 0] for handle in handles] == list(range(9))
+
+
+def test_live_filters_kind_and_sleep():
+    store = ComponentStore()
+    enemy = store.create(KIND_ENEMY, 0, 0, 10, 10)
+    mushroom = store.create(KIND_MUSHROOM, 0, 0, 10, 10)
+    store.flags[store.index(mushroom)] |= F_SLEEPING
+    assert store.live().tolist() == [store.index(enemy)]
+    assert store.live(include_sleeping=True).tolist() == [0, 1]
+    assert store.live(KIND_MUSHROOM, include_sleeping=True).tolist() == [1]
+    store.destroy(enemy)
+    assert store.flags[0] & F_ALIVE == 0
+    assert store.live(include_sleeping=True).tolist() == [1]
+
+
+def test_view_detaches_when_slot_is_destroyed():
+    store = ComponentStore()
+    view = StoreView(store, KIND_ENEMY, 100, 200, 40, 40, velocity_x=2.0, gravity=0.0)
+    handle = view.handle
+    assert store.view(handle) is view and view.velocity_x == 2.0
+    store.step(index=np.array([view.slot]))
+    assert view.rect.topleft == (102, 200)
+
+    store.destroy(handle)
+    assert view.handle is None
+    assert view.rect.topleft == (102, 200)  # Last known rect is kept
+    assert view.velocity_x == 0.0
+
+    # A new entity in the same slot is not reachable through the old handle
+    other = StoreView(store, KIND_ENEMY, 0, 0, 40, 40)
+    assert handle_index(other.handle) == handle_index(handle)
+    assert not store.is_valid(handle)
@@ -0,0 +1,14 @@
+from headless import parse_script, frames
+
+
+def test_jump_particles_bounded_without_rendering(game):
+    """Jump particles must expire in update(), not only when the player is drawn"""
+    # Skákání na místě - hráč přežije, dokud nedojde čas levelu
+    script = frames(parse_script("jump*30 idle*10") * 400)
+    peak = 0
+    for _ in range(15000):
+        stats = game.fast_forward(1, script, render_every=0)
+        assert stats['state'] == "playing"
+        peak = max(peak, len(game.player.jump_particles))
+    assert 0 < peak <= 50
+    assert len(game.player.jump_particles) <= peak
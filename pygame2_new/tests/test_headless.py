@@ -0,0 +1,22 @@
+"""
+Headless runs report what happened in the game
+"""
+from config import MAX_LIVES
+from headless import Job, RunResult, run_job
+
+
+def test_deaths_count_hits_not_missing_lives(game):
+    game.player_hit()
+    game.lives += 1  # Extra life picked up
+    game.player_hit()
+    game.player_hit()
+    assert game.deaths == 3
+    assert MAX_LIVES - game.lives == 2
+    game.reset_game()
+    assert game.deaths == 0
+
+
+def test_run_job_reports_deaths(game):
+    result = run_job(Job(1, [((), 50)], seed=1, name="idle"))
+    assert isinstance(result, RunResult)
+    assert result.ticks == 50 and result.deaths == 0 and result.state == "playing"
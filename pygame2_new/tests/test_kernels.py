@@ -0,0 +1,135 @@
+"""
+Collision kernels against the object loops they replace
+Every case runs on the NumPy fallback (PYGAME2_NO_NUMBA=1) and, when numba
+is installed, on the compiled loops.
+"""
+import importlib
+from types import SimpleNamespace
+
+import numpy as np
+import pygame
+import pytest
+
+import kernels
+from crowd import ColliderGrid
+from player import Player
+
+SEEDS = range(12)
+VELOCITIES = (-7.5, -1.0, 0.0, 2.0, 9.0)
+
+
+@pytest.fixture(params=["numpy", "numba"])
+def backend(request, monkeypatch):
+    """kernels re-imported with the requested implementation"""
+    if request.param == "numba":
+        pytest.importorskip("numba")
+        monkeypatch.delenv("PYGAME2_NO_NUMBA", raising=False)
+    else:
+        monkeypatch.setenv("PYGAME2_NO_NUMBA", "1")
+    module = importlib.reload(kernels)
+    assert module.HAVE_NUMBA == (request.param == "numba")
+    yield module
+    monkeypatch.undo()
+    importlib.reload(kernels)  # Back to the default for other tests
+
+
+def _scene(seed):
+    """Integer colliders (left, top, right, bottom) and boxes no wider than a grid cell"""
+    rng = np.random.default_rng(seed)
+    m = int(rng.integers(1, 40))
+    x = rng.integers(-200, 2000, m)
+    y = rng.integers(0, 600, m)
+    colliders = np.stack([x, y, x + rng.integers(1, 400, m),
+                          y + rng.integers(1, 80, m)], axis=1).astype(np.float64)
+    n = 200
+    left = rng.integers(-300, 2200, n).astype(np.float64)
+    top = rng.integers(-50, 650, n).astype(np.float64)
+    right = left + rng.integers(1, 128, n)
+    bottom = top + 40
+    head = rng.random(m) < 0.7
+    return colliders, left, top, right, bottom, head
+
+
+def _rect(box):
+    left, top, right, bottom = (int(value) for value in box)
+    return pygame.Rect(left, top, right - left, bottom - top)
+
+
+def _first_overlap_reference(left, top, right, bottom, colliders):
+    rects = [_rect(collider) for collider in colliders]
+    first = []
+    for box in zip(left, top, right, bottom):
+        box_rect = _rect(box)
+        first.append(next((j for j, rect in enumerate(rects) if box_rect.colliderect(rect)), -1))
+    return np.array(first)
+
+
+def _solids(colliders, head):
+    """Platforms (stop a jump) and blocks (bumped elsewhere) as Player.check_collision_* gets them"""
+    objects = [SimpleNamespace(rect=_rect(box), broken=False) for box in colliders]
+    platforms = [obj for obj, stops in zip(objects, head) if stops]
+    blocks = [obj for obj, stops in zip(objects, head) if not stops]
+    # The kernels see the same objects in the same order: platforms, then blocks
+    order = np.concatenate([np.flatnonzero(head), np.flatnonzero(~head)])
+    return platforms, blocks, colliders[order], head[order]
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_first_overlap(backend, seed):
+    colliders, left, top, right, bottom, _ = _scene(seed)
+    expected = _first_overlap_reference(left, top, right, bottom, colliders)
+    assert (backend.first_overlap(left, top, right, bottom, colliders) == expected).all()
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_grid_first_overlap(backend, seed):
+    colliders, left, top, right, bottom, _ = _scene(seed)
+    expected = _first_overlap_reference(left, top, right, bottom, colliders)
+    grid = ColliderGrid(colliders)
+    cell = grid.candidates(left)
+    found = backend.grid_first_overlap(left, top, right, bottom, cell,
+                                       grid.table, grid.edges, grid.colliders)
+    assert (found == expected).all()
+
+
+def test_first_overlap_without_colliders(backend):
+    left = np.array([0.0, 50.0])
+    empty = np.zeros((0, 4))
+    assert (backend.first_overlap(left, left, left + 10, left + 10, empty) == -1).all()
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_resolve_x_matches_player(backend, seed):
+    colliders, left, top, right, bottom, head = _scene(seed)
+    platforms, blocks, boxes, _ = _solids(colliders, head)
+    player = Player(0, 0)
+    for box in zip(left[:40], top[:40], right[:40], bottom[:40]):
+        for velocity in VELOCITIES:
+            player.rect = _rect(box)
+            player.velocity_x = velocity
+            kernel_left = int(backend.resolve_x(player.rect, velocity, boxes))
+            player.check_collision_x(platforms, blocks)
+            assert kernel_left == player.rect.x
+
+
+@pytest.mark.parametrize("seed", SEEDS)
+def test_resolve_y_matches_player(backend, seed):
+    colliders, left, top, right, bottom, head = _scene(seed)
+    platforms, blocks, boxes, box_head = _solids(colliders, head)
+    player = Player(0, 0)
+    kernel_player = Player(0, 0)
+    for box in zip(left[:40], top[:40], right[:40], bottom[:40]):
+        for velocity in VELOCITIES:
+            player.rect = _rect(box)
+            player.velocity_y = velocity
+            player.on_ground = False
+            player.check_collision_y(platforms, blocks)
+
+            # Player.update with solids: the kernel, then the ground check
+            kernel_player.rect = _rect(box)
+            top_edge, kernel_player.velocity_y, kernel_player.on_ground = backend.resolve_y(
+                kernel_player.rect, velocity, boxes, box_head)
+            kernel_player.rect.y = int(top_edge)
+            kernel_player.check_ground()
+            assert (kernel_player.rect.y, kernel_player.velocity_y, kernel_player.on_ground) == \
+                (player.rect.y, player.velocity_y, player.on_ground)
@@ -0,0 +1,74 @@
+"""
+Generated levels - solids never overlap, nothing spawns inside them
+"""
+import numpy as np
+import pytest
+
+from config import ENEMY_HEIGHT, ENEMY_WIDTH
+from levelgen import DENSITY, GROUND_Y, PIPE_WIDTH, LevelSpec, generate_level
+
+SPECS = [LevelSpec(20000, seed) for seed in range(6)] + [
+    LevelSpec(20000, 7, ground='solid', density=3.0),
+    LevelSpec(5000, 3, blocks=300, pipes=40, platforms=60),
+]
+
+
+def _boxes(data):
+    """Solids above the floor as (N, 4) left, top, right, bottom"""
+    floating = data.platforms[data.platforms[:, 1] < GROUND_Y]
+    blocks = np.column_stack([data.blocks[:, 0], data.blocks[:, 1],
+                              data.blocks[:, 0] + 40, data.blocks[:, 1] + 40])
+    pipes = np.column_stack([data.pipes[:, 0], data.pipes[:, 1],
+                             data.pipes[:, 0] + PIPE_WIDTH, data.pipes[:, 1] + data.pipes[:, 2] * 40])
+    floating = np.column_stack([floating[:, 0], floating[:, 1],
+                                floating[:, 0] + floating[:, 2], floating[:, 1] + floating[:, 3]])
+    return np.concatenate([floating, blocks, pipes]).astype(np.int64)
+
+
+def _overlaps(a, b):
+    """(len(a), len(b)) matrix of strict intersections"""
+    return ((a[:, None, 0] < b[None, :, 2]) & (b[None, :, 0] < a[:, None, 2])
+            & (a[:, None, 1] < b[None, :, 3]) & (b[None, :, 1] < a[:, None, 3]))
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=lambda spec: f"seed{spec.seed}-{spec.ground}")
+def test_solids_do_not_overlap(spec):
+    solids = _boxes(generate_level(spec))
+    hits = _overlaps(solids, solids)
+    np.fill_diagonal(hits, False)
+    assert not hits.any()
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=lambda spec: f"seed{spec.seed}-{spec.ground}")
+def test_nothing_spawns_inside_solids(spec):
+    data = generate_level(spec)
+    solids = _boxes(data)
+    enemies = np.column_stack([data.enemies[:, 0], data.enemies[:, 1],
+                               data.enemies[:, 0] + ENEMY_WIDTH, data.enemies[:, 1] + ENEMY_HEIGHT])
+    powerups = np.column_stack([data.powerups[:, 0], data.powerups[:, 1],
+                                data.powerups[:, 0] + 30, data.powerups[:, 1] + 30])
+    assert not _overlaps(enemies.astype(np.int64), solids).any()
+    assert not _overlaps(powerups.astype(np.int64), solids).any()
+
+
+@pytest.mark.parametrize("spec", SPECS, ids=lambda spec: f"seed{spec.seed}-{spec.ground}")
+def test_counts_and_determinism(spec):
+    """Default densities leave room for everything; crowded specs get what fits"""
+    data = generate_level(spec)
+    crowded = spec.density > 1 or spec.blocks is not None
+    for category in DENSITY:
+        if category != 'platforms':  # Platforms include the floor segments
+            placed = len(getattr(data, category))
+            assert placed <= spec.count(category)
+            assert crowded or placed == spec.count(category)
+    again = generate_level(spec)
+    for category in DENSITY:
+        assert (getattr(again, category) == getattr(data, category)).all()
+
+
+def test_platform_sizes_are_few():
+    """Every platform size is a baked sprite; a long level must not need one per platform"""
+    data = generate_level(LevelSpec(200000, 1))
+    sizes = {(width, height) for width, height in data.platforms[:, 2:].tolist()}
+    assert len(data.platforms) > 500
+    assert len(sizes) <= 20
@@ -0,0 +1,92 @@
+"""
+LODScheduler catch-up across tier changes and sleep
+"""
+import numpy as np
+import pytest
+
+from ecs import KIND_ENEMY, ComponentStore, F_PATROL
+from level import Level
+from lod import LODScheduler
+
+TIERS = ((100, 1), (300, 2), (float('inf'), 4))
+
+
+def _store(count=24):
+    store = ComponentStore()
+    for i in range(count):
+        store.create(KIND_ENEMY, i * 40.0, 0.0, 40, 40, gravity=0.0)
+    return store
+
+
+def _focus(tick):
+    """Focus sweeping back and forth, so every slot changes tiers several times"""
+    return 500.0 + 600.0 * np.sin(tick / 7.0)
+
+
+def test_catch_up_covers_every_tick_across_tier_changes():
+    store = _store()
+    lod = LODScheduler(TIERS)
+    index = store.live()
+    caught_up = np.zeros(store.count, dtype=np.int64)
+    ticks = 240
+    for tick in range(ticks):
+        due, dt = lod.schedule(store, index, _focus(tick))
+        caught_up[due] += 1 if dt is None else dt
+    # Ticks still pending: since the last update of each slot
+    pending = lod.tick - 1 - lod._last_update[:store.count]
+    assert (pending < lod.max_period).all()
+    assert (caught_up + pending == ticks).all()
+
+
+def test_far_to_near_keeps_skipped_ticks():
+    """Slot updated every 4th tick moves into the full-rate tier between slices"""
+    store = _store(1)
+    lod = LODScheduler(TIERS)
+    index = store.live()
+    total = 0
+    for tick in range(12):
+        due, dt = lod.schedule(store, index, 1000.0 if tick < 6 else 0.0)
+        total += len(due) if dt is None else int(dt.sum())
+    assert total == 12
+
+
+def test_sleeping_ticks_are_not_caught_up():
+    store = _store(1)
+    lod = LODScheduler(TIERS)
+    awake = store.live()
+    asleep = awake[:0]
+    total = 0
+    for tick in range(40):
+        index = asleep if 10 <= tick < 30 else awake
+        due, dt = lod.schedule(store, index, 1000.0)
+        total += len(due) if dt is None else int(dt.sum())
+    pending = lod.tick - 1 - int(lod._last_update[0])
+    assert total + pending == 20
+
+
+def test_full_rate_returns_no_dt():
+    """The default first tier covers the screen and the simulation margin"""
+    store = _store()
+    lod = LODScheduler()
+    index = store.live()
+    for _ in range(5):
+        due, dt = lod.schedule(store, index, 400.0)
+        assert dt is None
+        assert (due == index).all()
+
+
+@pytest.mark.parametrize("number", [1, 2, 3])
+def test_lod_follows_full_rate_positions(number):
+    """
+    Patrolling slots updated this tick are where full-rate simulation has
+    them horizontally (a landing inside a catch-up may settle differently)
+    """
+    full = Level(number)
+    sliced = Level(number)
+    lod = LODScheduler(TIERS)
+    for tick in range(400):
+        full.update_entities()
+        due, dt = lod.schedule(sliced.store, sliced.store.live(), _focus(tick) * 5)
+        sliced.update_entities(due, dt)
+        patrol = due[(sliced.store.flags[due] & F_PATROL) != 0]
+        assert (sliced.store.pos[patrol, 0] == full.store.pos[patrol, 0]).all()
@@ -0,0 +1,82 @@
+"""
+BackgroundWriter - coalescing, atomic replace and write errors
+"""
+import os
+
+import pytest
+
+from persistence import BackgroundWriter, SaveGame, Storage, read_save
+
+
+@pytest.fixture
+def writer():
+    writer = BackgroundWriter(batch_delay=0.01)
+    yield writer
+    try:
+        writer.close()
+    except OSError:
+        pass
+
+
+def test_writes_newest_data_and_deletes(tmp_path, writer):
+    path = str(tmp_path / "sub" / "save.bin")
+    for score in range(5):
+        writer.write(path, SaveGame(2, 3, score).to_bytes())
+    assert writer.flush(5.0)
+    assert read_save(path) == SaveGame(2, 3, 4)
+    assert writer.submitted == 5 and writer.written + writer.coalesced == 5
+
+    writer.write(path, None)
+    assert writer.flush(5.0)
+    assert not os.path.exists(path)
+    assert os.listdir(tmp_path / "sub") == []  # No temp files left behind
+
+
+def test_failed_batch_raises_from_flush_and_leaves_no_temp_files(tmp_path, writer):
+    path = tmp_path / "save.bin"
+    path.mkdir()  # The rename onto a directory fails every time
+    writer.write(str(path), b"data")
+    with pytest.raises(OSError):
+        writer.flush(5.0)
+    assert writer.failed == 1
+    assert sorted(os.listdir(tmp_path)) == ["save.bin"]
+    assert writer.flush(5.0)  # Reported once
+
+    # The writer keeps working for other files
+    other = str(tmp_path / "other.bin")
+    writer.write(other, b"ok")
+    assert writer.flush(5.0)
+    with open(other, "rb") as file:
+        assert file.read() == b"ok"
+
+
+def test_failed_batch_is_retried_once(tmp_path):
+    class FlakyWriter(BackgroundWriter):
+        attempts = 0
+
+        def _write_batch(self, batch):
+            FlakyWriter.attempts += 1
+            if FlakyWriter.attempts == 1:
+                raise PermissionError("locked")
+            super()._write_batch(batch)
+
+    writer = FlakyWriter(batch_delay=0.01)
+    path = str(tmp_path / "save.bin")
+    writer.write(path, b"data")
+    assert writer.close(5.0)
+    assert FlakyWriter.attempts == 2
+    assert writer.failed == 0
+    with open(path, "rb") as file:
+        assert file.read() == b"data"
+
+
+def test_close_raises_and_stops_thread(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_bytes(b"")
+    storage = Storage(str(blocker))  # Save directory is a file
+    storage.store_save(SaveGame(1, 3, 100))
+    with pytest.raises(OSError):
+        storage.close()
+    assert storage.writer._thread is None
+    with pytest.raises(RuntimeError):
+        storage.store_save(SaveGame(1, 3, 200))
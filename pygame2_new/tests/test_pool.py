@@ -0,0 +1,48 @@
+"""
+ObjectPool - reuse, statistics and the double-release guard
+"""
+import pytest
+
+from pool import ObjectPool
+
+
+class Spark:
+    def __init__(self, x=0, life=10):
+        self.reset(x, life)
+
+    def reset(self, x=0, life=10):
+        self.x = x
+        self.life = life
+
+
+def test_acquire_reuses_released_objects():
+    pool = ObjectPool(Spark)
+    first = pool.acquire(5, life=3)
+    pool.release(first)
+    second = pool.acquire(7)
+    assert second is first
+    assert (second.x, second.life) == (7, 10)  # reset() like a new object
+    assert pool.stats() == {'in_use': 1, 'free': 0, 'high_water': 1,
+                            'created': 1, 'reused': 1}
+
+
+def test_prealloc_and_high_water():
+    pool = ObjectPool(Spark, 2)
+    sparks = [pool.acquire(i) for i in range(3)]
+    assert pool.created == 3 and pool.reused == 2
+    for spark in sparks:
+        pool.release(spark)
+    assert pool.stats()['free'] == 3
+    assert pool.in_use == 0 and pool.high_water == 3
+
+
+def test_double_release_raises():
+    pool = ObjectPool(Spark)
+    spark = pool.acquire()
+    pool.release(spark)
+    with pytest.raises(ValueError):
+        pool.release(spark)
+    assert pool.in_use == 0 and pool.stats()['free'] == 1
+    # Handed out again, it may be released again
+    assert pool.acquire_blank() is spark
+    pool.release(spark)
@@ -0,0 +1,54 @@
+"""
+SimulationRegion - entities outside the camera window sleep
+"""
+from config import SCREEN_WIDTH
+from ecs import F_SLEEPING, KIND_ENEMY, ComponentStore
+from entity_base import Entity
+from simulation import SimulationRegion
+
+
+def test_store_entities_sleep_and_wake():
+    store = ComponentStore()
+    near = store.create(KIND_ENEMY, 500, 0, 40, 40, velocity_x=1.0, gravity=0.0)
+    far = store.create(KIND_ENEMY, 5000, 0, 40, 40, velocity_x=1.0, gravity=0.0)
+    region = SimulationRegion(margin=300)
+
+    awake = region.update(0, store)
+    assert awake.tolist() == [store.index(near)]
+    assert store.flags[store.index(far)] & F_SLEEPING
+    assert region.stats() == {'active': 1, 'sleeping': 1}
+
+    # Sleeping slots are skipped by step()
+    for _ in range(10):
+        store.step()
+    assert store.pos[store.index(near), 0] == 510
+    assert store.pos[store.index(far), 0] == 5000
+
+    # The camera reaches the far entity: it wakes, the near one (now behind) sleeps
+    awake = region.update(5000 - SCREEN_WIDTH // 2, store)
+    assert awake.tolist() == [store.index(far)]
+    assert not store.flags[store.index(far)] & F_SLEEPING
+    assert store.flags[store.index(near)] & F_SLEEPING
+
+
+def test_margin_edges():
+    store = ComponentStore()
+    region = SimulationRegion(margin=300)
+    left = store.create(KIND_ENEMY, -340, 0, 40, 40)    # Right edge exactly on region.left
+    right = store.create(KIND_ENEMY, SCREEN_WIDTH + 300, 0, 40, 40)
+    outside = store.create(KIND_ENEMY, SCREEN_WIDTH + 301, 0, 40, 40)
+    awake = set(region.update(0, store).tolist())
+    assert awake == {store.index(left), store.index(right)}
+    assert store.index(outside) not in awake
+
+
+def test_plain_entities_use_is_active():
+    region = SimulationRegion(margin=300)
+    region.move(0)
+    inside = Entity(200, 0, 40, 40)
+    outside = Entity(3000, 0, 40, 40)
+    dead = Entity(3000, 0, 40, 40)
+    dead.is_alive = False
+    region.update_entities([inside, outside, dead])
+    assert inside.is_active and not outside.is_active
+    assert region.stats() == {'active': 1, 'sleeping': 1}
@@ -0,0 +1,74 @@
+"""
+Game snapshot/restore - a restored game replays into the same state hashes
+"""
+import numpy as np
+import pygame
+import pytest
+
+from game import Game
+from headless import frames, random_script
+from snapshot import SnapshotReader, SnapshotWriter
+
+WARMUP = 400
+REPLAY = 300
+
+
+def _replay(game, inputs):
+    hashes = []
+    for frame in inputs:
+        if game.game_state != "playing":
+            break
+        game.step(frame)
+        hashes.append(game.state_hash)
+    return hashes
+
+
+@pytest.fixture
+def games():
+    """Seeded Game factory; every game is closed afterwards"""
+    pygame.display.init()
+    pygame.font.init()
+    made = []
+
+    def make(seed):
+        made.append(Game(seed=seed))
+        return made[-1]
+
+    yield make
+    for game in made:
+        game.close()
+    pygame.quit()
+
+
+@pytest.mark.parametrize("seed", [1, 3])
+def test_restore_reproduces_state_hash(games, seed):
+    game = games(seed)
+    inputs = list(frames(random_script(seed)))
+    _replay(game, inputs[:WARMUP])
+    blob = game.snapshot(particles=True)
+    expected = _replay(game, inputs[WARMUP:WARMUP + REPLAY])
+    final = (game.score, game.lives, game.deaths, tuple(game.player.rect))
+    assert expected
+
+    # The same game, rewound
+    game.restore(blob)
+    assert _replay(game, inputs[WARMUP:WARMUP + REPLAY]) == expected
+    assert (game.score, game.lives, game.deaths, tuple(game.player.rect)) == final
+
+    # A fresh game restored from the blob
+    fresh = games(seed)
+    fresh.restore(blob)
+    assert _replay(fresh, inputs[WARMUP:WARMUP + REPLAY]) == expected
+
+
+def test_writer_reader_round_trip():
+    out = SnapshotWriter()
+    out.section(b"TEST")
+    out.pack("iq", -3, 1 << 40)
+    out.array(np.arange(5, dtype=np.float64), np.float64)
+    out.data({'lives': 2, 'rects': [(1, 2, 3, 4)]})
+    src = SnapshotReader(out.getvalue())
+    src.expect(b"TEST")
+    assert src.unpack("iq") == (-3, 1 << 40)
+    assert src.array(np.float64).tolist() == [0, 1, 2, 3, 4]
+    assert src.data() == {'lives': 2, 'rects': [(1, 2, 3, 4)]}
@@ -0,0 +1,95 @@
+"""
+TimerWheel - every timer fires on its exact tick, also across cascades
+"""
+import random
+
+import pytest
+
+from timers import SLOTS, TimerWheel, timer_property
+
+# Deadlines just around the level 1 and level 2 block boundaries
+DELAYS = [1, 2, SLOTS - 1, SLOTS, SLOTS + 1, SLOTS ** 2 - 1, SLOTS ** 2, SLOTS ** 2 + 1,
+          SLOTS ** 2 + SLOTS, 2 * SLOTS ** 2 + 3, SLOTS ** 3 + 5]
+
+
+def _fire_ticks(wheel, delays, until):
+    fired = {}
+    for delay in delays:
+        wheel.schedule(delay, lambda timer, delay=delay: fired.setdefault(delay, wheel.now))
+    wheel.advance(until)
+    return fired
+
+
+@pytest.mark.parametrize("start", [0, 5, SLOTS - 3, SLOTS ** 2 - SLOTS - 2, SLOTS ** 2 - 1,
+                                   SLOTS ** 3 - 7])
+def test_fires_on_exact_tick(start):
+    wheel = TimerWheel()
+    wheel.reset(start)
+    fired = _fire_ticks(wheel, DELAYS, max(DELAYS) + 1)
+    assert fired == {delay: start + delay for delay in DELAYS}
+
+
+def test_level1_to_level2_cascade():
+    """Scheduled in level 2, moved to level 1 and then level 0 before firing"""
+    wheel = TimerWheel()
+    wheel.reset(SLOTS ** 2 - 10)
+    delay = 10 + SLOTS + 7  # Next level 2 block, second level 1 bucket
+    fired = []
+    timer = wheel.schedule(delay, lambda timer: fired.append(wheel.now))
+    wheel.advance(delay - 1)
+    assert fired == [] and wheel.remaining(timer) == 1
+    wheel.advance(1)
+    assert fired == [SLOTS ** 2 + SLOTS + 7]
+    assert not timer.active and len(wheel) == 0
+
+
+def test_random_schedule_matches_reference():
+    rng = random.Random(3)
+    wheel = TimerWheel()
+    expected = {}
+    fired = {}
+    for step in range(3000):
+        for _ in range(rng.randint(0, 3)):
+            delay = rng.choice([rng.randint(1, 80), rng.randint(1, 9000)])
+            key = len(expected)
+            expected[key] = wheel.now + delay
+            wheel.schedule(delay, lambda timer, key=key: fired.setdefault(key, wheel.now))
+        wheel.advance(rng.randint(1, 20))
+    wheel.advance(9000)
+    assert fired == expected
+
+
+def test_periodic_cancel_and_restart():
+    wheel = TimerWheel()
+    ticks = []
+    periodic = wheel.schedule(SLOTS - 4, lambda timer: ticks.append(wheel.now), period=SLOTS)
+    cancelled = wheel.schedule(5, lambda timer: ticks.append(-1))
+    wheel.cancel(cancelled)
+    wheel.advance(SLOTS * 3)
+    assert ticks == [SLOTS - 4, 2 * SLOTS - 4, 3 * SLOTS - 4]
+
+    restarted = wheel.restart(periodic, 10)
+    assert restarted is not periodic and not periodic.active
+    assert wheel.remaining(restarted) == 10
+    assert wheel.restart(restarted, 0) is None
+    assert len(wheel) == 0
+
+
+class Countdown:
+    boost = timer_property('boost')
+
+    def __init__(self, timers):
+        self.timers = timers
+        self._boost = None
+
+
+def test_timer_property():
+    wheel = TimerWheel()
+    owner = Countdown(wheel)
+    assert owner.boost == 0
+    owner.boost = 100
+    wheel.advance(30)
+    assert owner.boost == 70
+    owner.boost = 5
+    wheel.advance(5)
+    assert owner.boost == 0 and len(wheel) == 0
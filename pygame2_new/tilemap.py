@@ -0,0 +1,161 @@
+"""
+Tile Map
+Blocks and coins of huge levels as a grid of one-byte tile ids plus
+one-byte state bits, stored in a file and opened with numpy.memmap. Opening
+costs the same for any level size; the OS page cache decides which parts
+stay resident. Python objects exist only for the tiles near the camera (see
+LevelStreamer).
+
+File layout: header, then tiles and state as (columns, rows) uint8 arrays.
+Column-major, so the tiles of a horizontal window are contiguous on disk.
+By default the file is opened copy-on-write: state bits written during play
+stay private to the process and never touch the file.
+"""
+import os
+import struct
+import threading
+from typing import Dict, Tuple
+import numpy as np
+from config import SCREEN_HEIGHT, TILE_SIZE, COIN_SIZE
+from level_data import LevelData
+
+MAGIC = b"MTIL"
+FORMAT_VERSION = 1
+_HEADER = struct.Struct("<4sHIIH")  # magic, version, columns, rows, tile size
+
+# Tile ids
+T_EMPTY = 0
+T_BRICK = 1
+T_SOLID = 2
+T_QUESTION_COIN = 3
+T_QUESTION_POWERUP = 4
+T_COIN = 5
+
+# State bits
+S_HIT = 1        # Question block already emptied
+S_BROKEN = 2     # Brick smashed
+S_COLLECTED = 4  # Coin picked up
+S_GONE = S_BROKEN | S_COLLECTED
+
+# Block tile -> (block_type, content)
+BLOCK_TILES = {T_BRICK: ("brick", None), T_SOLID: ("solid", None),
+               T_QUESTION_COIN: ("question", "coin"),
+               T_QUESTION_POWERUP: ("question", "powerup")}
+_BLOCK_IDS = {value: tile for tile, value in BLOCK_TILES.items()}
+
+# Coin inside its tile
+COIN_OFFSET = (TILE_SIZE - COIN_SIZE) // 2
+
+
+class TileMap:
+    """
+    A memory-mapped tile map; tiles are addressed by flat index
+    (column * rows + row)
+    """
+    __slots__ = ('path', 'columns', 'rows', 'tile_size', 'tiles', 'state')
+
+    def __init__(self, path: str, mode: str = 'c'):
+        """mode - 'c' keeps state changes private, 'r+' writes them to the file"""
+        with open(path, "rb") as file:
+            magic, version, columns, rows, tile_size = _HEADER.unpack(file.read(_HEADER.size))
+        if magic != MAGIC or version != FORMAT_VERSION:
+            raise ValueError(f"{path}: not a tile map of this version")
+        self.path = path
+        self.columns = columns
+        self.rows = rows
+        self.tile_size = tile_size
+        shape = (columns, rows)
+        self.tiles = np.memmap(path, dtype=np.uint8, mode='r', offset=_HEADER.size, shape=shape)
+        self.state = np.memmap(path, dtype=np.uint8, mode=mode,
+                               offset=_HEADER.size + columns * rows, shape=shape)
+
+    @property
+    def width(self) -> int:
+        return self.columns * self.tile_size
+
+    def column_range(self, left: float, right: float) -> Tuple[int, int]:
+        """Columns [first, last) touching the pixel span [left, right)"""
+        first = max(0, int(left // self.tile_size))
+        last = min(self.columns, -int(-right // self.tile_size))
+        return first, max(first, last)
+
+    def present(self, first: int, last: int) -> np.ndarray:
+        """Flat indices of the non-empty, not broken/collected tiles in columns [first, last)"""
+        tiles = self.tiles[first:last]
+        columns, rows = np.nonzero((tiles != T_EMPTY) & ((self.state[first:last] & S_GONE) == 0))
+        return (columns + first) * self.rows + rows
+
+    def tile(self, index: int) -> Tuple[int, int, int, int]:
+        """(x, y, tile id, state) of one tile"""
+        column, row = divmod(index, self.rows)
+        return (column * self.tile_size, row * self.tile_size,
+                int(self.tiles[column, row]), int(self.state[column, row]))
+
+    def mark(self, index: int, bits: int):
+        """Set state bits of one tile"""
+        column, row = divmod(index, self.rows)
+        self.state[column, row] |= bits
+
+    def counts(self) -> Dict[int, int]:
+        """Tile id -> number of tiles (reads the whole map)"""
+        counts = np.zeros(256, dtype=np.int64)
+        step = max(1, (1 << 22) // max(1, self.rows))  # ~4 MB of tiles at a time
+        for first in range(0, self.columns, step):
+            counts += np.bincount(self.tiles[first:first + step].ravel(), minlength=256)
+        return {tile: int(count) for tile, count in enumerate(counts)
+                if count and tile != T_EMPTY}
+
+    def flush(self):
+        """Write state changes back (only does anything in 'r+' mode)"""
+        self.state.flush()
+
+
+def write_tilemap(path: str, tiles: np.ndarray, tile_size: int = TILE_SIZE):
+    """Write a (columns, rows) uint8 tile array as a tile map with clear state"""
+    tiles = np.ascontiguousarray(tiles, dtype=np.uint8)
+    columns, rows = tiles.shape
+    temp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temp_path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, FORMAT_VERSION, columns, rows, tile_size))
+        file.write(tiles.tobytes())
+        file.truncate(_HEADER.size + 2 * tiles.size)  # State: a sparse run of zeros
+    os.replace(temp_path, path)
+
+
+def bake_tilemap(data: LevelData, path: str, tile_size: int = TILE_SIZE) -> LevelData:
+    """
+    Move the blocks and coins of a LevelData into a tile map file at path
+    Objects snap to the tile grid (a block fills its tile, a coin sits in the
+    middle of it); when two land on one tile the block wins. Returns the
+    LevelData without them, pointing at the tile map.
+    """
+    columns = max(1, -(-data.extent() // tile_size) + 1)
+    rows = SCREEN_HEIGHT // tile_size
+    tiles = np.zeros((columns, rows), dtype=np.uint8)
+
+    def cells(xy):
+        column = np.clip((xy[:, 0] + tile_size // 2) // tile_size, 0, columns - 1)
+        row = np.clip((xy[:, 1] + tile_size // 2) // tile_size, 0, rows - 1)
+        return column, row
+
+    if len(data.coins):
+        tiles[cells(data.coins - COIN_OFFSET)] = T_COIN
+    if len(data.blocks):
+        kinds = []
+        for block_type, content in data.blocks[:, 2:].tolist():
+            key = (data.string(block_type), data.string(content))
+            if key not in _BLOCK_IDS:
+                raise ValueError(f"no tile for block {key}")
+            kinds.append(_BLOCK_IDS[key])
+        tiles[cells(data.blocks)] = kinds
+    write_tilemap(path, tiles, tile_size)
+
+    arrays = {attribute: getattr(data, attribute)
+              for attribute in ('platforms', 'pipes', 'enemies', 'powerups', 'flag')}
+    return LevelData(data.name, data.strings, data.source_hash, path, **arrays)
+
+
+# Export classes
+__all__ = ['TileMap', 'write_tilemap', 'bake_tilemap', 'BLOCK_TILES', 'COIN_OFFSET',
+           'T_EMPTY', 'T_BRICK', 'T_SOLID', 'T_QUESTION_COIN', 'T_QUESTION_POWERUP', 'T_COIN',
+           'S_HIT', 'S_BROKEN', 'S_COLLECTED']
@@ -0,0 +1,166 @@
+"""
+Timer Wheel
+Hierarchical timing wheel for gameplay countdowns: scheduling, cancelling
+and querying are O(1), a tick only touches timers that expire (plus an
+occasional cascade of one bucket)
+"""
+from typing import Callable, Dict, List, Optional
+
+SLOT_BITS = 6
+SLOTS = 1 << SLOT_BITS
+SLOT_MASK = SLOTS - 1
+LEVELS = 4  # 64^4 ticks (~77 hours at 60 FPS); later deadlines wait in an overflow list
+
+
+class Timer:
+    """Handle of one scheduled countdown"""
+    __slots__ = ('deadline', 'callback', 'period', 'active', '_bucket')
+
+    def __init__(self, deadline: int, callback: Optional[Callable] = None,
+                 period: Optional[int] = None):
+        self.deadline = deadline
+        self.callback = callback
+        self.period = period    # Repeat every period ticks (None = one shot)
+        self.active = True
+        self._bucket: Optional[Dict] = None
+
+    def __repr__(self):
+        return f"Timer(deadline={self.deadline}, active={self.active})"
+
+
+class TimerWheel:
+    """
+    LEVELS wheels of SLOTS buckets each; level L buckets span SLOTS**L ticks
+    A timer sits in the lowest level whose current block contains its
+    deadline and moves down a level when the wheel reaches that block.
+    """
+    __slots__ = ('now', '_wheels', '_overflow', '_due', 'fired')
+
+    def __init__(self):
+        self.now = 0
+        self._wheels: List[List[Dict[Timer, None]]] = [
+            [{} for _ in range(SLOTS)] for _ in range(LEVELS)]
+        self._overflow: Dict[Timer, None] = {}
+        self._due: Dict[Timer, None] = {}  # Deadline already reached
+        self.fired = 0                      # Callbacks run during the last advance()
+
+    # === SCHEDULING ===
+
+    def schedule(self, delay: int, callback: Optional[Callable] = None,
+                 period: Optional[int] = None) -> Timer:
+        """Expire delay ticks from now; callback(timer) runs on expiry"""
+        timer = Timer(self.now + delay, callback, period)
+        self._insert(timer)
+        return timer
+
+    def cancel(self, timer: Optional[Timer]):
+        if timer is not None and timer.active:
+            timer.active = False
+            if timer._bucket is not None:
+                del timer._bucket[timer]
+                timer._bucket = None
+
+    def restart(self, timer: Optional[Timer], delay: int,
+                callback: Optional[Callable] = None) -> Optional[Timer]:
+        """Cancel timer and schedule a new one; a delay <= 0 only cancels"""
+        self.cancel(timer)
+        if delay <= 0:
+            return None
+        return self.schedule(delay, callback)
+
+    def reset(self, now: int = 0):
+        """Cancel every timer and set the clock (e.g. before restoring a snapshot)"""
+        for bucket in [self._due, self._overflow] + [bucket for wheel in self._wheels
+                                                     for bucket in wheel]:
+            for timer in bucket:
+                timer.active = False
+                timer._bucket = None
+            bucket.clear()
+        self.now = now
+
+    def remaining(self, timer: Optional[Timer]) -> int:
+        """Ticks left (0 for None, expired or cancelled timers)"""
+        if timer is None or not timer.active:
+            return 0
+        return max(0, timer.deadline - self.now)
+
+    def _insert(self, timer: Timer):
+        deadline = timer.deadline
+        if deadline <= self.now:
+            bucket = self._due
+        else:
+            bucket = self._overflow
+            for level in range(LEVELS):
+                shift = SLOT_BITS * (level + 1)
+                if deadline >> shift == self.now >> shift:
+                    bucket = self._wheels[level][(deadline >> (SLOT_BITS * level)) & SLOT_MASK]
+                    break
+        bucket[timer] = None
+        timer._bucket = bucket
+
+    # === TICK ===
+
+    def advance(self, ticks: int = 1):
+        """Move time forward and fire expired timers in deadline order"""
+        self.fired = 0
+        for _ in range(ticks):
+            self.now += 1
+            now = self.now
+            # Cascade: entering a new block at level L re-sorts its bucket
+            if now & ((1 << (SLOT_BITS * LEVELS)) - 1) == 0:
+                self._rehash(self._overflow)
+            for level in range(LEVELS - 1, 0, -1):
+                if now & ((1 << (SLOT_BITS * level)) - 1) == 0:
+                    self._rehash(self._wheels[level][(now >> (SLOT_BITS * level)) & SLOT_MASK])
+            expired = list(self._due)
+            self._due.clear()
+            bucket = self._wheels[0][now & SLOT_MASK]
+            expired += bucket
+            bucket.clear()
+            for timer in expired:
+                timer._bucket = None
+            for timer in expired:
+                if timer.active:  # A callback may have cancelled it
+                    self._fire(timer)
+
+    def _rehash(self, bucket: Dict[Timer, None]):
+        timers = list(bucket)
+        bucket.clear()
+        for timer in timers:
+            self._insert(timer)
+
+    def _fire(self, timer: Timer):
+        if timer.period:
+            timer.deadline += timer.period
+            self._insert(timer)
+        else:
+            timer.active = False
+        if timer.callback is not None:
+            self.fired += 1
+            timer.callback(timer)
+
+    def __len__(self) -> int:
+        """Scheduled timers"""
+        return (len(self._due) + len(self._overflow)
+                + sum(len(bucket) for wheel in self._wheels for bucket in wheel))
+
+
+def timer_property(name: str, doc: str = None) -> property:
+    """
+    Countdown attribute backed by a TimerWheel
+    Reads give the remaining ticks, assigning N (re)starts an N-tick timer.
+    The owner needs a 'timers' wheel and an attribute '_<name>' for the handle.
+    """
+    slot = '_' + name
+
+    def getter(self) -> int:
+        return self.timers.remaining(getattr(self, slot))
+
+    def setter(self, ticks: int):
+        setattr(self, slot, self.timers.restart(getattr(self, slot), ticks))
+
+    return property(getter, setter, doc=doc)
+
+
+# Export classes
+__all__ = ['Timer', 'TimerWheel', 'timer_property']